@@ -1,3 +1,3 @@
-from . import config, logging, misc, mock, uids, weight_utils
+from . import config, logging, misc, mock, rounds, scheduler, uids, weight_utils
 
-__all__ = ["config", "logging", "misc", "mock", "uids", "weight_utils"]
+__all__ = ["config", "logging", "misc", "mock", "rounds", "scheduler", "uids", "weight_utils"]
@@ -195,8 +195,22 @@ def add_validator_args(cls, parser):
     parser.add_argument(
         "--neuron.timeout",
         type=float,
-        help="The timeout for each forward call in seconds.",
-        default=20,
+        help="The timeout for each forward call in seconds. Caps the adaptive per-miner timeouts.",
+        default=60,
+    )
+
+    parser.add_argument(
+        "--neuron.min_timeout",
+        type=float,
+        help="The lowest per-miner timeout in seconds derived from the miner latency history.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.disable_adaptive_timeouts",
+        action="store_true",
+        help="If set, every miner is queried with --neuron.timeout instead of a timeout derived from its latency history.",
+        default=False,
     )
 
     parser.add_argument(
@@ -206,6 +220,20 @@ def add_validator_args(cls, parser):
         default=1,
     )
 
+    parser.add_argument(
+        "--neuron.max_inflight_rounds",
+        type=int,
+        help="The maximum number of query rounds in flight at the same time. A new round waits for a free slot.",
+        default=2,
+    )
+
+    parser.add_argument(
+        "--neuron.max_outstanding_requests",
+        type=int,
+        help="The maximum number of axon requests outstanding at the same time, shared by all rounds in flight.",
+        default=1024,
+    )
+
     parser.add_argument(
         "--neuron.sample_size",
         type=int,
@@ -213,6 +241,92 @@ def add_validator_args(cls, parser):
         default=50,
     )
 
+    parser.add_argument(
+        "--neuron.sample_miners",
+        action="store_true",
+        help="If set, only --neuron.sample_size miners are queried per round, balancing the flights each miner gets.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.flights_per_round",
+        type=int,
+        help="The number of flights sent to miners in a single query round. Values above 1 use the batched protocol.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.prefetch_flights",
+        type=int,
+        help="Size of the buffer of scheduled flights prefetched in the background. 0 fetches flights in the round.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.stream_responses",
+        action="store_true",
+        help="If set, miner responses are validated and stored as they arrive instead of after the slowest miner.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.predictions_flush_size",
+        type=int,
+        help="The number of buffered predictions flushed to the database at once in streaming mode.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--neuron.write_behind_max_rows",
+        type=int,
+        help="Size in rows of the buffer of round writes flushed to the database in the background. 0 writes in the round.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.write_behind_flush_rows",
+        type=int,
+        help="The number of buffered rows which triggers a flush of the write-behind buffer.",
+        default=1000,
+    )
+
+    parser.add_argument(
+        "--neuron.write_behind_flush_interval",
+        type=float,
+        help="The longest time in seconds a write waits in the write-behind buffer.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.scoring_mode",
+        type=str,
+        choices=["task", "process"],
+        help="Run scoring as a background task of the validator, or leave it to the separate neurons/scorer.py process.",
+        default="task",
+    )
+
+    parser.add_argument(
+        "--neuron.scoring_engine",
+        type=str,
+        choices=["python", "numpy", "sql"],
+        help="Score predictions one by one in the validator process, in bulk with NumPy, or inside Postgres.",
+        default="python",
+    )
+
+    parser.add_argument(
+        "--neuron.scoring_chunk_size",
+        type=int,
+        help="The number of flights fetched, scored and committed together in a scoring pass.",
+        default=100,
+    )
+
+    parser.add_argument(
+        "--neuron.leaderboard_retention_days",
+        type=int,
+        help="The number of days of leaderboard snapshots and hourly rollups kept. Daily rollups are kept forever.",
+        default=90,
+    )
+
     parser.add_argument(
         "--neuron.disable_set_weights",
         action="store_true",
@@ -0,0 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+import bittensor as bt
+
+
+class RequestsLimiter:
+    """Counting limiter of outstanding axon requests shared by all the rounds in flight."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.outstanding = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, count: int) -> int:
+        # A single call never waits for more than the whole limit, otherwise it would wait forever.
+        count = min(count, self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.outstanding + count <= self.limit)
+            self.outstanding += count
+        return count
+
+    async def release(self, count: int):
+        async with self._condition:
+            self.outstanding -= count
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def requests(self, count: int):
+        acquired = await self.acquire(count)
+        try:
+            yield
+        finally:
+            await self.release(acquired)
+
+
+class RoundExecutor:
+    """
+    Pipelined executor of query rounds.
+
+    `start_round` returns as soon as the round is started, so round N+1 can fan out while round N is still
+    draining slow miners. At most `max_inflight_rounds` rounds run at the same time and all of them share
+    the `max_outstanding_requests` budget of axon requests.
+    """
+
+    def __init__(self, max_inflight_rounds: int, max_outstanding_requests: int):
+        self.max_inflight_rounds = max_inflight_rounds
+        self.limiter = RequestsLimiter(max_outstanding_requests)
+        self._slots = asyncio.Semaphore(max_inflight_rounds)
+        self._inflight: set[asyncio.Task] = set()
+
+    @property
+    def inflight_rounds(self) -> int:
+        return len(self._inflight)
+
+    async def start_round(self, round_func: Callable[[], Awaitable[None]]):
+        """Start a round in the background once a slot is free."""
+        if self._slots.locked():
+            bt.logging.warning(f"{self.max_inflight_rounds} rounds in flight, waiting for one to finish")
+        await self._slots.acquire()
+
+        task = asyncio.create_task(self._run(round_func))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, round_func: Callable[[], Awaitable[None]]):
+        try:
+            await round_func()
+        finally:
+            self._slots.release()
+
+    def requests(self, count: int):
+        """Context manager holding `count` outstanding axon requests."""
+        return self.limiter.requests(count)
+
+    async def drain(self):
+        """Wait for all the rounds in flight to finish."""
+        await asyncio.gather(*self._inflight, return_exceptions=True)
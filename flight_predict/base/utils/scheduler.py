@@ -0,0 +1,83 @@
+import asyncio
+from contextlib import suppress
+from time import perf_counter
+from traceback import print_exception
+from typing import Awaitable, Callable
+
+import bittensor as bt
+import wandb
+
+
+class PeriodicTask:
+    """
+    Runs a coroutine function on a fixed period inside the validator event loop.
+
+    The schedule is drift-free: the next run is planned relative to the previous planned start, so the task only
+    sleeps for the time left in the period. When a run takes longer than the period, the missed ticks are skipped
+    instead of being executed back to back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        interval: float,
+        initial_delay: float = 0,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.runs = 0
+        self.last_run_time: float | None = None
+
+    async def run_once(self):
+        """Run the task a single time, logging its run time and any error raised by it."""
+        start = perf_counter()
+        try:
+            await self.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            error_title = f"Error in periodic task {self.name}: {err!s}"
+            bt.logging.error(error_title)
+            bt.logging.debug(str(print_exception(type(err), err, err.__traceback__)))
+            with suppress(Exception):
+                wandb.run.alert(error_title, error_title)
+
+        self.last_run_time = perf_counter() - start
+        self.runs += 1
+        bt.logging.info(f"Periodic task {self.name} finished in {self.last_run_time:.2f} seconds")
+        with suppress(Exception):
+            wandb.log({f"{self.name}_task_time": self.last_run_time})
+
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        next_run = loop.time() + self.initial_delay
+
+        while True:
+            delay = next_run - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await self.run_once()
+
+            next_run += self.interval
+            now = loop.time()
+            if next_run < now:
+                missed = int((now - next_run) // self.interval) + 1
+                bt.logging.warning(f"Periodic task {self.name} overran its period, skipping {missed} run(s)")
+                next_run += missed * self.interval
+
+
+async def run_periodic_tasks(tasks: list[PeriodicTask], should_exit: Callable[[], bool], poll_interval: float = 1):
+    """Run all tasks concurrently until `should_exit` returns True, then cancel them."""
+    running = [asyncio.create_task(task.run_forever(), name=task.name) for task in tasks]
+    try:
+        # `should_exit` is a plain flag set from another thread, so it is polled rather than awaited.
+        while not should_exit():  # noqa: ASYNC110
+            await asyncio.sleep(poll_interval)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
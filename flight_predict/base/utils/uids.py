@@ -1,4 +1,3 @@
-import random
 from typing import Optional
 
 import bittensor as bt
@@ -30,6 +29,32 @@ def check_uid_availability(metagraph: "bt.metagraph.Metagraph", uid: int, vpermi
     return True
 
 
+def get_availability_mask(metagraph: "bt.metagraph.Metagraph", vpermit_tao_limit: int) -> np.ndarray:
+    """Vectorized `check_uid_availability` over all uids of the metagraph.
+    Args:
+        metagraph (:obj: bt.metagraph.Metagraph): Metagraph object
+        vpermit_tao_limit (int): Validator permit tao limit
+    Returns:
+        mask (np.ndarray): Boolean mask, True for the available uids.
+    """
+    is_serving = np.fromiter((axon.is_serving for axon in metagraph.axons), dtype=bool, count=len(metagraph.axons))
+    validator_permit = np.asarray(metagraph.validator_permit, dtype=bool)
+    stake = np.asarray(metagraph.S, dtype=np.float64)
+    return is_serving & ~(validator_permit & (stake > vpermit_tao_limit))
+
+
+def get_cached_availability_mask(self) -> np.ndarray:
+    """Returns the availability mask, computed once per metagraph sync."""
+    vpermit_tao_limit = self.config.neuron.vpermit_tao_limit
+    cache_key = (int(np.asarray(self.metagraph.block).item()), len(self.metagraph.axons), vpermit_tao_limit)
+
+    cached = getattr(self, "_availability_mask_cache", None)
+    if cached is None or cached[0] != cache_key:
+        cached = (cache_key, get_availability_mask(self.metagraph, vpermit_tao_limit))
+        self._availability_mask_cache = cached
+    return cached[1]
+
+
 def get_available_miners(self, k: Optional[int] = None, exclude: list[int] | None = None) -> np.ndarray:
     """Returns k available random uids from the metagraph.
     Args:
@@ -39,29 +64,24 @@ def get_available_miners(self, k: Optional[int] = None, exclude: list[int] | Non
         uids (np.ndarray): Randomly sampled available uids.
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
+        If there are less than `k` not excluded uids, excluded available uids are used to fill the sample.
     """
-    candidate_uids = []
-    avail_uids = []
-
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(self.metagraph, uid, self.config.neuron.vpermit_tao_limit)
-        uid_is_not_excluded = exclude is None or uid not in exclude
+    avail_mask = get_cached_availability_mask(self)
+    candidate_mask = avail_mask.copy()
+    if exclude is not None and len(exclude) > 0:
+        candidate_mask[np.asarray(exclude, dtype=np.int64)] = False
 
-        if uid_is_available:
-            avail_uids.append(uid)
-            if uid_is_not_excluded:
-                candidate_uids.append(uid)
+    avail_count = int(np.count_nonzero(avail_mask))
+    candidate_uids = np.flatnonzero(candidate_mask)
 
     if k is None:
-        k = len(avail_uids)
+        k = avail_count
 
     # If k is larger than the number of available uids, set k to the number of available uids.
-    k = min(k, len(avail_uids))
+    k = min(k, avail_count)
     # Check if candidate_uids contain enough for querying, if not grab all avaliable uids
-    available_uids = candidate_uids
     if len(candidate_uids) < k:
-        available_uids += random.sample(
-            [uid for uid in avail_uids if uid not in candidate_uids],
-            k - len(candidate_uids),
-        )
-    return np.array(random.sample(available_uids, k))
+        excluded_uids = np.flatnonzero(avail_mask & ~candidate_mask)
+        fill_uids = np.random.choice(excluded_uids, k - len(candidate_uids), replace=False)
+        candidate_uids = np.concatenate([candidate_uids, fill_uids])
+    return np.random.choice(candidate_uids, k, replace=False)
@@ -22,9 +22,6 @@ import copy
 import datetime as dt
 import sys
 import threading
-import time
-from contextlib import suppress
-from traceback import print_exception
 from typing import List, Union
 
 import bittensor as bt
@@ -36,6 +33,8 @@ from flight_predict.base.neuron import BaseNeuron
 from flight_predict.base.utils.config import add_validator_args
 from flight_predict.base.utils.min_miners_alpha import calculate_minimum_miner_alpha
 from flight_predict.base.utils.mock import MockDendrite
+from flight_predict.base.utils.rounds import RoundExecutor
+from flight_predict.base.utils.scheduler import PeriodicTask, run_periodic_tasks
 from flight_predict.base.utils.weight_utils import convert_weights_and_uids_for_emit, process_weights_for_netuid
 
 
@@ -46,6 +45,10 @@ class BaseValidatorNeuron(BaseNeuron):
 
     neuron_type: str = "ValidatorNeuron"
     FORWARD_DELAY_SECONDS: int = 600  # 10 minutes
+    SYNC_INTERVAL_SECONDS: int = 60
+    SAVE_STATE_INTERVAL_SECONDS: int = 5 * 60  # 5 minutes
+    ROTATE_WANDB_INTERVAL_SECONDS: int = 60 * 60  # 1 hour
+    RESTART_WANDB_EVERY_HOURS: int = 12
 
     @classmethod
     def add_args(cls, parser: argparse.ArgumentParser):
@@ -83,6 +86,11 @@ class BaseValidatorNeuron(BaseNeuron):
         # Create asyncio event loop to manage async tasks.
         self.loop = asyncio.get_event_loop()
 
+        # Query rounds are pipelined, bounded by the in-flight rounds and outstanding requests caps.
+        self.round_executor = RoundExecutor(
+            self.config.neuron.max_inflight_rounds, self.config.neuron.max_outstanding_requests
+        )
+
         # Instantiate runners
         self.should_exit: bool = False
         self.is_running: bool = False
@@ -111,8 +119,63 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.error(f"Failed to create Axon initialize with exception: {e}")
 
     async def concurrent_forward(self):
-        coroutines = [self.forward() for _ in range(self.config.neuron.num_concurrent_forwards)]
-        await asyncio.gather(*coroutines)
+        """Starts `num_concurrent_forwards` rounds without waiting for the previous rounds to drain."""
+        for _ in range(self.config.neuron.num_concurrent_forwards):
+            await self.round_executor.start_round(self.forward)
+
+    async def forward_task(self):
+        """Starts the query rounds of this step and advances the step counter."""
+        bt.logging.info(f"step({self.step}) block({self.block}) rounds in flight({self.round_executor.inflight_rounds})")
+        await self.concurrent_forward()
+        self.step += 1
+
+    async def sync_task(self):
+        """
+        Registration check, metagraph resync and setting weights.
+        The blocking chain calls run in a worker thread on snapshots of the validator state, which is only updated
+        here on the event loop, so the rounds and the leaderboard never see a half-synced metagraph or scores.
+        """
+        await asyncio.to_thread(self.check_registered)
+
+        if await asyncio.to_thread(self.should_sync_metagraph):
+            self.apply_metagraph(*await asyncio.to_thread(self.fetch_metagraph))
+
+        if await asyncio.to_thread(self.should_set_weights):
+            await asyncio.to_thread(self.emit_weights, self.scores.copy(), self.metagraph)
+
+    async def save_state_task(self):
+        self.save_state()
+
+    async def rotate_wandb_task(self):
+        if self.config.wandb.off:
+            return
+
+        if (dt.datetime.now() - self.wandb_run_start) >= dt.timedelta(hours=self.RESTART_WANDB_EVERY_HOURS):
+            bt.logging.info(
+                f"Current wandb run is more than {self.RESTART_WANDB_EVERY_HOURS} hours old. Starting a new run."
+            )
+            self.wandb_run.finish()
+            self.init_wandb()
+
+    def periodic_tasks(self) -> list[PeriodicTask]:
+        """
+        Returns the independent periodic tasks driven by the validator event loop.
+        Subclasses can extend the list with their own tasks.
+        """
+        return [
+            PeriodicTask("forward", self.forward_task, self.FORWARD_DELAY_SECONDS),
+            PeriodicTask("sync", self.sync_task, self.SYNC_INTERVAL_SECONDS, initial_delay=self.SYNC_INTERVAL_SECONDS),
+            PeriodicTask(
+                "save_state",
+                self.save_state_task,
+                self.SAVE_STATE_INTERVAL_SECONDS,
+                initial_delay=self.SAVE_STATE_INTERVAL_SECONDS,
+            ),
+            PeriodicTask("rotate_wandb", self.rotate_wandb_task, self.ROTATE_WANDB_INTERVAL_SECONDS),
+        ]
+
+    async def flush_writes(self):
+        """Stores the writes still buffered once the rounds are drained. Subclasses buffering writes override it."""
 
     def run(self):
         """
@@ -121,11 +184,13 @@ class BaseValidatorNeuron(BaseNeuron):
 
         This function performs the following primary tasks:
         1. Check for registration on the Bittensor network.
-        2. Continuously forwards queries to the miners on the network, rewarding their responses and updating the scores accordingly.
-        3. Periodically resynchronizes with the chain; updating the metagraph with the latest network state and setting weights.
+        2. Starts the periodic tasks returned by `periodic_tasks` on a single persistent event loop: query rounds,
+           metagraph sync and weights, state checkpointing and any task added by the subclass.
+        3. Stops the tasks when `should_exit` is set, waits for the rounds in flight, flushes their buffered writes
+           and saves the validator state.
 
-        The essence of the validator's operations is in the forward function, which is called every step.
-        The forward function is responsible for querying the network and scoring the responses.
+        Every task runs on its own drift-free schedule, so a slow task never delays the next run of another one.
+        The forward function is responsible for querying the network and storing the responses.
 
         Note:
             - The function leverages the global configurations set during the initialization of the miner.
@@ -139,55 +204,24 @@ class BaseValidatorNeuron(BaseNeuron):
         # Check that validator is registered on the network.
         self.sync()
 
-        restart_wandb_every_hours = 12
         bt.logging.info(f"Validator starting at block: {self.block}")
 
-        # This loop maintains the validator's operations until intentionally stopped.
-        while True:
-            try:
-                bt.logging.info(f"step({self.step}) block({self.block})")
-
-                # Run multiple forwards concurrently.
-                self.loop.run_until_complete(self.concurrent_forward())
-
-                if not self.config.wandb.off:
-                    if (dt.datetime.now() - self.wandb_run_start) >= dt.timedelta(hours=restart_wandb_every_hours):
-                        bt.logging.info(
-                            f"Current wandb run is more than {restart_wandb_every_hours} hours old. Starting a new run."
-                        )
-                        self.wandb_run.finish()
-                        self.init_wandb()
-
-                # Check if we should exit.
-                if self.should_exit:
-                    if not self.config.wandb.off:
-                        self.wandb_run.finish()
-                    break
-
-                # Sync metagraph and potentially set weights.
-                self.sync()
-                self.step += 1
-
-                # Wait for the next step.
-                time.sleep(self.FORWARD_DELAY_SECONDS)
-
-            # If someone intentionally stops the validator, it'll safely terminate operations.
-            except KeyboardInterrupt:
-                self.axon.stop()
-                bt.logging.success("Validator killed by keyboard interrupt.")
-                if not self.config.wandb.off:
-                    self.wandb_run.finish()
-                sys.exit()
-
-            # In case of unforeseen errors, the validator will log the error and continue operations.
-            except Exception as err:
-                error_title = f"Error during validation: {err!s}"
-                error_text = str(print_exception(type(err), err, err.__traceback__))
-                bt.logging.error(error_title)
-                bt.logging.debug(error_text)
-                with suppress(Exception):
-                    wandb.run.alert(error_title, error_text)
-                time.sleep(self.FORWARD_DELAY_SECONDS)
+        try:
+            self.loop.run_until_complete(run_periodic_tasks(self.periodic_tasks(), lambda: self.should_exit))
+            self.loop.run_until_complete(self.round_executor.drain())
+            self.loop.run_until_complete(self.flush_writes())
+
+        # If someone intentionally stops the validator, it'll safely terminate operations.
+        except KeyboardInterrupt:
+            self.axon.stop()
+            bt.logging.success("Validator killed by keyboard interrupt.")
+            if not self.config.wandb.off:
+                self.wandb_run.finish()
+            sys.exit()
+
+        self.save_state()
+        if not self.config.wandb.off:
+            self.wandb_run.finish()
 
     def run_in_background_thread(self):
         """
@@ -242,9 +276,16 @@ class BaseValidatorNeuron(BaseNeuron):
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners.
         The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
         """
+        self.emit_weights(self.scores.copy(), self.metagraph)
+
+    def emit_weights(self, scores: np.ndarray, metagraph: "bt.metagraph"):
+        """
+        Sets the weights derived from the given scores on chain. Only reads its arguments, so it can run in a worker
+        thread on a snapshot of the validator state.
+        """
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if np.isnan(self.scores).any():
+        # Check if scores contains any NaN values and log a warning if it does.
+        if np.isnan(scores).any():
             bt.logging.warning(
                 "Scores contain NaN values."
                 "This may be due to a lack of responses from miners, or a bug in your reward functions."
@@ -253,27 +294,27 @@ class BaseValidatorNeuron(BaseNeuron):
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
         # Compute the norm of the scores
-        norm = np.linalg.norm(self.scores, ord=1, axis=0, keepdims=True)
+        norm = np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
 
         # Check if the norm is zero or contains NaN values
         if np.any(norm == 0) or np.isnan(norm).any():
             norm = np.ones_like(norm)  # Avoid division by zero or NaN
 
         # Compute raw_weights safely
-        raw_weights = self.scores / norm
+        raw_weights = scores / norm
 
         bt.logging.debug("raw_weights", raw_weights.tolist())
-        bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
+        bt.logging.debug("raw_weight_uids", str(metagraph.uids.tolist()))
         # Process the raw weights to final_weights via subtensor limitations.
         (
             processed_weight_uids,
             processed_weights,
         ) = process_weights_for_netuid(
-            uids=self.metagraph.uids,
+            uids=metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
             subtensor=self.subtensor,
-            metagraph=self.metagraph,
+            metagraph=metagraph,
         )
         bt.logging.debug("processed_weights", processed_weights.tolist())
         bt.logging.debug("processed_weight_uids", processed_weight_uids.tolist())
@@ -339,15 +380,24 @@ class BaseValidatorNeuron(BaseNeuron):
 
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
-        bt.logging.info("resync_metagraph()")
+        self.apply_metagraph(*self.fetch_metagraph())
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
+    def fetch_metagraph(self) -> tuple["bt.metagraph", np.ndarray]:
+        """
+        Blocking part of the resync: a synced copy of the metagraph and the stake check of its miners.
+        The validator state is left untouched, so it can run in a worker thread.
+        """
+        bt.logging.info("resync_metagraph()")
 
-        # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+        metagraph = copy.deepcopy(self.metagraph)
+        metagraph.sync(subtensor=self.subtensor)
+        return metagraph, self._calculate_has_enough_stake(metagraph)
 
-        self._calculate_has_enough_stake()
+    def apply_metagraph(self, metagraph: "bt.metagraph", has_enough_stake: np.ndarray):
+        """Replaces the metagraph and updates the hotkeys and moving averages based on it."""
+        previous_metagraph = self.metagraph
+        self.metagraph = metagraph
+        self.has_enough_stake = has_enough_stake
 
         # Check if the metagraph axon info has changed.
         if previous_metagraph.axons == self.metagraph.axons:
@@ -443,15 +493,15 @@ class BaseValidatorNeuron(BaseNeuron):
 
         bt.logging.success(f"Started wandb run {run_name}")
 
-    def _calculate_has_enough_stake(self):
-        self.has_enough_stake = np.ones(len(self.metagraph.hotkeys), dtype=np.float32)
+    def _calculate_has_enough_stake(self, metagraph: "bt.metagraph") -> np.ndarray:
+        has_enough_stake_mask = np.ones(len(metagraph.hotkeys), dtype=np.float32)
 
         if not self.config.neuron.enable_minimum_miner_alpha:
-            return
+            return has_enough_stake_mask
 
         coldkey_stake = {}
         #  Consider that several hotkeys can be associated with the same coldkey.
-        for coldkey in np.unique(self.metagraph.coldkeys):
+        for coldkey in np.unique(metagraph.coldkeys):
             coldkey_stake[coldkey] = 0
             for hotkey_stake in self.subtensor.get_stake_for_coldkey(coldkey):
                 coldkey_stake[coldkey] += hotkey_stake.stake.tao if hotkey_stake.netuid == self.config.netuid else 0
@@ -460,10 +510,12 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.info(f"min_miner_alpha: {min_miner_alpha}")
 
         not_enough_stake_uids = []
-        for i, coldkey in enumerate(self.metagraph.coldkeys):
+        for i, coldkey in enumerate(metagraph.coldkeys):
             has_enough_stake = int(coldkey_stake[coldkey] - min_miner_alpha >= 0)
-            self.has_enough_stake[i] = has_enough_stake
+            has_enough_stake_mask[i] = has_enough_stake
             if has_enough_stake == 0:
                 not_enough_stake_uids.append(i)
 
             coldkey_stake[coldkey] -= min_miner_alpha
+
+        return has_enough_stake_mask
@@ -0,0 +1,110 @@
+"""
+Bulk writes of any size through binary COPY.
+
+Rows are copied with asyncpg's binary COPY into a temporary staging table holding only the written columns, then
+merged into the target table with a single `INSERT ... SELECT` keeping the `ON CONFLICT` semantics of the regular
+inserts. A statement never carries more than a handful of bind parameters, so the Postgres limit of 32767 parameters
+per statement does not apply, and rows are copied in chunks of `BULK_CHUNK_SIZE` to bound the memory of a copy.
+Small batches keep the regular multi-VALUES insert, which needs a single round trip.
+"""
+
+from typing import Any, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+BULK_CHUNK_SIZE = 50_000
+# Below this number of rows a multi-VALUES insert is faster than the staging round trips, and stays far below the
+# bind parameters limit for every table written in bulk.
+COPY_THRESHOLD = 1_000
+
+MINER_PREDICTIONS_COLUMNS = ("miner_hotkey", "miner_uid", "flight_id", "predicted_arrival_time", "is_valid")
+ACTUAL_FLIGHTS_COLUMNS = ("flight_id", "actual_departure_time", "actual_arrival_time", "is_unmatched")
+SCORED_PREDICTIONS_COLUMNS = (
+    "flight_id",
+    "prediction_id",
+    "miner_hotkey",
+    "actual_arrival_time",
+    "predicted_arrival_time",
+    "absolute_prediction_error_seconds",
+    "is_correct",
+    "international_flight_coef",
+    "early_prediction_coef",
+    "final_score",
+)
+LEADERBOARD_SNAPSHOTS_COLUMNS = (
+    "miner_uid",
+    "miner_hotkey",
+    "score_sum",
+    "predictions_count",
+    "predictions_count_coeff",
+    "adjusted_score",
+    "leaderboard_position",
+    "rang",
+    "final_score",
+)
+
+
+def staging_table_name(table: str) -> str:
+    return f"{table}_staging"
+
+
+def to_records(rows: Iterable[dict[str, Any]], columns: tuple[str, ...]) -> list[tuple]:
+    """Tuples of the given columns of dict rows, missing keys are NULL."""
+    return [tuple(row.get(column) for column in columns) for row in rows]
+
+
+async def create_staging_table(conn: AsyncConnection, table: str, columns: tuple[str, ...]) -> str:
+    """
+    Create the session staging table of `table` with only the given columns, without constraints or defaults.
+    It is created once per pooled connection, emptied on every commit, and the statement also opens the
+    SQLAlchemy transaction the raw COPY joins.
+    """
+    staging = staging_table_name(table)
+    query = f"""
+        CREATE TEMPORARY TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS
+        AS SELECT {", ".join(columns)} FROM {table} WITH NO DATA;
+    """  # noqa: S608
+    await conn.execute(text(query))
+    return staging
+
+
+async def copy_records(conn: AsyncConnection, table: str, columns: tuple[str, ...], records: list[tuple]):
+    """Binary COPY of records into a table through the asyncpg connection under `conn`, in its transaction."""
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(table, records=records, columns=list(columns))
+
+
+async def bulk_write(
+    conn: AsyncConnection,
+    table: str,
+    columns: tuple[str, ...],
+    records: list[tuple],
+    merge: str | None = None,
+    parameters: dict[str, Any] | None = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """
+    Write records to `table` through its staging table, chunk by chunk, and return the number of merged rows.
+
+    `merge` is the statement moving a chunk from the staging table, named `{staging}` in it, to the target table.
+    It defaults to inserting all the columns and skipping the conflicting rows. `parameters` are bound to it.
+    """
+    staging = await create_staging_table(conn, table, columns)
+    if merge is None:
+        column_list = ", ".join(columns)
+        merge = f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {{staging}}
+            ON CONFLICT DO NOTHING;
+        """  # noqa: S608
+
+    merged = 0
+    for start in range(0, len(records), chunk_size):
+        # The staging table may hold the rows of a previous write of the same transaction.
+        await conn.execute(text(f"DELETE FROM {staging}"))  # noqa: S608
+        await copy_records(conn, staging, columns, records[start : start + chunk_size])
+        result = await conn.execute(text(merge.format(staging=staging)), parameters or {})
+        merged += max(result.rowcount, 0)
+
+    return merged
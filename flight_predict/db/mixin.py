@@ -1,15 +1,41 @@
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
 from time import perf_counter
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator
 
+import numpy as np
 import wandb
-from sqlalchemy import text
+from sqlalchemy import event, text, update
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
 from sqlalchemy.future import select
 
-from flight_predict.db.models import ActualFlights, LeaderboardSnapshots, MinerPredictions, ScheduledFlights, ScoredPredictions
-from flight_predict.settings import POSTGRES_DB, POSTGRES_HOST, POSTGRES_PASSWORD, POSTGRES_PORT, POSTGRES_USER
+from flight_predict.db.bulk import (
+    ACTUAL_FLIGHTS_COLUMNS,
+    COPY_THRESHOLD,
+    LEADERBOARD_SNAPSHOTS_COLUMNS,
+    MINER_PREDICTIONS_COLUMNS,
+    SCORED_PREDICTIONS_COLUMNS,
+    bulk_write,
+    to_records,
+)
+from flight_predict.db.models import ActualFlights, MinerPredictions, MinerResponseStats, ScheduledFlights, ScoredPredictions
+from flight_predict.settings import (
+    POSTGRES_DB,
+    POSTGRES_HOST,
+    POSTGRES_MAX_OVERFLOW,
+    POSTGRES_PASSWORD,
+    POSTGRES_POOL_PRE_PING,
+    POSTGRES_POOL_RECYCLE,
+    POSTGRES_POOL_SIZE,
+    POSTGRES_POOL_TIMEOUT,
+    POSTGRES_PORT,
+    POSTGRES_USER,
+)
+
+# Connection of the unit of work running in the current task, shared by the writes made inside it.
+_unit_of_work_connection: ContextVar[AsyncConnection | None] = ContextVar("unit_of_work_connection", default=None)
 
 
 def wandb_performance(coro):
@@ -41,56 +67,424 @@ class DatabaseMixin:
     """Provides reusable database operations with automatic session management."""
 
     db_engine = None  # To be set by the class inheriting this mixin
+    db_pool_checkouts = 0
 
     @classmethod
     def configure_database(cls, database_url: str = ""):
-        """Configure the database engine and session maker."""
+        """Configure the database engine and its connection pool from the settings."""
         database_url = (
             database_url
             or f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
         )
-        cls.db_engine = create_async_engine(database_url, echo=False, future=True)
+        cls.db_engine = create_async_engine(
+            database_url,
+            echo=False,
+            future=True,
+            pool_size=POSTGRES_POOL_SIZE,
+            max_overflow=POSTGRES_MAX_OVERFLOW,
+            pool_timeout=POSTGRES_POOL_TIMEOUT,
+            pool_recycle=POSTGRES_POOL_RECYCLE,
+            pool_pre_ping=POSTGRES_POOL_PRE_PING,
+        )
+
+        def count_checkout(*_):
+            cls.db_pool_checkouts += 1
+
+        event.listen(cls.db_engine.sync_engine, "checkout", count_checkout)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """Connection of the running unit of work, or a connection of its own committed when the block exits."""
+        conn = _unit_of_work_connection.get()
+        if conn is not None:
+            yield conn
+            return
+
+        async with self.db_engine.connect() as conn:
+            yield conn
+            await conn.commit()
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Run the writes of the block on one connection and in one transaction, committed when the block exits and
+        rolled back on error. A nested unit of work joins the running one. The writes of a unit of work must not
+        run concurrently, as they share the connection. Reads keep their own connections.
+        """
+        if _unit_of_work_connection.get() is not None:
+            async with self.connection() as conn:
+                yield conn
+            return
+
+        async with self.db_engine.connect() as conn:
+            token = _unit_of_work_connection.set(conn)
+            try:
+                yield conn
+                await conn.commit()
+            finally:
+                _unit_of_work_connection.reset(token)
+
+    def database_pool_metrics(self) -> dict[str, int]:
+        """Usage of the connection pool, and the number of checkouts since the engine was configured."""
+        pool = self.db_engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.db_pool_checkouts,
+        }
+
+    def log_database_pool_metrics(self) -> dict[str, int]:
+        """Log the usage of the connection pool to Weights & Biases and return it."""
+        metrics = self.database_pool_metrics()
+        with suppress(Exception):
+            wandb.log({f"db_pool_{name}": value for name, value in metrics.items()})
+        return metrics
 
     @wandb_performance
     async def insert_scheduled_flight(self, flight: dict[str, Any]):
         """Store scheduled flight details in the database."""
-        async with self.db_engine.connect() as conn:
+        async with self.connection() as conn:
             await conn.execute(insert(ScheduledFlights).values(flight).on_conflict_do_nothing())
-            await conn.commit()
+
+    @wandb_performance
+    async def insert_scheduled_flights(self, flights: list[dict[str, Any]]):
+        """Store the details of several scheduled flights in the database."""
+        async with self.connection() as conn:
+            await conn.execute(insert(ScheduledFlights).values(flights).on_conflict_do_nothing())
 
     @wandb_performance
     async def insert_miner_predictions(self, predictions: list[dict]):
-        """Store miner predictions in the database."""
+        """Store miner predictions in the database, large batches are copied in bulk."""
+        async with self.connection() as conn:
+            if len(predictions) > COPY_THRESHOLD:
+                records = to_records(predictions, MINER_PREDICTIONS_COLUMNS)
+                await bulk_write(conn, "miner_predictions", MINER_PREDICTIONS_COLUMNS, records)
+            else:
+                await conn.execute(insert(MinerPredictions).values(predictions).on_conflict_do_nothing())
+
+    @wandb_performance
+    async def insert_miner_response_stats(self, response_stats: list[dict[str, Any]]):
+        """Store per-response telemetry of a query round in the database."""
+        if not response_stats:
+            return
+
+        async with self.connection() as conn:
+            await conn.execute(insert(MinerResponseStats).values(response_stats))
+
+    async def fetch_miner_response_percentiles(
+        self, window: timedelta, miner_hotkeys: list[str] | None = None
+    ) -> dict[str, dict[str, float]]:
+        """Per-miner latency percentiles, timeouts and invalid responses over the last `window`."""
+        query = """
+            SELECT
+                miner_hotkey,
+                COUNT(*) AS responses_count,
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_seconds) AS latency_p50,
+                percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_seconds) AS latency_p95,
+                percentile_cont(0.99) WITHIN GROUP (ORDER BY latency_seconds) AS latency_p99,
+                COUNT(CASE WHEN status_code = 408 THEN 1 END) AS timeouts_count,
+                COUNT(CASE WHEN NOT is_valid THEN 1 END) AS invalid_count,
+                AVG(payload_size) AS payload_size_avg
+            FROM miner_response_stats
+            WHERE created_at > NOW() - CAST(:window AS INTERVAL)
+            AND (CAST(:miner_hotkeys AS VARCHAR[]) IS NULL OR miner_hotkey = ANY(:miner_hotkeys))
+            GROUP BY miner_hotkey;
+        """
+
         async with self.db_engine.connect() as conn:
-            await conn.execute(insert(MinerPredictions).values(predictions).on_conflict_do_nothing())
-            await conn.commit()
+            result = await conn.execute(text(query), {"window": window, "miner_hotkeys": miner_hotkeys})
+            rows = result.fetchall()
+
+        return {
+            row.miner_hotkey: {
+                "responses_count": row.responses_count,
+                "latency_p50": row.latency_p50,
+                "latency_p95": row.latency_p95,
+                "latency_p99": row.latency_p99,
+                "timeouts_count": row.timeouts_count,
+                "invalid_count": row.invalid_count,
+                "payload_size_avg": float(row.payload_size_avg) if row.payload_size_avg is not None else None,
+            }
+            for row in rows
+        }
 
     @wandb_performance
     async def insert_actual_flights(self, flights: list[dict[str, Any]]):
-        async with self.db_engine.connect() as conn:
-            await conn.execute(insert(ActualFlights).values(list(flights)).on_conflict_do_nothing())
-            await conn.commit()
+        async with self.connection() as conn:
+            if len(flights) > COPY_THRESHOLD:
+                records = to_records(flights, ACTUAL_FLIGHTS_COLUMNS)
+                await bulk_write(conn, "actual_flights", ACTUAL_FLIGHTS_COLUMNS, records)
+            else:
+                await conn.execute(insert(ActualFlights).values(list(flights)).on_conflict_do_nothing())
 
     @wandb_performance
     async def insert_scored_predictions(self, scored_predictions: list[dict[str, Any]]):
-        async with self.db_engine.connect() as conn:
+        """
+        Store scored predictions and mark their predictions as scored in the same transaction.
+        Large batches are copied in bulk and marked from the staging table by the statement which inserts them.
+        """
+        if not scored_predictions:
+            return
+
+        if len(scored_predictions) > COPY_THRESHOLD:
+            columns = ", ".join(SCORED_PREDICTIONS_COLUMNS)
+            merge = f"""
+                WITH inserted AS (
+                    INSERT INTO scored_predictions ({columns})
+                    SELECT {columns} FROM {{staging}}
+                    ON CONFLICT DO NOTHING
+                )
+                UPDATE miner_predictions SET is_scored = TRUE
+                FROM {{staging}} AS s
+                WHERE miner_predictions.id = s.prediction_id;
+            """  # noqa: S608
+            records = to_records(scored_predictions, SCORED_PREDICTIONS_COLUMNS)
+            async with self.connection() as conn:
+                await bulk_write(conn, "scored_predictions", SCORED_PREDICTIONS_COLUMNS, records, merge=merge)
+            return
+
+        prediction_ids = [scored_prediction["prediction_id"] for scored_prediction in scored_predictions]
+        async with self.connection() as conn:
             await conn.execute(insert(ScoredPredictions).values(scored_predictions).on_conflict_do_nothing())
-            await conn.commit()
+            await conn.execute(
+                update(MinerPredictions).where(MinerPredictions.id.in_(prediction_ids)).values(is_scored=True)
+            )
+
+    @wandb_performance
+    async def score_predictions(
+        self, flight_ids: list[int], international_flight_coef: float, early_prediction_coef: float
+    ) -> int:
+        """
+        Score the not yet scored predictions of the given flights inside Postgres.
+
+        Predictions are marked as scored and joined with their actual flights in one statement, so no prediction
+        is marked without being scored. The error is truncated to whole seconds like asyncpg does for the Python
+        engine, so both engines store the same rows. Returns the number of inserted scored predictions.
+        """
+        query = """
+            WITH predictions AS (
+                UPDATE miner_predictions AS mp
+                SET is_scored = TRUE
+                FROM actual_flights AS af
+                WHERE af.flight_id = mp.flight_id
+                AND mp.flight_id = ANY(:flight_ids)
+                AND NOT mp.is_scored
+                RETURNING mp.id, mp.flight_id, mp.miner_hotkey, mp.predicted_arrival_time, af.actual_arrival_time,
+                    mp.is_valid AND NOT COALESCE(af.is_unmatched, FALSE) AS is_correct
+            ), scored AS (
+                SELECT *,
+                    CAST(:international_flight_coef AS FLOAT) AS international_flight_coef,
+                    CAST(:early_prediction_coef AS FLOAT) AS early_prediction_coef,
+                    CASE
+                        WHEN is_correct THEN ABS(EXTRACT(EPOCH FROM predicted_arrival_time - actual_arrival_time))
+                        ELSE -1
+                    END AS diff
+                FROM predictions
+            )
+            INSERT INTO scored_predictions (
+                flight_id, prediction_id, miner_hotkey, actual_arrival_time, predicted_arrival_time,
+                absolute_prediction_error_seconds, is_correct, international_flight_coef, early_prediction_coef,
+                final_score
+            )
+            SELECT
+                flight_id, id, miner_hotkey, actual_arrival_time, predicted_arrival_time,
+                TRUNC(diff), is_correct, international_flight_coef, early_prediction_coef,
+                diff * international_flight_coef * early_prediction_coef
+            FROM scored
+            ON CONFLICT DO NOTHING;
+        """
+
+        async with self.connection() as conn:
+            result = await conn.execute(
+                text(query),
+                {
+                    "flight_ids": flight_ids,
+                    "international_flight_coef": international_flight_coef,
+                    "early_prediction_coef": early_prediction_coef,
+                },
+            )
+
+        return result.rowcount
+
+    @wandb_performance
+    async def fetch_unscored_predictions(self, flight_ids: list[int]) -> dict[str, np.ndarray]:
+        """
+        Fetch the not yet scored predictions of the given flights as columns.
+
+        Each column is aggregated into a single Postgres array, so the rows are not materialized one by one in
+        Python. Times are epoch microseconds, a missing predicted time is stored as 0 and makes the prediction invalid.
+        """
+        query = """
+            SELECT
+                array_agg(id) AS id,
+                array_agg(flight_id) AS flight_id,
+                array_agg(
+                    COALESCE(CAST(ROUND(EXTRACT(EPOCH FROM predicted_arrival_time) * 1000000) AS BIGINT), 0)
+                ) AS predicted_arrival_time,
+                array_agg(is_valid AND predicted_arrival_time IS NOT NULL) AS is_valid
+            FROM miner_predictions
+            WHERE flight_id = ANY(:flight_ids)
+            AND NOT is_scored;
+        """
+
+        async with self.db_engine.connect() as conn:
+            result = await conn.execute(text(query), {"flight_ids": flight_ids})
+            row = result.one()
+
+        return {
+            "id": np.array(row.id or [], dtype=np.int64),
+            "flight_id": np.array(row.flight_id or [], dtype=np.int64),
+            "predicted_arrival_time": np.array(row.predicted_arrival_time or [], dtype=np.int64),
+            "is_valid": np.array(row.is_valid or [], dtype=bool),
+        }
+
+    @wandb_performance
+    async def insert_scored_predictions_arrays(
+        self, scored: dict[str, np.ndarray], international_flight_coef: float, early_prediction_coef: float
+    ):
+        """
+        Store columnar scored predictions and mark their predictions as scored in the same transaction.
+
+        The columns are sent as one array parameter each and unnested by Postgres. The other columns are joined
+        from the prediction and its actual flight. NaN errors and scores are stored as NULL.
+        """
+        if not len(scored["prediction_id"]):
+            return
+
+        query = """
+            INSERT INTO scored_predictions (
+                flight_id, prediction_id, miner_hotkey, actual_arrival_time, predicted_arrival_time,
+                absolute_prediction_error_seconds, is_correct, international_flight_coef, early_prediction_coef,
+                final_score
+            )
+            SELECT
+                mp.flight_id, mp.id, mp.miner_hotkey, af.actual_arrival_time, mp.predicted_arrival_time,
+                TRUNC(NULLIF(s.error, 'NaN')), s.is_correct, CAST(:international_flight_coef AS FLOAT),
+                CAST(:early_prediction_coef AS FLOAT), NULLIF(s.final_score, 'NaN')
+            FROM unnest(
+                CAST(:prediction_ids AS INT[]),
+                CAST(:errors AS FLOAT[]),
+                CAST(:is_correct AS BOOLEAN[]),
+                CAST(:final_scores AS FLOAT[])
+            ) AS s(prediction_id, error, is_correct, final_score)
+            JOIN miner_predictions AS mp ON mp.id = s.prediction_id
+            JOIN actual_flights AS af ON af.flight_id = mp.flight_id
+            ON CONFLICT DO NOTHING;
+        """
+
+        prediction_ids = scored["prediction_id"].tolist()
+        async with self.connection() as conn:
+            await conn.execute(
+                text(query),
+                {
+                    "prediction_ids": prediction_ids,
+                    "errors": scored["absolute_prediction_error_seconds"].tolist(),
+                    "is_correct": scored["is_correct"].tolist(),
+                    "final_scores": scored["final_score"].tolist(),
+                    "international_flight_coef": international_flight_coef,
+                    "early_prediction_coef": early_prediction_coef,
+                },
+            )
+            await conn.execute(
+                text("UPDATE miner_predictions SET is_scored = TRUE WHERE id = ANY(CAST(:prediction_ids AS INT[]))"),
+                {"prediction_ids": prediction_ids},
+            )
 
     async def stream_miner_predictions(self, flight_ids: list[int]) -> AsyncGenerator[MinerPredictions, None]:
-        """Stream miner predictions from the database."""
+        """Stream the not yet scored miner predictions of the given flights from the database."""
         async with self.db_engine.connect() as conn:
             miner_predictions_stream: AsyncGenerator[MinerPredictions] = await conn.stream(
-                select(MinerPredictions).where(MinerPredictions.flight_id.in_(flight_ids))
+                select(MinerPredictions).where(MinerPredictions.flight_id.in_(flight_ids), ~MinerPredictions.is_scored)
             )
             async for prediction in miner_predictions_stream:
                 yield prediction
 
     @wandb_performance
     async def update_last_scored_predictions(self):
+        """
+        Expire the rows older than 48 hours from `last_scored_predictions`.
+        New scored predictions are added by a trigger in the transaction inserting them, so the cost of an update
+        only depends on the number of expired rows.
+        """
+        async with self.connection() as conn:
+            await conn.execute(text("DELETE FROM last_scored_predictions WHERE created_at <= NOW() - INTERVAL '48 hours'"))
+
+    async def stream_scored_predictions(
+        self, after_id: int, window: timedelta, batch_size: int = 10_000
+    ) -> AsyncGenerator[dict[str, np.ndarray], None]:
+        """
+        Stream the `last_scored_predictions` rows of the last `window` with an id above `after_id`, in id order and
+        in batches of columns. `created_at` is in epoch seconds.
+        """
+        query = """
+            SELECT
+                id,
+                miner_hotkey,
+                COALESCE(final_score, 0) AS final_score,
+                COALESCE(is_correct, FALSE) AS is_correct,
+                EXTRACT(EPOCH FROM CAST(created_at AS TIMESTAMPTZ)) AS created_at
+            FROM last_scored_predictions
+            WHERE id > :after_id
+            AND created_at > NOW() - CAST(:window AS INTERVAL)
+            ORDER BY id;
+        """
+
         async with self.db_engine.connect() as conn:
-            await conn.execute(text("REFRESH MATERIALIZED VIEW last_scored_predictions"))
-            await conn.commit()
+            result = await conn.stream(text(query), {"after_id": after_id, "window": window})
+            async for rows in result.partitions(batch_size):
+                ids, miner_hotkeys, final_scores, is_correct, created_at = zip(*rows, strict=True)
+                yield {
+                    "id": np.array(ids, dtype=np.int64),
+                    "miner_hotkey": np.array(miner_hotkeys, dtype=object),
+                    "final_score": np.array(final_scores, dtype=np.float64),
+                    "is_correct": np.array(is_correct, dtype=bool),
+                    "created_at": np.array(created_at, dtype=np.float64).astype(np.int64),
+                }
+
+    async def stream_scored_history(
+        self, since: datetime, batch_size: int = 50_000
+    ) -> AsyncGenerator[dict[str, np.ndarray], None]:
+        """
+        Stream the scored predictions created after `since` with the uid of the miner and the kind of the flight,
+        in id order and in batches of columns. As in `last_scored_predictions`, flights without actual arrival time
+        are left out. `error_seconds` is the final score without its coefficients and `created_at` is in epoch seconds.
+        """
+        query = """
+            SELECT
+                sp.id,
+                sp.miner_hotkey,
+                mp.miner_uid,
+                COALESCE(sp.is_correct, FALSE) AS is_correct,
+                COALESCE(
+                    sp.final_score
+                    / NULLIF(COALESCE(sp.international_flight_coef, 1) * COALESCE(sp.early_prediction_coef, 1), 0),
+                    0
+                ) AS error_seconds,
+                COALESCE(sf.is_domestic, FALSE) AS is_domestic,
+                EXTRACT(EPOCH FROM CAST(sp.created_at AS TIMESTAMPTZ)) AS created_at
+            FROM scored_predictions AS sp
+            JOIN miner_predictions AS mp ON mp.id = sp.prediction_id
+            LEFT JOIN scheduled_flights AS sf ON sf.flight_id = sp.flight_id
+            WHERE sp.created_at > :since
+            AND sp.actual_arrival_time IS NOT NULL
+            ORDER BY sp.id;
+        """
+
+        async with self.db_engine.connect() as conn:
+            result = await conn.stream(text(query), {"since": since})
+            async for rows in result.partitions(batch_size):
+                ids, miner_hotkeys, miner_uids, is_correct, error_seconds, is_domestic, created_at = zip(*rows, strict=True)
+                yield {
+                    "id": np.array(ids, dtype=np.int64),
+                    "miner_hotkey": np.array(miner_hotkeys, dtype=object),
+                    "miner_uid": np.array(miner_uids, dtype=np.int64),
+                    "is_correct": np.array(is_correct, dtype=bool),
+                    "error_seconds": np.array(error_seconds, dtype=np.float64),
+                    "is_domestic": np.array(is_domestic, dtype=bool),
+                    "created_at": np.array(created_at, dtype=np.float64).astype(np.int64),
+                }
 
     @wandb_performance
     async def fetch_miner_scores(self, miner_hotkeys: list[str], last_n_predictions: int) -> dict[str, dict[str, float]]:
@@ -130,11 +524,160 @@ class DatabaseMixin:
             if row.predictions_count is not None and row.predictions_count > 0
         }
 
-    async def insert_leaderboard_snapshots(self, snapshots: list[dict]):
-        """Insert leaderboard snapshot data into the database."""
-        if not snapshots:
+    @wandb_performance
+    async def insert_leaderboard_snapshot(
+        self, leaderboard: dict[str, np.ndarray], rang_power: float, evaluation_window_size: int
+    ):
+        """
+        Insert a snapshot of the whole leaderboard, given as columns in rank order, with a single statement.
+        Every column is sent as one array parameter and all the rows share the same creation time, a leaderboard
+        larger than the copy threshold is copied in bulk instead.
+        The hourly and daily rollups are upserted from the inserted rows in the same statement.
+        """
+        leaderboard_size = len(leaderboard["uid"])
+        if not leaderboard_size:
             return
-        
+
+        is_bulk = leaderboard_size > COPY_THRESHOLD
+        source = (
+            "{staging} AS s"
+            if is_bulk
+            else """
+                unnest(
+                    CAST(:miner_uids AS INT[]),
+                    CAST(:miner_hotkeys AS VARCHAR[]),
+                    CAST(:score_sums AS FLOAT[]),
+                    CAST(:predictions_counts AS INT[]),
+                    CAST(:predictions_count_coeffs AS FLOAT[]),
+                    CAST(:adjusted_scores AS FLOAT[]),
+                    CAST(:rangs AS INT[]),
+                    CAST(:final_scores AS FLOAT[])
+                ) WITH ORDINALITY AS s(
+                    miner_uid, miner_hotkey, score_sum, predictions_count, predictions_count_coeff, adjusted_score, rang,
+                    final_score, leaderboard_position
+                )
+            """
+        )
+
+        rollup = """
+            INSERT INTO {table}
+            SELECT
+                date_trunc('{resolution}', created_at), miner_hotkey, MAX(miner_uid), COUNT(*), SUM(final_score),
+                SUM(adjusted_score), SUM(leaderboard_position), MIN(leaderboard_position), MAX(leaderboard_position)
+            FROM inserted
+            GROUP BY 1, 2
+            ON CONFLICT (bucket, miner_hotkey) DO UPDATE SET
+                miner_uid = EXCLUDED.miner_uid,
+                snapshots_count = {table}.snapshots_count + EXCLUDED.snapshots_count,
+                final_score_sum = {table}.final_score_sum + EXCLUDED.final_score_sum,
+                adjusted_score_sum = {table}.adjusted_score_sum + EXCLUDED.adjusted_score_sum,
+                leaderboard_position_sum = {table}.leaderboard_position_sum + EXCLUDED.leaderboard_position_sum,
+                best_leaderboard_position = LEAST(
+                    {table}.best_leaderboard_position, EXCLUDED.best_leaderboard_position
+                ),
+                worst_leaderboard_position = GREATEST(
+                    {table}.worst_leaderboard_position, EXCLUDED.worst_leaderboard_position
+                )
+        """
+        query = f"""
+            WITH inserted AS (
+                INSERT INTO leaderboard_snapshots (
+                    miner_uid, miner_hotkey, score_sum, predictions_count, predictions_count_coeff, adjusted_score,
+                    leaderboard_position, rang, rang_power, final_score, total_miners_in_leaderboard,
+                    evaluation_window_size, created_at
+                )
+                SELECT
+                    s.miner_uid, s.miner_hotkey, s.score_sum, s.predictions_count, s.predictions_count_coeff,
+                    s.adjusted_score, s.leaderboard_position, s.rang, CAST(:rang_power AS FLOAT), s.final_score,
+                    CAST(:total_miners_in_leaderboard AS INT), CAST(:evaluation_window_size AS INT),
+                    CAST(:created_at AS TIMESTAMP)
+                FROM {source}
+                ON CONFLICT DO NOTHING
+                RETURNING miner_uid, miner_hotkey, final_score, adjusted_score, leaderboard_position, created_at
+            ), hourly AS (
+                {rollup.format(table="leaderboard_snapshots_hourly", resolution="hour")}
+            )
+            {rollup.format(table="leaderboard_snapshots_daily", resolution="day")};
+        """  # noqa: S608
+
+        parameters = {
+            "rang_power": rang_power,
+            "total_miners_in_leaderboard": leaderboard_size,
+            "evaluation_window_size": evaluation_window_size,
+            "created_at": datetime.now(tz=timezone.utc).replace(tzinfo=None),
+        }
+        columns = {
+            "miner_uids": leaderboard["uid"].tolist(),
+            "miner_hotkeys": leaderboard["miner_hotkey"].tolist(),
+            "score_sums": leaderboard["score_sum"].tolist(),
+            "predictions_counts": leaderboard["predictions_count"].tolist(),
+            "predictions_count_coeffs": leaderboard["predictions_count_coeff"].tolist(),
+            "adjusted_scores": leaderboard["adjusted_score"].tolist(),
+            "leaderboard_positions": list(range(1, leaderboard_size + 1)),
+            "rangs": leaderboard["rang"].tolist(),
+            "final_scores": leaderboard["final_score"].tolist(),
+        }
+
+        async with self.connection() as conn:
+            if is_bulk:
+                # The records follow the order of LEADERBOARD_SNAPSHOTS_COLUMNS.
+                records = list(zip(*columns.values(), strict=True))
+                await bulk_write(
+                    conn, "leaderboard_snapshots", LEADERBOARD_SNAPSHOTS_COLUMNS, records, merge=query, parameters=parameters
+                )
+            else:
+                del columns["leaderboard_positions"]
+                await conn.execute(text(query), {**columns, **parameters})
+
+    @wandb_performance
+    async def maintain_leaderboard_snapshots(self, retention: timedelta, months_ahead: int = 2) -> tuple[int, int]:
+        """
+        Create the monthly `leaderboard_snapshots` partitions of the next months, drop the partitions and hourly
+        rollups older than `retention`. Daily rollups are kept. Returns the numbers of created and dropped partitions.
+        """
+        async with self.connection() as conn:
+            created = await conn.execute(
+                text(
+                    "SELECT create_leaderboard_snapshots_partitions("
+                    "LOCALTIMESTAMP, LOCALTIMESTAMP + CAST(:months_ahead AS INT) * INTERVAL '1 month')"
+                ),
+                {"months_ahead": months_ahead},
+            )
+            dropped = await conn.execute(
+                text("SELECT drop_leaderboard_snapshots_partitions(LOCALTIMESTAMP - CAST(:retention AS INTERVAL))"),
+                {"retention": retention},
+            )
+            await conn.execute(
+                text(
+                    "DELETE FROM leaderboard_snapshots_hourly WHERE bucket < LOCALTIMESTAMP - CAST(:retention AS INTERVAL)"
+                ),
+                {"retention": retention},
+            )
+
+        return created.scalar(), dropped.scalar()
+
+    async def fetch_leaderboard_history(
+        self, since: datetime, resolution: str = "hour", miner_hotkeys: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Per-miner leaderboard averages since `since` from the hourly or daily rollup."""
+        table = {"hour": "leaderboard_snapshots_hourly", "day": "leaderboard_snapshots_daily"}[resolution]
+        query = f"""
+            SELECT
+                bucket,
+                miner_hotkey,
+                miner_uid,
+                snapshots_count,
+                final_score_sum / snapshots_count AS final_score_avg,
+                adjusted_score_sum / snapshots_count AS adjusted_score_avg,
+                CAST(leaderboard_position_sum AS FLOAT) / snapshots_count AS leaderboard_position_avg,
+                best_leaderboard_position,
+                worst_leaderboard_position
+            FROM {table}
+            WHERE bucket >= :since
+            AND (CAST(:miner_hotkeys AS VARCHAR[]) IS NULL OR miner_hotkey = ANY(:miner_hotkeys))
+            ORDER BY bucket, miner_hotkey;
+        """  # noqa: S608
+
         async with self.db_engine.connect() as conn:
-            await conn.execute(insert(LeaderboardSnapshots).values(snapshots).on_conflict_do_nothing())
-            await conn.commit()
+            result = await conn.execute(text(query), {"since": since, "miner_hotkeys": miner_hotkeys})
+            return [dict(row) for row in result.mappings().all()]
@@ -30,6 +30,21 @@ class MinerPredictions(DeclarativeBase):
     predicted_arrival_time = Column("predicted_arrival_time", DateTime)
     created_at = Column("created_at", DateTime, nullable=False)
     is_valid = Column("is_valid", Boolean, nullable=False)
+    is_scored = Column("is_scored", Boolean, nullable=False, default=False)
+
+
+class MinerResponseStats(DeclarativeBase):
+    __tablename__ = "miner_response_stats"
+
+    id = Column("id", Integer, primary_key=True)
+    round_id = Column("round_id", String, nullable=False)
+    miner_hotkey = Column("miner_hotkey", String, nullable=False)
+    miner_uid = Column("miner_uid", Integer, nullable=False)
+    status_code = Column("status_code", Integer)
+    latency_seconds = Column("latency_seconds", Float)
+    payload_size = Column("payload_size", Integer)
+    is_valid = Column("is_valid", Boolean, nullable=False)
+    created_at = Column("created_at", DateTime, nullable=False)
 
 
 class ActualFlights(DeclarativeBase):
@@ -76,4 +91,32 @@ class LeaderboardSnapshots(DeclarativeBase):
     final_score = Column("final_score", Float, nullable=False)
     total_miners_in_leaderboard = Column("total_miners_in_leaderboard", Integer, nullable=False)
     evaluation_window_size = Column("evaluation_window_size", Integer, nullable=False)
-    created_at = Column("created_at", DateTime, nullable=False)
+    created_at = Column("created_at", DateTime, primary_key=True)
+
+
+class LeaderboardSnapshotsHourly(DeclarativeBase):
+    __tablename__ = "leaderboard_snapshots_hourly"
+
+    bucket = Column("bucket", DateTime, primary_key=True)
+    miner_hotkey = Column("miner_hotkey", String, primary_key=True)
+    miner_uid = Column("miner_uid", Integer, nullable=False)
+    snapshots_count = Column("snapshots_count", Integer, nullable=False)
+    final_score_sum = Column("final_score_sum", Float, nullable=False)
+    adjusted_score_sum = Column("adjusted_score_sum", Float, nullable=False)
+    leaderboard_position_sum = Column("leaderboard_position_sum", Integer, nullable=False)
+    best_leaderboard_position = Column("best_leaderboard_position", Integer, nullable=False)
+    worst_leaderboard_position = Column("worst_leaderboard_position", Integer, nullable=False)
+
+
+class LeaderboardSnapshotsDaily(DeclarativeBase):
+    __tablename__ = "leaderboard_snapshots_daily"
+
+    bucket = Column("bucket", DateTime, primary_key=True)
+    miner_hotkey = Column("miner_hotkey", String, primary_key=True)
+    miner_uid = Column("miner_uid", Integer, nullable=False)
+    snapshots_count = Column("snapshots_count", Integer, nullable=False)
+    final_score_sum = Column("final_score_sum", Float, nullable=False)
+    adjusted_score_sum = Column("adjusted_score_sum", Float, nullable=False)
+    leaderboard_position_sum = Column("leaderboard_position_sum", Integer, nullable=False)
+    best_leaderboard_position = Column("best_leaderboard_position", Integer, nullable=False)
+    worst_leaderboard_position = Column("worst_leaderboard_position", Integer, nullable=False)
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 import bittensor as bt
 import numpy as np
 
-from flight_predict.protocol import FlightPredictionSynapse
+from flight_predict.protocol import FlightPredictionSynapse, FlightsBatchPredictionSynapse
 
 if TYPE_CHECKING:
     from neurons.miner import Miner
@@ -64,6 +64,12 @@ def predict(self: "Miner", synapse: FlightPredictionSynapse):
     return synapse
 
 
+def predict_batch(self: "Miner", synapse: FlightsBatchPredictionSynapse):
+    for flight in synapse.flights:
+        predict(self, flight)
+    return synapse
+
+
 def get_default_prediction(scheduled_arrival_time: datetime, max_delay: int = 3600) -> FlightPredictionSynapse:
     random_seconds = randint(0, max_delay)  # noqa: S311
     date = scheduled_arrival_time + timedelta(seconds=random_seconds)
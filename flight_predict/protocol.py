@@ -16,7 +16,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 import bittensor as bt
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 
 class FlightPredictionSynapse(bt.Synapse):
@@ -74,3 +74,30 @@ class FlightPredictionSynapse(bt.Synapse):
 
     def deserialize(self) -> "FlightPredictionSynapse":
         return self
+
+
+class FlightPrediction(BaseModel):
+    """A single flight inside a `FlightsBatchPredictionSynapse`, with the same fields as `FlightPredictionSynapse`."""
+
+    flight_ident_icao: str
+    flight_ident_iata: str
+    operating_airline_iata: str
+    departure_iata: str
+    destination_iata: str
+    scheduled_departure_time: str
+    scheduled_arrival_time: str
+    aircraft_type: str
+    is_domestic: bool
+
+    predicted_arrival_time: str | None = None
+
+
+class FlightsBatchPredictionSynapse(bt.Synapse):
+    flights: list[FlightPrediction] = Field(
+        ...,
+        title="Flights",
+        description="The flights to predict. Miners fill `predicted_arrival_time` of every flight in place.",
+    )
+
+    def deserialize(self) -> "FlightsBatchPredictionSynapse":
+        return self
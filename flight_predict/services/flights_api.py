@@ -1,3 +1,4 @@
+import asyncio
 import traceback
 from http import HTTPStatus
 from typing import TYPE_CHECKING
@@ -47,6 +48,20 @@ class FlightsAPIClient:
             flight: DeparturesFlightsResponse = await response.json(loads=DeparturesFlightsResponse.model_validate_json)
             return flight
 
+    async def fetch_scheduled_flights(self, count: int) -> list[DeparturesFlightsResponse]:
+        # The API serves a single scheduled flight per request, the flights of a batch are fetched concurrently.
+        # A failed request only costs its flight, the round goes on with the flights of the others.
+        results = await asyncio.gather(*(self.fetch_scheduled_flight() for _ in range(count)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        flights = [result for result in results if isinstance(result, DeparturesFlightsResponse)]
+        if errors:
+            if not flights:
+                raise errors[0]
+            bt.logging.warning(f"Failed to fetch {len(errors)} of {count} scheduled flights: {errors[0]}")
+
+        unique_flights = {flight.flight_id: flight for flight in flights}
+        return list(unique_flights.values())
+
     @retry_async(count=3, delay=1, factor=2, exceptions=(ClientResponseError))
     async def fetch_actual_flights_info(self, flight_ids: list[int]) -> list[ActualDeparturesFlightInfo] | None:
         payload = ActualFlightsRequest(flight_ids=flight_ids).model_dump()
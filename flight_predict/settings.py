@@ -23,5 +23,10 @@ POSTGRES_PASSWORD = get_env("POSTGRES_PASSWORD")
 POSTGRES_DB = get_env("POSTGRES_DB")
 POSTGRES_HOST = get_env("POSTGRES_HOST", "127.0.0.1")
 POSTGRES_PORT = get_env("POSTGRES_PORT", 5432)
+POSTGRES_POOL_SIZE = get_env("POSTGRES_POOL_SIZE", 10)
+POSTGRES_MAX_OVERFLOW = get_env("POSTGRES_MAX_OVERFLOW", 10)
+POSTGRES_POOL_TIMEOUT = get_env("POSTGRES_POOL_TIMEOUT", 30)
+POSTGRES_POOL_RECYCLE = get_env("POSTGRES_POOL_RECYCLE", 30 * 60)
+POSTGRES_POOL_PRE_PING = str(get_env("POSTGRES_POOL_PRE_PING", "True")).lower() in ("1", "true", "yes")
 REDIS_URL = get_env("REDIS_URL", "127.0.0.1")
 REDIS_PORT = get_env("REDIS_PORT", 6379)
@@ -1,12 +1,18 @@
+import asyncio
 import time
+from collections import defaultdict
 from datetime import datetime
+from http import HTTPStatus
 from typing import TYPE_CHECKING, List
+from uuid import uuid4
 
 import bittensor as bt
+import numpy as np
 
 from flight_predict.base.utils import uids
-from flight_predict.protocol import FlightPredictionSynapse
+from flight_predict.protocol import FlightPrediction, FlightPredictionSynapse, FlightsBatchPredictionSynapse
 from flight_predict.schemas import DeparturesFlightsResponse
+from flight_predict.validator.write_behind import commit_writes, schedule_flights
 
 if TYPE_CHECKING:
     from neurons.validator import Validator
@@ -16,32 +22,165 @@ async def forward_validator_task(self: "Validator"):
     """
     Forward the validator task to available miners and store predictions.
     """
-    miner_uids = uids.get_available_miners(self)
-    if len(miner_uids) == 0:
+    selected_uids = select_miners(self)
+    if len(selected_uids) == 0:
         bt.logging.info("No miners available")
         return
 
-    bt.logging.info(f"Miners: {miner_uids.tolist()}")
+    miner_uids, quarantined_uids = split_quarantined_miners(self, selected_uids)
+    bt.logging.info(f"Miners: {miner_uids.tolist()}, quarantined: {quarantined_uids.tolist()}")
     axons = [self.metagraph.axons[uid] for uid in miner_uids]
 
-    flight_to_predict = await self.flights_client.fetch_scheduled_flight()
-
-    bt.logging.info(f"Flight to predict: {flight_to_predict.model_dump()}")
-    if not flight_to_predict:
+    flights_to_predict = await fetch_flights_to_predict(self)
+    if not flights_to_predict:
         bt.logging.info("No flight to predict")
         return
 
-    await self.insert_scheduled_flight(flight_to_predict.model_dump())
-    await self.redis_client.sadd(self.REDIS_SCHEDULED_FLIGHTS_SET_KEY, str(flight_to_predict.flight_id))
+    if self.config.neuron.sample_miners:
+        self.coverage_sampler.record([self.metagraph.hotkeys[uid] for uid in selected_uids], len(flights_to_predict))
+
+    bt.logging.info(f"Flights to predict: {[flight.model_dump() for flight in flights_to_predict]}")
+
+    writes = {}
+    # Prefetched flights are stored by the producer already.
+    if self.flights_prefetcher is None:
+        writes["scheduled_flights"] = [flight.model_dump() for flight in flights_to_predict]
+
+    # Quarantined miners are not queried but still get a failed prediction for every flight,
+    # so their evaluation window fills exactly as if they had timed out.
+    if len(quarantined_uids) > 0:
+        writes["miner_predictions"] = build_failed_predictions(self, quarantined_uids, flights_to_predict)
+
+    await store_round_writes(self, writes)
+
+    if len(miner_uids) == 0:
+        return
+
+    if is_batch_mode(self):
+        synapse = create_flights_batch_synapse(flights_to_predict)
+    else:
+        synapse = create_flight_synapse(flights_to_predict[0])
+    self.last_round_synapse = synapse
 
-    synapse = create_flight_synapse(flight_to_predict)
+    timeouts = get_miner_timeouts(self, miner_uids)
+    round_id = uuid4().hex
 
     start_time = time.perf_counter()
-    responses = await fetch_miner_responses(self, axons, synapse)
+    if self.config.neuron.stream_responses:
+        stored_count = await stream_miner_responses(self, axons, miner_uids, synapse, flights_to_predict, timeouts, round_id)
+        bt.logging.info(f"Stored {stored_count} predictions in {time.perf_counter() - start_time:.2f} seconds")
+        return
+
+    responses = await fetch_miner_responses(self, axons, synapse, timeouts)
     bt.logging.info(f"Received responses in {time.perf_counter() - start_time:.2f} seconds: {responses}")
+    record_miner_latencies(self, responses, miner_uids)
+
+    normalized_responses, response_stats = process_miner_responses(responses, miner_uids, flights_to_predict, self, round_id)
+    record_miner_health(self, response_stats)
+    await store_round_writes(self, {"miner_predictions": normalized_responses, "miner_response_stats": response_stats})
+
+
+async def store_round_writes(self: "Validator", writes: dict[str, List[dict]]):
+    """
+    Store the rows of a round, keyed by table, through the write-behind buffer when it is enabled and in a unit
+    of work otherwise. Scheduled flights are added to the set of flights to score once they are committed.
+    """
+    if self.write_behind is not None:
+        await self.write_behind.put(writes)
+        return
+
+    await commit_writes(self, writes)
+    await schedule_flights(self, writes)
+
+
+def select_miners(self: "Validator") -> np.ndarray:
+    """
+    Available miners of this round, sampled down to --neuron.sample_size live miners when sampling is enabled.
+    Quarantined miners are sampled in their turn too, but do not take the slot of a live miner.
+    """
+    miner_uids = uids.get_available_miners(self)
+    if self.config.neuron.sample_miners:
+        quarantined = self.miner_health.quarantined_mask([self.metagraph.hotkeys[uid] for uid in miner_uids])
+        miner_uids = self.coverage_sampler.select(
+            miner_uids, self.metagraph.hotkeys, self.config.neuron.sample_size, quarantined
+        )
+    return miner_uids
+
+
+def split_quarantined_miners(self: "Validator", miner_uids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split the selected miners into the ones to query and the quarantined ones."""
+    quarantined = self.miner_health.quarantined_mask([self.metagraph.hotkeys[uid] for uid in miner_uids])
+    return miner_uids[~quarantined], miner_uids[quarantined]
+
+
+def build_failed_predictions(
+    self: "Validator", miner_uids: np.ndarray, flights: List[DeparturesFlightsResponse]
+) -> List[dict]:
+    return [
+        {
+            "miner_hotkey": self.metagraph.hotkeys[uid],
+            "miner_uid": int(uid),
+            "flight_id": flight.flight_id,
+            "predicted_arrival_time": None,
+            "is_valid": False,
+        }
+        for uid in miner_uids
+        for flight in flights
+    ]
+
+
+def record_miner_health(self: "Validator", response_stats: List[dict]):
+    for stats in response_stats:
+        is_success = stats["is_valid"] and stats["status_code"] == HTTPStatus.OK
+        self.miner_health.record(stats["miner_hotkey"], is_success=is_success)
+
+
+async def probe_quarantined_miners(self: "Validator"):
+    """
+    Send the last round synapse to the quarantined miners with the shortest timeout.
+    The responses are not stored, they only feed the health and latency trackers, so a miner that is back
+    rejoins the main rounds.
+    """
+    synapse = getattr(self, "last_round_synapse", None)
+    if synapse is None:
+        return
+
+    available_uids = uids.get_available_miners(self)
+    _, quarantined_uids = split_quarantined_miners(self, available_uids)
+    if len(quarantined_uids) == 0:
+        return
+
+    axons = [self.metagraph.axons[uid] for uid in quarantined_uids]
+    timeouts = [self.config.neuron.min_timeout] * len(quarantined_uids)
+    responses = await fetch_miner_responses(self, axons, synapse, timeouts)
+    record_miner_latencies(self, responses, quarantined_uids)
+
+    flights_count = len(synapse.flights) if isinstance(synapse, FlightsBatchPredictionSynapse) else 1
+    for response, uid in zip(responses, quarantined_uids, strict=True):
+        predicted_arrival_times = get_predicted_arrival_times(response, flights_count)
+        is_success = get_response_telemetry(response)["status_code"] == HTTPStatus.OK and all(
+            is_valid_predicted_arrival_time(predicted_arrival_time) for predicted_arrival_time in predicted_arrival_times
+        )
+        self.miner_health.record(self.metagraph.hotkeys[uid], is_success=is_success)
+
+    bt.logging.info(f"Probed {len(quarantined_uids)} quarantined miners")
 
-    normalized_responses = process_miner_responses(responses, miner_uids, flight_to_predict, self)
-    await self.insert_miner_predictions(normalized_responses)
+
+def is_batch_mode(self: "Validator") -> bool:
+    """Several flights per round are sent with the batched protocol, a single flight keeps the legacy synapse."""
+    return self.config.neuron.flights_per_round > 1
+
+
+async def fetch_flights_to_predict(self: "Validator") -> List[DeparturesFlightsResponse]:
+    """Fetch the scheduled flights for a single query round, from the prefetch buffer when it is enabled."""
+    if self.flights_prefetcher is not None:
+        return await self.flights_prefetcher.get(self.config.neuron.flights_per_round, self.PREFETCH_WAIT_SECONDS)
+
+    if is_batch_mode(self):
+        return await self.flights_client.fetch_scheduled_flights(self.config.neuron.flights_per_round) or []
+
+    flight = await self.flights_client.fetch_scheduled_flight()
+    return [flight] if flight else []
 
 
 def create_flight_synapse(flight: DeparturesFlightsResponse) -> FlightPredictionSynapse:
@@ -60,39 +199,224 @@ def create_flight_synapse(flight: DeparturesFlightsResponse) -> FlightPrediction
     )
 
 
-async def fetch_miner_responses(
-    self: "Validator", axons: List, synapse: FlightPredictionSynapse
-) -> List[FlightPredictionSynapse]:
-    """Fetch predictions from miners."""
-    return await self.dendrite(
-        axons=axons,
-        synapse=synapse,
-        deserialize=True,
-        timeout=60,
+def create_flights_batch_synapse(flights: List[DeparturesFlightsResponse]) -> FlightsBatchPredictionSynapse:
+    """Create a FlightsBatchPredictionSynapse object carrying the details of several flights."""
+    return FlightsBatchPredictionSynapse(
+        flights=[
+            FlightPrediction(
+                flight_ident_icao=flight.flight_ident_icao,
+                flight_ident_iata=flight.flight_ident_iata,
+                operating_airline_iata=flight.operating_airline_iata,
+                departure_iata=flight.departure_iata,
+                destination_iata=flight.destination_iata,
+                scheduled_departure_time=flight.scheduled_departure_time.isoformat(),
+                scheduled_arrival_time=flight.scheduled_arrival_time.isoformat(),
+                aircraft_type=flight.aircraft_type,
+                is_domestic=flight.is_domestic,
+                predicted_arrival_time=None,
+            )
+            for flight in flights
+        ]
     )
 
 
+def get_miner_timeouts(self: "Validator", miner_uids: List[int]) -> List[float]:
+    """Per-miner query timeouts derived from the latency history, capped by --neuron.timeout."""
+    max_timeout = self.config.neuron.timeout
+    if self.config.neuron.disable_adaptive_timeouts:
+        return [max_timeout] * len(miner_uids)
+
+    return [
+        self.latency_tracker.timeout_for(self.metagraph.hotkeys[uid], max_timeout, self.config.neuron.min_timeout)
+        for uid in miner_uids
+    ]
+
+
+def record_miner_latencies(self: "Validator", responses: List[bt.Synapse], miner_uids: List[int]):
+    for response, uid in zip(responses, miner_uids, strict=True):
+        self.latency_tracker.record_response(self.metagraph.hotkeys[uid], response)
+
+
+async def fetch_miner_responses(
+    self: "Validator",
+    axons: List,
+    synapse: FlightPredictionSynapse | FlightsBatchPredictionSynapse,
+    timeouts: List[float],
+) -> List[FlightPredictionSynapse | FlightsBatchPredictionSynapse]:
+    """Fetch predictions from miners, with one dendrite call per timeout bucket. Responses keep the axons order."""
+    buckets = defaultdict(list)
+    for i, timeout in enumerate(timeouts):
+        buckets[timeout].append(i)
+
+    async def query_bucket(indices: List[int], bucket_timeout: float) -> List[bt.Synapse]:
+        async with self.round_executor.requests(len(indices)):
+            return await self.dendrite(
+                axons=[axons[i] for i in indices],
+                synapse=synapse,
+                deserialize=True,
+                timeout=bucket_timeout,
+            )
+
+    bucket_responses = await asyncio.gather(*(query_bucket(indices, timeout) for timeout, indices in buckets.items()))
+
+    responses = [None] * len(axons)
+    for indices, bucket in zip(buckets.values(), bucket_responses, strict=True):
+        for i, response in zip(indices, bucket, strict=True):
+            responses[i] = response
+    return responses
+
+
+async def stream_miner_responses(
+    self: "Validator",
+    axons: List,
+    miner_uids: List[int],
+    synapse: FlightPredictionSynapse | FlightsBatchPredictionSynapse,
+    flights: List[DeparturesFlightsResponse],
+    timeouts: List[float],
+    round_id: str,
+) -> int:
+    """
+    Query every axon in its own task and store the predictions as the responses arrive.
+    Normalized predictions are buffered and flushed to the database in micro-batches.
+    Returns the number of stored predictions.
+    """
+
+    async def query_axon(
+        uid: int, axon, axon_timeout: float
+    ) -> tuple[int, FlightPredictionSynapse | FlightsBatchPredictionSynapse]:
+        async with self.round_executor.requests(1):
+            response = await self.dendrite.call(
+                target_axon=axon,
+                synapse=synapse.model_copy(),
+                timeout=axon_timeout,
+                deserialize=True,
+            )
+        return uid, response
+
+    async def flush(predictions: list[dict], response_stats: list[dict]) -> int:
+        # A failed micro-batch is logged and dropped, the rest of the round keeps streaming.
+        try:
+            await store_round_writes(self, {"miner_predictions": predictions, "miner_response_stats": response_stats})
+        except Exception as err:
+            bt.logging.error(f"Failed to store {len(predictions)} predictions of round {round_id}: {err}")
+            return 0
+        return len(predictions)
+
+    tasks = [
+        asyncio.create_task(query_axon(uid, axon, timeout))
+        for uid, axon, timeout in zip(miner_uids, axons, timeouts, strict=True)
+    ]
+    flush_size = self.config.neuron.predictions_flush_size
+    buffer = []
+    stats_buffer = []
+    stored_count = 0
+
+    try:
+        for next_response in asyncio.as_completed(tasks):
+            uid, response = await next_response
+            record_miner_latencies(self, [response], [uid])
+            predictions, response_stats = process_miner_responses([response], [uid], flights, self, round_id)
+            record_miner_health(self, response_stats)
+            buffer.extend(predictions)
+            stats_buffer.extend(response_stats)
+
+            if len(buffer) >= flush_size:
+                stored_count += await flush(buffer, stats_buffer)
+                buffer, stats_buffer = [], []
+
+        if buffer:
+            stored_count += await flush(buffer, stats_buffer)
+    finally:
+        # Queries still running when the round fails or is cancelled are not left behind.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return stored_count
+
+
+def get_predicted_arrival_times(
+    response: FlightPredictionSynapse | FlightsBatchPredictionSynapse, flights_count: int
+) -> List[str | None]:
+    """Return the raw predicted arrival times of a response, one per flight of the round."""
+    if isinstance(response, FlightsBatchPredictionSynapse):
+        flights = response.flights or []
+        if len(flights) != flights_count:
+            return [None] * flights_count
+        return [flight.predicted_arrival_time for flight in flights]
+
+    return [getattr(response, "predicted_arrival_time", None)]
+
+
+def is_valid_predicted_arrival_time(predicted_arrival_time: str | None) -> bool:
+    try:
+        datetime.fromisoformat(predicted_arrival_time)
+    except Exception:
+        return False
+    return True
+
+
+def get_response_telemetry(response: bt.Synapse) -> dict:
+    """Latency, status code and payload size of a miner response."""
+    dendrite = response.dendrite
+    latency_seconds = dendrite.process_time if dendrite is not None else None
+    status_code = dendrite.status_code if dendrite is not None else None
+    try:
+        payload_size = len(response.model_dump_json())
+    except Exception:
+        payload_size = None
+
+    return {
+        "status_code": int(status_code) if status_code is not None else None,
+        "latency_seconds": float(latency_seconds) if latency_seconds is not None else None,
+        "payload_size": payload_size,
+    }
+
+
 def process_miner_responses(
-    responses: List[FlightPredictionSynapse], miner_uids: List[int], flight: DeparturesFlightsResponse, self: "Validator"
-) -> List[dict]:
-    """Process responses from miners and normalize data."""
+    responses: List[FlightPredictionSynapse | FlightsBatchPredictionSynapse],
+    miner_uids: List[int],
+    flights: List[DeparturesFlightsResponse],
+    self: "Validator",
+    round_id: str,
+) -> tuple[List[dict], List[dict]]:
+    """
+    Process responses from miners and normalize data, one prediction per miner and flight.
+    Also returns the telemetry of every response for the `miner_response_stats` table.
+    """
     normalized_responses = []
-    for response, uid in zip(responses, miner_uids):
-        try:
-            predicted_arrival_time = datetime.fromisoformat(response.predicted_arrival_time)
-            is_valid = True
-        except Exception:
-            predicted_arrival_time = None
-            is_valid = False
-            bt.logging.error(f"Invalid response format for miner {uid}")
-
-        normalized_responses.append(
+    response_stats = []
+    for response, uid in zip(responses, miner_uids, strict=True):
+        predicted_arrival_times = get_predicted_arrival_times(response, len(flights))
+        response_is_valid = True
+
+        for flight, raw_predicted_arrival_time in zip(flights, predicted_arrival_times, strict=True):
+            try:
+                predicted_arrival_time = datetime.fromisoformat(raw_predicted_arrival_time)
+                is_valid = True
+            except Exception:
+                predicted_arrival_time = None
+                is_valid = False
+                bt.logging.error(f"Invalid response format for miner {uid} and flight {flight.flight_id}")
+
+            response_is_valid = response_is_valid and is_valid
+            normalized_responses.append(
+                {
+                    "miner_hotkey": self.metagraph.hotkeys[uid],
+                    "miner_uid": uid,
+                    "flight_id": flight.flight_id,
+                    "predicted_arrival_time": predicted_arrival_time,
+                    "is_valid": is_valid,
+                }
+            )
+
+        response_stats.append(
             {
+                "round_id": round_id,
                 "miner_hotkey": self.metagraph.hotkeys[uid],
                 "miner_uid": uid,
-                "flight_id": flight.flight_id,
-                "predicted_arrival_time": predicted_arrival_time,
-                "is_valid": is_valid,
+                "is_valid": response_is_valid,
+                **get_response_telemetry(response),
             }
         )
-    return normalized_responses
+    return normalized_responses, response_stats
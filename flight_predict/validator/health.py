@@ -0,0 +1,68 @@
+from enum import IntEnum
+
+import bittensor as bt
+import numpy as np
+
+
+class MinerHealthState(IntEnum):
+    HEALTHY = 0
+    DEGRADED = 1
+    QUARANTINED = 2
+
+
+class MinerHealthTracker:
+    """
+    Per-hotkey health state machine fed from the outcome of every miner response.
+
+    A miner becomes degraded after `DEGRADED_AFTER_FAILURES` consecutive failed responses (error status or invalid
+    predictions) and quarantined after `QUARANTINE_AFTER_FAILURES`. Quarantined miners are not queried in the main
+    rounds anymore, only re-probed on a separate schedule. A single successful response makes a miner healthy again.
+    """
+
+    DEGRADED_AFTER_FAILURES = 3
+    QUARANTINE_AFTER_FAILURES = 36  # ~6 hours of 10 minutes rounds
+
+    def __init__(self):
+        self._failures: dict[str, int] = {}
+
+    def record(self, hotkey: str, *, is_success: bool):
+        self._failures[hotkey] = 0 if is_success else self._failures.get(hotkey, 0) + 1
+
+    def state(self, hotkey: str) -> MinerHealthState:
+        failures = self._failures.get(hotkey, 0)
+        if failures >= self.QUARANTINE_AFTER_FAILURES:
+            return MinerHealthState.QUARANTINED
+        if failures >= self.DEGRADED_AFTER_FAILURES:
+            return MinerHealthState.DEGRADED
+        return MinerHealthState.HEALTHY
+
+    def quarantined_mask(self, hotkeys: list[str]) -> np.ndarray:
+        """Boolean mask over `hotkeys`, True for the quarantined ones."""
+        return np.fromiter(
+            (self._failures.get(hotkey, 0) >= self.QUARANTINE_AFTER_FAILURES for hotkey in hotkeys),
+            dtype=bool,
+            count=len(hotkeys),
+        )
+
+    def prune(self, hotkeys: list[str]):
+        """Forget the hotkeys that are not registered anymore."""
+        registered = set(hotkeys)
+        self._failures = {hotkey: failures for hotkey, failures in self._failures.items() if hotkey in registered}
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            hotkeys=np.array(list(self._failures), dtype=str),
+            failures=np.array(list(self._failures.values()), dtype=np.int64),
+        )
+
+    def load(self, path: str):
+        try:
+            state = np.load(path)
+        except OSError:
+            bt.logging.warning("No health state file found, starting from scratch.")
+            return
+
+        self._failures = {
+            str(hotkey): int(failures) for hotkey, failures in zip(state["hotkeys"], state["failures"], strict=True)
+        }
@@ -0,0 +1,121 @@
+import math
+from http import HTTPStatus
+
+import bittensor as bt
+import numpy as np
+
+
+class MinerLatencyTracker:
+    """
+    Keeps the last `window` response latencies of every miner hotkey in a fixed-size ring buffer,
+    together with the number of consecutive failed responses, and derives per-miner query timeouts from them.
+    """
+
+    TIMEOUT_MARGIN = 1.5
+    TIMEOUT_BUCKET_SECONDS = 5
+    MIN_SAMPLES = 3
+    DEAD_AFTER_FAILURES = 3
+
+    def __init__(self, window: int = 32):
+        self.window = window
+        self._index: dict[str, int] = {}
+        self._latencies = np.full((0, window), np.nan, dtype=np.float32)
+        self._positions = np.zeros(0, dtype=np.int32)
+        self._failures = np.zeros(0, dtype=np.int32)
+
+    def _row(self, hotkey: str) -> int:
+        row = self._index.get(hotkey)
+        if row is not None:
+            return row
+
+        row = len(self._index)
+        self._index[hotkey] = row
+        if row >= len(self._positions):
+            grow = max(16, len(self._positions))
+            self._latencies = np.vstack([self._latencies, np.full((grow, self.window), np.nan, dtype=np.float32)])
+            self._positions = np.concatenate([self._positions, np.zeros(grow, dtype=np.int32)])
+            self._failures = np.concatenate([self._failures, np.zeros(grow, dtype=np.int32)])
+        return row
+
+    def record(self, hotkey: str, process_time: float | None, status_code: int | None):
+        """Record the outcome of a single response."""
+        row = self._row(hotkey)
+
+        if status_code != HTTPStatus.OK or process_time is None:
+            self._failures[row] += 1
+            return
+
+        self._latencies[row, self._positions[row]] = float(process_time)
+        self._positions[row] = (self._positions[row] + 1) % self.window
+        self._failures[row] = 0
+
+    def record_response(self, hotkey: str, response: bt.Synapse):
+        dendrite = response.dendrite
+        process_time = dendrite.process_time if dendrite is not None else None
+        status_code = dendrite.status_code if dendrite is not None else None
+        try:
+            process_time = float(process_time) if process_time is not None else None
+            status_code = int(status_code) if status_code is not None else None
+        except (TypeError, ValueError):
+            process_time, status_code = None, None
+        self.record(hotkey, process_time, status_code)
+
+    def percentile(self, hotkey: str, q: float) -> float | None:
+        """Latency percentile of the hotkey over its window, None if there are not enough samples."""
+        row = self._index.get(hotkey)
+        if row is None:
+            return None
+
+        latencies = self._latencies[row]
+        latencies = latencies[~np.isnan(latencies)]
+        if len(latencies) < self.MIN_SAMPLES:
+            return None
+        return float(np.percentile(latencies, q))
+
+    def consecutive_failures(self, hotkey: str) -> int:
+        row = self._index.get(hotkey)
+        return 0 if row is None else int(self._failures[row])
+
+    def timeout_for(self, hotkey: str, max_timeout: float, min_timeout: float) -> float:
+        """
+        Query timeout for the hotkey: the p95 latency with a safety margin, rounded up to a bucket and capped by
+        `max_timeout`. Miners without history get the cap, miners failing repeatedly without any successful
+        response get `min_timeout` so they no longer stretch every round.
+        """
+        p95 = self.percentile(hotkey, 95)
+        if p95 is None:
+            if self.consecutive_failures(hotkey) >= self.DEAD_AFTER_FAILURES:
+                return min_timeout
+            return max_timeout
+
+        bucket = self.TIMEOUT_BUCKET_SECONDS
+        timeout = math.ceil(p95 * self.TIMEOUT_MARGIN / bucket) * bucket
+        return float(min(max(timeout, min_timeout), max_timeout))
+
+    def save(self, path: str):
+        hotkeys = list(self._index)
+        rows = np.array([self._index[hotkey] for hotkey in hotkeys], dtype=np.int64)
+        np.savez(
+            path,
+            hotkeys=np.array(hotkeys, dtype=str),
+            latencies=self._latencies[rows],
+            positions=self._positions[rows],
+            failures=self._failures[rows],
+        )
+
+    def load(self, path: str):
+        try:
+            state = np.load(path)
+        except OSError:
+            bt.logging.warning("No latency state file found, starting from scratch.")
+            return
+
+        latencies = state["latencies"]
+        if latencies.shape[1:] != (self.window,):
+            bt.logging.warning("Latency state file has a different window size, starting from scratch.")
+            return
+
+        self._index = {str(hotkey): row for row, hotkey in enumerate(state["hotkeys"])}
+        self._latencies = latencies.astype(np.float32)
+        self._positions = state["positions"].astype(np.int32)
+        self._failures = state["failures"].astype(np.int32)
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+import bittensor as bt
+
+from flight_predict.schemas import DeparturesFlightsResponse
+
+if TYPE_CHECKING:
+    from neurons.validator import Validator
+
+
+class ScheduledFlightsPrefetcher:
+    """
+    Bounded buffer of upcoming scheduled flights, kept full by a background producer.
+
+    Buffered flights are already validated and stored in `scheduled_flights` and in the Redis set of flights
+    to score, so query rounds only dequeue them and the flights API latency stays off the critical path.
+    Flights which have departed while waiting in the buffer are dropped.
+    """
+
+    def __init__(self, validator: "Validator", maxsize: int):
+        self.validator = validator
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue[DeparturesFlightsResponse] = asyncio.Queue(maxsize)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def fill(self):
+        """Top the buffer up to its size. Driven periodically by the validator."""
+        missing = self.maxsize - self._queue.qsize()
+        if missing <= 0:
+            return
+
+        if self.validator.config.neuron.flights_per_round > 1:
+            flights = await self.validator.flights_client.fetch_scheduled_flights(missing) or []
+        else:
+            flight = await self.validator.flights_client.fetch_scheduled_flight()
+            flights = [flight] if flight else []
+
+        flights = [flight for flight in flights if not has_departed(flight)][:missing]
+        if not flights:
+            return
+
+        await self.validator.insert_scheduled_flights([flight.model_dump() for flight in flights])
+        await self.validator.redis_client.sadd(
+            self.validator.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *[str(flight.flight_id) for flight in flights]
+        )
+        for flight in flights:
+            self._queue.put_nowait(flight)
+
+        bt.logging.debug(f"Prefetched {len(flights)} scheduled flights, buffer size: {self._queue.qsize()}")
+
+    async def get(self, count: int, wait_seconds: float) -> list[DeparturesFlightsResponse]:
+        """Dequeue up to `count` flights, waiting at most `wait_seconds` seconds for the first one."""
+        flights = []
+        try:
+            flights.append(await asyncio.wait_for(self._queue.get(), wait_seconds))
+        except asyncio.TimeoutError:
+            return []
+
+        while len(flights) < count and not self._queue.empty():
+            flights.append(self._queue.get_nowait())
+
+        departed = [flight for flight in flights if has_departed(flight)]
+        if departed:
+            # Nobody predicted them, they are not left for scoring.
+            await self.validator.redis_client.srem(
+                self.validator.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *[str(flight.flight_id) for flight in departed]
+            )
+            bt.logging.debug(f"Dropped {len(departed)} prefetched flights that departed before their round")
+
+        return [flight for flight in flights if flight not in departed]
+
+
+def has_departed(flight: DeparturesFlightsResponse) -> bool:
+    now = datetime.now(tz=timezone.utc)
+    if flight.scheduled_departure_time.tzinfo is None:
+        now = now.replace(tzinfo=None)
+    return flight.scheduled_departure_time <= now
@@ -0,0 +1,323 @@
+"""
+Offline replay of the leaderboard over the scoring history, to tune its parameters without running a validator.
+
+The scored predictions are exported once into a compressed columnar file, then `create_scores_leaderboard` is
+replayed every `--step-minutes` over that history for every combination of the swept parameters, spread across a
+process pool. The report holds the final weight vector of every configuration and how stable its ranking is.
+
+Usage:
+    python -m flight_predict.validator.replay export history.npz --days 14
+    python -m flight_predict.validator.replay sweep history.npz --last-n-predictions 90 180 360 --rang-power 1 2 3
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import bittensor as bt
+import numpy as np
+
+from flight_predict.db.mixin import DatabaseMixin
+from flight_predict.validator.scoring import INTERNATIONAL_FLIGHT_COEF, LAST_N_PREDICTIONS, RANG_POWER, compute_leaderboard
+
+SCORE_WINDOW = timedelta(hours=48)
+LEADERBOARD_STEP = timedelta(minutes=5)
+MOVING_AVERAGE_ALPHA = 0.5
+
+BASELINE_CONFIG = {
+    "last_n_predictions": LAST_N_PREDICTIONS,
+    "rang_power": RANG_POWER,
+    "international_flight_coef": INTERNATIONAL_FLIGHT_COEF,
+    "moving_average_alpha": MOVING_AVERAGE_ALPHA,
+}
+
+# History loaded once by every worker of the process pool.
+_history: dict[str, np.ndarray] | None = None
+
+
+class HistoryExporter(DatabaseMixin):
+    def __init__(self):
+        self.configure_database()
+
+
+async def export_history(db: DatabaseMixin, path: str, since: datetime) -> int:
+    """Write the scored predictions created after `since` to a compressed `.npz` file, returns their number."""
+    batches = [batch async for batch in db.stream_scored_history(since)]
+    columns = {
+        name: np.concatenate([batch[name] for batch in batches]) if batches else np.zeros(0)
+        for name in ("id", "miner_hotkey", "miner_uid", "is_correct", "error_seconds", "is_domestic", "created_at")
+    }
+
+    # Hotkeys are stored once and referenced by code, so the file needs no pickled objects.
+    hotkeys, hotkey_codes = np.unique(columns.pop("miner_hotkey").astype(str), return_inverse=True)
+    np.savez_compressed(
+        path,
+        hotkeys=hotkeys,
+        hotkey_code=hotkey_codes.astype(np.int32),
+        id=columns["id"].astype(np.int64),
+        miner_uid=columns["miner_uid"].astype(np.int32),
+        is_correct=columns["is_correct"].astype(bool),
+        error_seconds=columns["error_seconds"].astype(np.float64),
+        is_domestic=columns["is_domestic"].astype(bool),
+        created_at=columns["created_at"].astype(np.int64),
+        neurons_count=np.int64(columns["miner_uid"].max() + 1 if len(columns["miner_uid"]) else 0),
+    )
+    return len(columns["id"])
+
+
+def load_history(path: str) -> dict[str, np.ndarray]:
+    """Load an exported history, sorted by creation time then id."""
+    with np.load(path) as data:
+        history = {name: data[name] for name in data.files}
+
+    order = np.lexsort((history["id"], history["created_at"]))
+    for name in ("hotkey_code", "id", "miner_uid", "is_correct", "error_seconds", "is_domestic", "created_at"):
+        history[name] = history[name][order]
+    history["neurons_count"] = int(history["neurons_count"])
+    return history
+
+
+def replay_window(history: dict[str, np.ndarray], now: int, window_seconds: int) -> dict[str, np.ndarray]:
+    """
+    Correct scored predictions of the window ending at `now`, as the score window of a validator would see them.
+
+    Every hotkey takes the uid of its newest prediction and a uid belongs to the hotkey which predicted last with it,
+    like a metagraph where deregistered hotkeys were replaced. `newest_rank` is the position of a prediction among the
+    predictions of its hotkey in the window, newest first, counting the incorrect ones as the validator does.
+    """
+    start, end = np.searchsorted(history["created_at"], [now - window_seconds, now], side="right")
+    codes = history["hotkey_code"][start:end]
+    ids = history["id"][start:end]
+    order = np.lexsort((ids, codes))
+    codes = codes[order]
+
+    group_ends = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True]) if len(codes) else np.zeros(0, dtype=np.int64)
+    group_sizes = np.diff(np.r_[-1, group_ends])
+    newest_rank = np.repeat(group_ends, group_sizes) - np.arange(len(codes))
+
+    hotkey_uids = history["miner_uid"][start:end][order][group_ends]
+    hotkey_last_ids = ids[order][group_ends]
+    uid_order = np.lexsort((hotkey_last_ids, hotkey_uids))
+    is_uid_owner = np.zeros(len(group_ends), dtype=bool)
+    is_uid_owner[uid_order[np.r_[hotkey_uids[uid_order][1:] != hotkey_uids[uid_order][:-1], True]]] = True
+
+    rows = start + order
+    counted = np.repeat(is_uid_owner, group_sizes) & history["is_correct"][rows]
+    return {
+        "uid": np.repeat(hotkey_uids, group_sizes)[counted],
+        "newest_rank": newest_rank[counted],
+        "error_seconds": history["error_seconds"][rows][counted],
+        "is_domestic": history["is_domestic"][rows][counted],
+    }
+
+
+def replay_final_scores(window: dict[str, np.ndarray], neurons_count: int, config: dict[str, float]) -> np.ndarray:
+    """Final scores `create_scores_leaderboard` gives over a replayed window with the parameters of `config`."""
+    last_n_predictions = int(config["last_n_predictions"])
+    in_window = window["newest_rank"] < last_n_predictions
+    uids = window["uid"][in_window]
+    coefs = np.where(window["is_domestic"][in_window], 1.0, config["international_flight_coef"])
+
+    score_sums = np.bincount(uids, weights=window["error_seconds"][in_window] * coefs, minlength=neurons_count)
+    predictions_counts = np.bincount(uids, minlength=neurons_count)
+    final_scores, _ = compute_leaderboard(score_sums, predictions_counts, last_n_predictions, config["rang_power"])
+    return final_scores
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation of two vectors, ties get their average rank."""
+
+    def ranks(values: np.ndarray) -> np.ndarray:
+        ordinal = np.empty(len(values))
+        ordinal[np.argsort(values, kind="stable")] = np.arange(len(values))
+        _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+        return (np.bincount(inverse, weights=ordinal) / counts)[inverse]
+
+    rank_a, rank_b = ranks(a), ranks(b)
+    if rank_a.std() == 0 or rank_b.std() == 0:
+        return 1.0 if np.array_equal(rank_a, rank_b) else 0.0
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def replay(
+    history: dict[str, np.ndarray], configs: list[dict[str, float]], steps: np.ndarray, window_seconds: int
+) -> list[dict[str, Any]]:
+    """
+    Replay the leaderboard at every step for every configuration, sharing the window of a step between them.
+    Scores follow the moving average of `update_scores` and weights are normalized like in `set_weights`.
+    """
+    neurons_count = history["neurons_count"]
+    scores = np.zeros((len(configs), neurons_count))
+    previous_final_scores = [None] * len(configs)
+    stabilities = [[] for _ in configs]
+
+    for now in steps.tolist():
+        window = replay_window(history, now, window_seconds)
+        for index, config in enumerate(configs):
+            final_scores = replay_final_scores(window, neurons_count, config)
+            alpha = config["moving_average_alpha"]
+            scores[index] = alpha * final_scores + (1 - alpha) * scores[index]
+
+            if previous_final_scores[index] is not None:
+                stabilities[index].append(spearman(previous_final_scores[index], final_scores))
+            previous_final_scores[index] = final_scores
+
+    results = []
+    for config, config_scores, config_stabilities in zip(configs, scores, stabilities, strict=True):
+        norm = config_scores.sum()
+        weights = config_scores / norm if norm > 0 else config_scores
+        results.append(
+            {
+                **config,
+                "weights": weights,
+                "rank_stability_mean": float(np.mean(config_stabilities)) if config_stabilities else 1.0,
+                "rank_stability_min": float(np.min(config_stabilities)) if config_stabilities else 1.0,
+            }
+        )
+    return results
+
+
+def _load_worker_history(path: str):
+    global _history  # noqa: PLW0603
+    _history = load_history(path)
+
+
+def _replay_in_worker(configs: list[dict[str, float]], steps: np.ndarray, window_seconds: int) -> list[dict[str, Any]]:
+    return replay(_history, configs, steps, window_seconds)
+
+
+def replay_steps(history: dict[str, np.ndarray], step_seconds: int, window_seconds: int) -> np.ndarray:
+    """Leaderboard times from one full window after the first prediction to the last prediction."""
+    if not len(history["created_at"]):
+        return np.zeros(0, dtype=np.int64)
+
+    first, last = int(history["created_at"][0]), int(history["created_at"][-1])
+    return np.arange(last, min(first + window_seconds, last) - 1, -step_seconds)[::-1]
+
+
+def sweep(
+    path: str,
+    configs: list[dict[str, float]],
+    step: timedelta = LEADERBOARD_STEP,
+    window: timedelta = SCORE_WINDOW,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Replay every configuration and the baseline across a process pool, and compare them with the baseline."""
+    history = load_history(path)
+    step_seconds, window_seconds = int(step.total_seconds()), int(window.total_seconds())
+    steps = replay_steps(history, step_seconds, window_seconds)
+
+    configs = [BASELINE_CONFIG, *[config for config in configs if config != BASELINE_CONFIG]]
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    chunks = [chunk.tolist() for chunk in np.array_split(np.array(configs, dtype=object), workers)]
+
+    with ProcessPoolExecutor(workers, initializer=_load_worker_history, initargs=(path,)) as executor:
+        results = list(
+            itertools.chain.from_iterable(
+                executor.map(_replay_in_worker, chunks, itertools.repeat(steps), itertools.repeat(window_seconds))
+            )
+        )
+
+    baseline_weights = results[0]["weights"]
+    for result in results:
+        weights = result.pop("weights")
+        result["weights_spearman"] = spearman(baseline_weights, weights)
+        result["weights_distance"] = float(np.abs(baseline_weights - weights).sum() / 2)
+        result["weights"] = np.round(weights, 6).tolist()
+
+    return {
+        "history": {
+            "path": path,
+            "predictions": len(history["id"]),
+            "miners": len(history["hotkeys"]),
+            "neurons_count": history["neurons_count"],
+        },
+        "steps": len(steps),
+        "step_seconds": step_seconds,
+        "window_seconds": window_seconds,
+        "baseline": results[0],
+        "results": results[1:],
+    }
+
+
+def build_configs(args: argparse.Namespace) -> list[dict[str, float]]:
+    return [
+        {
+            "last_n_predictions": last_n_predictions,
+            "rang_power": rang_power,
+            "international_flight_coef": international_flight_coef,
+            "moving_average_alpha": moving_average_alpha,
+        }
+        for last_n_predictions, rang_power, international_flight_coef, moving_average_alpha in itertools.product(
+            args.last_n_predictions, args.rang_power, args.international_flight_coef, args.moving_average_alpha
+        )
+    ]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export the scored predictions to a columnar file.")
+    export.add_argument("path", help="The .npz file to write.")
+    export.add_argument("--days", type=float, default=14, help="The number of days of history exported.")
+
+    sweep_parser = commands.add_parser("sweep", help="Replay the leaderboard over an exported history.")
+    sweep_parser.add_argument("path", help="The .npz file written by the export command.")
+    sweep_parser.add_argument("--last-n-predictions", type=int, nargs="+", default=[LAST_N_PREDICTIONS])
+    sweep_parser.add_argument("--rang-power", type=float, nargs="+", default=[RANG_POWER])
+    sweep_parser.add_argument(
+        "--international-flight-coef",
+        type=float,
+        nargs="+",
+        default=[INTERNATIONAL_FLIGHT_COEF],
+        help="Coefficient of the error on international flights.",
+    )
+    sweep_parser.add_argument("--moving-average-alpha", type=float, nargs="+", default=[MOVING_AVERAGE_ALPHA])
+    sweep_parser.add_argument(
+        "--step-minutes", type=float, default=LEADERBOARD_STEP.total_seconds() / 60, help="Time between leaderboards."
+    )
+    sweep_parser.add_argument(
+        "--window-hours",
+        type=float,
+        default=SCORE_WINDOW.total_seconds() / 3600,
+        help="Age of the oldest scored prediction used.",
+    )
+    sweep_parser.add_argument("--workers", type=int, default=None, help="Number of processes. Defaults to the CPU count.")
+    sweep_parser.add_argument("--output", default=None, help="File the JSON report is written to instead of stdout.")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
+    if args.command == "export":
+        since = datetime.now(tz=timezone.utc).replace(tzinfo=None) - timedelta(days=args.days)
+        count = asyncio.run(export_history(HistoryExporter(), args.path, since))
+        bt.logging.info(f"Exported {count} scored predictions to {args.path}")
+        return
+
+    report = sweep(
+        args.path,
+        build_configs(args),
+        step=timedelta(minutes=args.step_minutes),
+        window=timedelta(hours=args.window_hours),
+        workers=args.workers,
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
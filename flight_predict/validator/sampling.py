@@ -0,0 +1,68 @@
+import bittensor as bt
+import numpy as np
+
+
+class CoverageSampler:
+    """
+    Picks the miners of a query round so that every hotkey gets the same number of flights over time.
+
+    Every hotkey keeps the count of flights it has been sent. A round picks the k candidates with the lowest counts,
+    ties broken at random. Hotkeys seen for the first time start at the lowest count of the current candidates,
+    so a new miner joins the rotation instead of being queried every round until it catches up.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self._counts: dict[str, int] = {}
+        self._rng = np.random.default_rng(seed)
+
+    def select(
+        self, miner_uids: np.ndarray, hotkeys: list[str], k: int, quarantined: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Returns the k uids of `miner_uids` with the lowest flight counts. `hotkeys` are indexed by uid.
+        Candidates flagged in the `quarantined` mask take their turn without taking one of the k slots, so they
+        are returned in addition to k other candidates.
+        """
+        if quarantined is None:
+            quarantined = np.zeros(len(miner_uids), dtype=bool)
+        if np.count_nonzero(~quarantined) <= k:
+            return miner_uids
+
+        known_counts = [self._counts[hotkeys[uid]] for uid in miner_uids if hotkeys[uid] in self._counts]
+        start_count = min(known_counts) if known_counts else 0
+        counts = np.fromiter(
+            (self._counts.setdefault(hotkeys[uid], start_count) for uid in miner_uids),
+            dtype=np.int64,
+            count=len(miner_uids),
+        )
+
+        order = np.lexsort((self._rng.random(len(miner_uids)), counts))
+        is_live = ~quarantined[order]
+        live_before = np.cumsum(is_live) - is_live
+        return miner_uids[order[live_before < k]]
+
+    def record(self, hotkeys: list[str], flights_count: int):
+        """Account `flights_count` flights sent to each of the hotkeys."""
+        for hotkey in hotkeys:
+            self._counts[hotkey] = self._counts.get(hotkey, 0) + flights_count
+
+    def prune(self, hotkeys: list[str]):
+        """Forget the hotkeys that are not registered anymore."""
+        registered = set(hotkeys)
+        self._counts = {hotkey: count for hotkey, count in self._counts.items() if hotkey in registered}
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            hotkeys=np.array(list(self._counts), dtype=str),
+            counts=np.array(list(self._counts.values()), dtype=np.int64),
+        )
+
+    def load(self, path: str):
+        try:
+            state = np.load(path)
+        except OSError:
+            bt.logging.warning("No coverage state file found, starting from scratch.")
+            return
+
+        self._counts = {str(hotkey): int(count) for hotkey, count in zip(state["hotkeys"], state["counts"], strict=True)}
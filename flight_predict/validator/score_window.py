@@ -0,0 +1,160 @@
+from datetime import timedelta
+from time import time
+from typing import TYPE_CHECKING
+
+import bittensor as bt
+import numpy as np
+
+if TYPE_CHECKING:
+    from flight_predict.db.mixin import DatabaseMixin
+
+
+class ScoreWindowStore:
+    """
+    In-memory rolling window of the last scored predictions of every miner.
+
+    Every hotkey owns a row of fixed-size ring buffers holding the id, final score, correctness and creation time
+    of its last `window_size` scored predictions. The store is warmed with a single streaming query on its first
+    refresh, then only the predictions scored since the highest id seen are read, so it follows scoring passes run
+    by the validator as well as by the separate scorer process. It mirrors `fetch_miner_scores` over the
+    `last_scored_predictions` table without querying the database for every leaderboard.
+    """
+
+    GROW_FACTOR = 2
+
+    def __init__(self, window_size: int, max_age: timedelta = timedelta(hours=48)):
+        self.window_size = window_size
+        self.max_age = max_age
+        self.last_id = 0
+        self._rows: dict[str, int] = {}
+        self._heads = np.zeros(0, dtype=np.int64)
+        self._ids = np.zeros((0, window_size), dtype=np.int64)
+        self._scores = np.zeros((0, window_size), dtype=np.float64)
+        self._is_correct = np.zeros((0, window_size), dtype=bool)
+        self._created_at = np.zeros((0, window_size), dtype=np.int64)  # epoch seconds, 0 for empty slots
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row_indices(self, hotkeys: np.ndarray) -> np.ndarray:
+        """Rows of the hotkeys, allocating rows for the new ones."""
+        for hotkey in hotkeys.tolist():
+            if hotkey not in self._rows:
+                self._rows[hotkey] = len(self._rows)
+
+        missing = len(self._rows) - len(self._heads)
+        if missing > 0:
+            grow = max(missing, len(self._heads) * (self.GROW_FACTOR - 1))
+            self._heads = np.concatenate([self._heads, np.zeros(grow, dtype=self._heads.dtype)])
+            self._ids, self._scores, self._is_correct, self._created_at = (
+                np.concatenate([column, np.zeros((grow, self.window_size), dtype=column.dtype)])
+                for column in (self._ids, self._scores, self._is_correct, self._created_at)
+            )
+
+        return np.array([self._rows[hotkey] for hotkey in hotkeys.tolist()], dtype=np.int64)
+
+    def add(
+        self,
+        ids: np.ndarray,
+        hotkeys: np.ndarray,
+        final_scores: np.ndarray,
+        is_correct: np.ndarray,
+        created_at: np.ndarray,
+    ):
+        """Append scored predictions sorted by id. `created_at` is in epoch seconds."""
+        if not len(ids):
+            return
+
+        unique_hotkeys, inverse = np.unique(hotkeys, return_inverse=True)
+        rows = self._row_indices(unique_hotkeys)[inverse]
+
+        # Position of every prediction among the predictions of its hotkey in this batch, keeping the id order.
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(sorted_rows)])
+        ranks = np.arange(len(sorted_rows)) - np.repeat(group_starts, group_sizes)
+        sizes = np.repeat(group_sizes, group_sizes)
+
+        # Only the last `window_size` predictions of a hotkey survive, so the older ones are not written at all.
+        kept = ranks >= sizes - self.window_size
+        order, sorted_rows, ranks = order[kept], sorted_rows[kept], ranks[kept]
+        positions = (self._heads[sorted_rows] + ranks) % self.window_size
+
+        self._ids[sorted_rows, positions] = ids[order]
+        self._scores[sorted_rows, positions] = final_scores[order]
+        self._is_correct[sorted_rows, positions] = is_correct[order]
+        self._created_at[sorted_rows, positions] = created_at[order]
+
+        group_rows = sorted_rows[np.r_[True, sorted_rows[1:] != sorted_rows[:-1]]]
+        self._heads[group_rows] = (self._heads[group_rows] + group_sizes) % self.window_size
+        self.last_id = max(self.last_id, int(ids.max()))
+
+    def _cutoff(self, now: float | None) -> float:
+        return (now or time()) - self.max_age.total_seconds()
+
+    def window_scores(
+        self, hotkeys: list[str], last_n_predictions: int, now: float | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sum of the correct final scores and number of correct predictions among the last `last_n_predictions`
+        non-expired scored predictions of every hotkey, aligned with `hotkeys`. Unknown hotkeys get zeros.
+        """
+        if last_n_predictions > self.window_size:
+            raise ValueError(f"The store keeps only the last {self.window_size} predictions of a miner")
+
+        rows = np.array([self._rows.get(hotkey, -1) for hotkey in hotkeys], dtype=np.int64)
+        known = rows >= 0
+        score_sums = np.zeros(len(hotkeys))
+        predictions_counts = np.zeros(len(hotkeys), dtype=np.int64)
+        if not known.any():
+            return score_sums, predictions_counts
+
+        rows = rows[known]
+        in_window = (self._created_at[rows] > self._cutoff(now)) & (self._ids[rows] > 0)
+        if last_n_predictions < self.window_size:
+            # Predictions are added in id order, so the slot just before the head holds the newest one.
+            slots = np.arange(self.window_size)
+            newest_rank = (self._heads[rows, None] - 1 - slots) % self.window_size
+            in_window &= newest_rank < last_n_predictions
+
+        is_counted = in_window & self._is_correct[rows]
+        score_sums[known] = np.where(is_counted, self._scores[rows], 0).sum(axis=1)
+        predictions_counts[known] = is_counted.sum(axis=1)
+        return score_sums, predictions_counts
+
+    def miner_scores(
+        self, hotkeys: list[str], last_n_predictions: int, now: float | None = None
+    ) -> dict[str, dict[str, float]]:
+        """Same output as `DatabaseMixin.fetch_miner_scores`."""
+        score_sums, predictions_counts = self.window_scores(hotkeys, last_n_predictions, now)
+        return {
+            hotkey: {"score_sum": score_sum, "predictions_count_coeff": predictions_count / last_n_predictions}
+            for hotkey, score_sum, predictions_count in zip(
+                hotkeys, score_sums.tolist(), predictions_counts.tolist(), strict=True
+            )
+            if predictions_count > 0
+        }
+
+    def prune(self, now: float | None = None):
+        """Drop the hotkeys whose whole window has expired."""
+        alive = (self._created_at[: len(self._rows)] > self._cutoff(now)).any(axis=1)
+        if alive.all():
+            return
+
+        hotkeys = np.array(list(self._rows), dtype=object)[alive]
+        self._heads = self._heads[: len(self._rows)][alive]
+        self._ids, self._scores, self._is_correct, self._created_at = (
+            column[: len(self._rows)][alive] for column in (self._ids, self._scores, self._is_correct, self._created_at)
+        )
+        self._rows = {hotkey: row for row, hotkey in enumerate(hotkeys.tolist())}
+
+    async def refresh(self, db: "DatabaseMixin"):
+        """Read the predictions scored since the last refresh. The first refresh warms the whole window up."""
+        added = 0
+        async for batch in db.stream_scored_predictions(self.last_id, self.max_age):
+            self.add(batch["id"], batch["miner_hotkey"], batch["final_score"], batch["is_correct"], batch["created_at"])
+            added += len(batch["id"])
+
+        self.prune()
+        bt.logging.debug(f"Score window refreshed with {added} scored predictions, {len(self)} miners in the window")
@@ -1,11 +1,15 @@
 import math
-from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 import bittensor as bt
 import numpy as np
+import wandb
 
 if TYPE_CHECKING:
+    from datetime import datetime
+
+    from flight_predict.db.models import MinerPredictions
     from flight_predict.schemas import ActualDeparturesFlightInfo
     from neurons.validator import Validator
 
@@ -13,26 +17,134 @@ if TYPE_CHECKING:
 INTERNATIONAL_FLIGHT_COEF = 1.0
 EARLY_PREDICTION_COEF = 1.0
 LAST_N_PREDICTIONS = 180
+RANG_POWER = 2
+
+REDIS_SCORING_PROGRESS_KEY = "scoring:progress"
+
+
+def score_prediction(prediction: "MinerPredictions", actual_flight: dict[str, Any]) -> dict[str, Any]:
+    """Score a single prediction against the actual data of its flight."""
+    actual_arrival_time, is_unmatched = actual_flight["actual_arrival_time"], actual_flight["is_unmatched"]
+    is_correct = prediction.is_valid and not is_unmatched
+    diff = -1
+    if is_correct:
+        predicted_arrival_time: datetime = prediction.predicted_arrival_time.replace(tzinfo=None)
+        actual_arrival_time: datetime = actual_arrival_time.replace(tzinfo=None)
+        diff = abs((predicted_arrival_time - actual_arrival_time).total_seconds())
+
+    final_score = diff * INTERNATIONAL_FLIGHT_COEF * EARLY_PREDICTION_COEF
+
+    return {
+        "flight_id": prediction.flight_id,
+        "prediction_id": prediction.id,
+        "miner_hotkey": prediction.miner_hotkey,
+        "actual_arrival_time": actual_arrival_time,
+        "predicted_arrival_time": prediction.predicted_arrival_time,
+        "absolute_prediction_error_seconds": diff,
+        "is_correct": is_correct,
+        "international_flight_coef": INTERNATIONAL_FLIGHT_COEF,
+        "early_prediction_coef": EARLY_PREDICTION_COEF,
+        "final_score": final_score,
+    }
+
+
+async def score_predictions_in_python(self: "Validator", actual_flights: dict[int, dict[str, Any]]) -> int:
+    """Stream the unscored predictions of the flights into the validator and score them one by one."""
+    scored_predictions_to_insert = []
+
+    # Only predictions which are not scored yet are streamed, so re-running a pass is nearly free.
+    async for prediction in self.stream_miner_predictions(list(actual_flights)):
+        actual_flight = actual_flights.get(prediction.flight_id)
+
+        if actual_flight is None:
+            continue
+
+        scored_predictions_to_insert.append(score_prediction(prediction, actual_flight))
+
+    await self.insert_scored_predictions(scored_predictions_to_insert)
+    return len(scored_predictions_to_insert)
 
 
-async def update_actual_data_and_score_miners(self: "Validator"):
+async def score_predictions_in_sql(self: "Validator", actual_flights: dict[int, dict[str, Any]]) -> int:
+    """Score the unscored predictions of the flights with a single set-based statement inside Postgres."""
+    return await self.score_predictions(list(actual_flights), INTERNATIONAL_FLIGHT_COEF, EARLY_PREDICTION_COEF)
+
+
+def actual_flights_to_arrays(actual_flights: dict[int, dict[str, Any]]) -> dict[str, np.ndarray]:
+    """Columns of the actual flights sorted by flight id, arrival times as epoch microseconds (NaT when unknown)."""
+    flight_ids = np.array(sorted(actual_flights), dtype=np.int64)
+    arrival_times = [actual_flights[flight_id]["actual_arrival_time"] for flight_id in flight_ids.tolist()]
+    return {
+        "flight_id": flight_ids,
+        "actual_arrival_time": np.array(
+            [time.replace(tzinfo=None) if time is not None else None for time in arrival_times], dtype="datetime64[us]"
+        ).astype(np.int64),
+        "is_unmatched": np.array(
+            [bool(actual_flights[flight_id]["is_unmatched"]) for flight_id in flight_ids.tolist()], dtype=bool
+        ),
+    }
+
+
+def score_predictions_columnar(
+    predictions: dict[str, np.ndarray], actual_flights: dict[str, np.ndarray]
+) -> dict[str, np.ndarray]:
     """
-    This function is used to get the actual flight data from the flight API.
+    Vectorized `score_prediction` over columns of predictions and of actual flights sorted by flight id.
+
+    Predictions are joined with their flight with `searchsorted`, predictions of unknown flights are dropped.
+    Times are epoch microseconds. A correct prediction of a flight without actual arrival time gets a NaN error.
     """
-    bt.logging.info("Updating actual data and scoring miners")
+    actual_flight_ids = actual_flights["flight_id"]
+    positions = np.searchsorted(actual_flight_ids, predictions["flight_id"])
+    is_known = positions < len(actual_flight_ids)
+    is_known[is_known] = actual_flight_ids[positions[is_known]] == predictions["flight_id"][is_known]
+    positions = positions[is_known]
 
-    flight_ids = await self.redis_client.smembers(self.REDIS_SCHEDULED_FLIGHTS_SET_KEY)
-    flight_ids = [int(flight_id) for flight_id in flight_ids]
+    actual_arrival_time = actual_flights["actual_arrival_time"][positions]
+    predicted_arrival_time = predictions["predicted_arrival_time"][is_known]
+    is_correct = predictions["is_valid"][is_known] & ~actual_flights["is_unmatched"][positions]
 
-    if not flight_ids:
-        return
+    # Same float as `timedelta.total_seconds()`: exact integer microseconds divided once.
+    diff = np.abs(predicted_arrival_time - actual_arrival_time) / 1e6
+    diff[actual_arrival_time == np.iinfo(np.int64).min] = np.nan
+    diff = np.where(is_correct, diff, -1.0)
+
+    return {
+        "prediction_id": predictions["id"][is_known],
+        "absolute_prediction_error_seconds": diff,
+        "is_correct": is_correct,
+        "final_score": diff * INTERNATIONAL_FLIGHT_COEF * EARLY_PREDICTION_COEF,
+    }
+
+
+async def score_predictions_in_numpy(self: "Validator", actual_flights: dict[int, dict[str, Any]]) -> int:
+    """Fetch the unscored predictions of the flights as columns and score them in bulk."""
+    predictions = await self.fetch_unscored_predictions(list(actual_flights))
+    scored = score_predictions_columnar(predictions, actual_flights_to_arrays(actual_flights))
+
+    await self.insert_scored_predictions_arrays(scored, INTERNATIONAL_FLIGHT_COEF, EARLY_PREDICTION_COEF)
+    return len(scored["prediction_id"])
+
+
+SCORING_ENGINES: dict[str, Callable[["Validator", dict[int, dict[str, Any]]], Awaitable[int]]] = {
+    "python": score_predictions_in_python,
+    "sql": score_predictions_in_sql,
+    "numpy": score_predictions_in_numpy,
+}
 
+
+async def score_flights_chunk(self: "Validator", flight_ids: list[int]) -> tuple[int, int]:
+    """
+    Fetch the actual data of a chunk of flights, score their predictions and forget the flights with actual data.
+    The actual data and the scores of a chunk are committed together, so the progress of a chunk survives a crash
+    of the following ones. Returns the number of flights with actual data and the number of scored predictions.
+    """
     flights: list[ActualDeparturesFlightInfo] = await self.flights_client.fetch_actual_flights_info(flight_ids)
 
-    bt.logging.debug(f"Got {len(flights)} actual flights from the API")
+    bt.logging.debug(f"Got {len(flights or [])} actual flights from the API")
 
     if not flights:
-        return
+        return 0, 0
 
     actual_flights_to_insert = {}
 
@@ -44,142 +156,141 @@ async def update_actual_data_and_score_miners(self: "Validator"):
             "is_unmatched": flight.is_unmatched,
         }
 
-    await self.insert_actual_flights(list(actual_flights_to_insert.values()))
+    score_predictions = SCORING_ENGINES[self.config.neuron.scoring_engine]
+    async with self.unit_of_work():
+        await self.insert_actual_flights(list(actual_flights_to_insert.values()))
+        scored_count = await score_predictions(self, actual_flights_to_insert)
 
-    scored_predictions_to_insert = []
+    bt.logging.debug(f"Inserted {scored_count} scored predictions")
 
-    async for prediction in self.stream_miner_predictions(flight_ids):
-        flight_id = prediction.flight_id
+    await self.redis_client.srem(self.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *actual_flights_to_insert)
+    return len(actual_flights_to_insert), scored_count
 
-        actual_flight = actual_flights_to_insert.get(flight_id)
 
-        if actual_flight is None:
-            continue
+async def report_scoring_progress(self: "Validator", progress: dict[str, int]):
+    """Publish the progress of the running scoring pass to the logs, W&B and Redis."""
+    bt.logging.info(
+        f"Scoring progress: {progress['flights_done']}/{progress['flights_total']} flights, "
+        f"{progress['predictions_scored']} predictions scored, {progress['chunks_failed']} chunks failed"
+    )
+    with suppress(Exception):
+        wandb.log({f"scoring_{name}": value for name, value in progress.items()})
+    await self.redis_client.hset(REDIS_SCORING_PROGRESS_KEY, mapping=progress)
 
-        actual_arrival_time, is_unmatched = actual_flight["actual_arrival_time"], actual_flight["is_unmatched"]
-        is_correct = prediction.is_valid and not is_unmatched
-        diff = -1
-        if is_correct:
-            predicted_arrival_time: datetime = prediction.predicted_arrival_time.replace(tzinfo=None)
-            actual_arrival_time: datetime = actual_arrival_time.replace(tzinfo=None)
-            diff = abs((predicted_arrival_time - actual_arrival_time).total_seconds())
-
-        final_score = diff * INTERNATIONAL_FLIGHT_COEF * EARLY_PREDICTION_COEF
-
-        scored_predictions_to_insert.append(
-            {
-                "flight_id": flight_id,
-                "prediction_id": prediction.id,
-                "miner_hotkey": prediction.miner_hotkey,
-                "actual_arrival_time": actual_arrival_time,
-                "predicted_arrival_time": prediction.predicted_arrival_time,
-                "absolute_prediction_error_seconds": diff,
-                "is_correct": is_correct,
-                "international_flight_coef": INTERNATIONAL_FLIGHT_COEF,
-                "early_prediction_coef": EARLY_PREDICTION_COEF,
-                "final_score": final_score,
-            }
-        )
 
-    await self.insert_scored_predictions(scored_predictions_to_insert)
+async def update_actual_data_and_score_miners(self: "Validator", on_chunk_done: Callable[[], Awaitable[Any]] | None = None):
+    """
+    This function is used to get the actual flight data from the flight API.
 
-    bt.logging.debug(f"Inserted {len(scored_predictions_to_insert)} scored predictions")
+    Flights are processed in chunks of `--neuron.scoring_chunk_size`, so the memory used by a pass does not grow
+    with the backlog. A failed chunk is left in the Redis set for the next pass. `on_chunk_done` is awaited after
+    every chunk, e.g. to extend the scoring lock.
+    """
+    bt.logging.info("Updating actual data and scoring miners")
+
+    flight_ids = await self.redis_client.smembers(self.REDIS_SCHEDULED_FLIGHTS_SET_KEY)
+    flight_ids = [int(flight_id) for flight_id in flight_ids]
+
+    if not flight_ids:
+        return
+
+    chunk_size = self.config.neuron.scoring_chunk_size
+    progress = {
+        "flights_total": len(flight_ids),
+        "flights_done": 0,
+        "flights_actualized": 0,
+        "predictions_scored": 0,
+        "chunks_done": 0,
+        "chunks_failed": 0,
+    }
+
+    for start in range(0, len(flight_ids), chunk_size):
+        chunk = flight_ids[start : start + chunk_size]
+        try:
+            actualized_count, scored_count = await score_flights_chunk(self, chunk)
+        except Exception as err:
+            bt.logging.error(f"Failed to score a chunk of {len(chunk)} flights: {err!s}")
+            progress["chunks_failed"] += 1
+        else:
+            progress["flights_actualized"] += actualized_count
+            progress["predictions_scored"] += scored_count
+            progress["chunks_done"] += 1
+
+        progress["flights_done"] += len(chunk)
+        await report_scoring_progress(self, progress)
+
+        if on_chunk_done is not None:
+            await on_chunk_done()
 
     await self.update_last_scored_predictions()
-    await self.redis_client.srem(self.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *actual_flights_to_insert)
 
 
-async def create_scores_leaderboard(self: "Validator"):
+def compute_leaderboard(
+    score_sums: np.ndarray,
+    predictions_counts: np.ndarray,
+    last_n_predictions: int = LAST_N_PREDICTIONS,
+    rang_power: float = RANG_POWER,
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
     """
-    This function is used to create the leaderboard.
+    Rank the miners by their score sum adjusted to the number of correct predictions, the lowest first.
+
+    `score_sums` and `predictions_counts` are indexed by uid, miners without correct predictions are not ranked.
+    Ties are broken by uid. Returns the final score of every uid and the leaderboard columns in rank order.
     """
-    rang_power = 2
+    neurons_count = len(score_sums)
+    uids = np.flatnonzero(predictions_counts > 0)
+    predictions_count_coeffs = predictions_counts[uids] / last_n_predictions
+    adjusted_scores = score_sums[uids] / predictions_count_coeffs
 
-    hotkeys = list(self.hotkeys)
+    order = np.lexsort((uids, adjusted_scores))
+    max_rang = len(uids)
+    rangs = max_rang - np.arange(max_rang)
+    rang_scores = rangs**rang_power * min((neurons_count / 128), 1)
+
+    final_scores = np.zeros(neurons_count)
+    final_scores[uids[order]] = rang_scores
 
-    miner_scores = await self.fetch_miner_scores(hotkeys, LAST_N_PREDICTIONS)
-    max_rang = len(miner_scores)
+    return final_scores, {
+        "uid": uids[order],
+        "score_sum": score_sums[uids][order],
+        "predictions_count": predictions_counts[uids][order],
+        "predictions_count_coeff": predictions_count_coeffs[order],
+        "adjusted_score": adjusted_scores[order],
+        "rang": rangs,
+        "final_score": rang_scores,
+    }
 
+
+async def create_scores_leaderboard(self: "Validator"):
+    """
+    This function is used to create the leaderboard.
+
+    Quarantined miners are ranked like every other miner: they are not queried, but every round stores a failed
+    prediction for them, so their evaluation window fills with failures exactly as if they had timed out.
+    """
+    hotkeys = list(self.hotkeys)
     neurons_count = len(hotkeys)
 
-    final_scores = np.zeros(neurons_count)
-    leaderboard = np.zeros(max_rang, dtype=[("score_sum", float), ("uid", int)])
-    
-    # Prepare data for database storage
-    leaderboard_snapshots = []
-    miner_data_by_uid = {}  # Store intermediate data for building snapshots
-
-    i = 0
-    for uid, hotkey in enumerate(hotkeys):
-        if hotkey not in miner_scores:
-            bt.logging.info(f"UID {uid} with hotkey {hotkey} has not valid scores")
-            continue
+    # The score window is refreshed by the caller, so the leaderboard itself does not query the database.
+    score_sums, predictions_counts = self.score_window.window_scores(hotkeys, LAST_N_PREDICTIONS)
+    final_scores, leaderboard = compute_leaderboard(score_sums, predictions_counts)
+    leaderboard["miner_hotkey"] = np.array(hotkeys, dtype=object)[leaderboard["uid"]]
 
-        score_info = miner_scores[hotkey]
-        score_sum = score_info["score_sum"]
-        predictions_count_coeff = score_info["predictions_count_coeff"]
-        
-        # Calculate predictions_count from coefficient
-        predictions_count = int(predictions_count_coeff * LAST_N_PREDICTIONS)
-        adjusted_score = score_sum / predictions_count_coeff if predictions_count_coeff > 0 else float('inf')
-        
-        bt.logging.info(f"UID {uid} with hotkey {hotkey} has score_sum {score_sum} "
-                        f"and predictions_count_coeff {predictions_count_coeff}")
-        leaderboard[i] = (adjusted_score, uid)
-        
-        # Store data for later snapshot creation
-        miner_data_by_uid[uid] = {
-            "hotkey": hotkey,
-            "score_sum": score_sum,
-            "predictions_count": predictions_count,
-            "predictions_count_coeff": predictions_count_coeff,
-            "adjusted_score": adjusted_score
-        }
-        
-        i += 1
-
-    sorted_indices = np.argsort(leaderboard, order="score_sum")
-    leaderboard = leaderboard[sorted_indices]
-
-    bt.logging.debug(f"Leaderboard: {leaderboard.tolist()}")
-
-    uids = leaderboard["uid"]
-
-    rangs = (max_rang - np.arange(max_rang)) ** rang_power * min((neurons_count / 128), 1)
-    final_scores[uids] = rangs
-    
-    # Build snapshot data for database
-    rang_power_adjusted = rang_power * min((neurons_count / 128), 1)
-    for position, (adjusted_score_val, uid) in enumerate(leaderboard):
-        if uid in miner_data_by_uid:
-            rang = max_rang - position
-            final_score = rangs[position]
-            miner_data = miner_data_by_uid[uid]
-            
-            snapshot = {
-                "miner_uid": int(uid),
-                "miner_hotkey": miner_data["hotkey"],
-                "score_sum": float(miner_data["score_sum"]),
-                "predictions_count": int(miner_data["predictions_count"]),
-                "predictions_count_coeff": float(miner_data["predictions_count_coeff"]),
-                "adjusted_score": float(adjusted_score_val),
-                "leaderboard_position": int(position + 1),  # 1-based position
-                "rang": int(rang),
-                "rang_power": float(rang_power_adjusted),
-                "final_score": float(final_score),
-                "total_miners_in_leaderboard": int(max_rang),
-                "evaluation_window_size": int(LAST_N_PREDICTIONS),
-                "created_at": datetime.now(tz=timezone.utc).replace(tzinfo=None)
-            }
-            leaderboard_snapshots.append(snapshot)
-    
-    # Save to database
-    if leaderboard_snapshots:
+    bt.logging.info(f"{len(leaderboard['uid'])} of {neurons_count} miners have valid scores")
+    bt.logging.debug(
+        f"Leaderboard: {list(zip(leaderboard['adjusted_score'].tolist(), leaderboard['uid'].tolist(), strict=True))}"
+    )
+
+    if len(leaderboard["uid"]):
         try:
-            await self.insert_leaderboard_snapshots(leaderboard_snapshots)
-            bt.logging.info(f"Saved {len(leaderboard_snapshots)} leaderboard entries to database")
+            await self.insert_leaderboard_snapshot(
+                leaderboard,
+                rang_power=RANG_POWER * min((neurons_count / 128), 1),
+                evaluation_window_size=LAST_N_PREDICTIONS,
+            )
+            bt.logging.info(f"Saved {len(leaderboard['uid'])} leaderboard entries to database")
         except Exception as e:
             bt.logging.error(f"Failed to save leaderboard snapshots: {e}")
-    
+
     bt.logging.debug(f"Final scores: {final_scores.tolist()}")
     self.update_scores(final_scores, list(range(neurons_count)))
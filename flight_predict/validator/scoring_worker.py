@@ -0,0 +1,53 @@
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+import bittensor as bt
+from redis.exceptions import LockError
+
+from flight_predict.validator.scoring import update_actual_data_and_score_miners
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+    from neurons.validator import Validator
+
+
+REDIS_SCORING_LOCK_KEY = "scoring:lock"
+REDIS_LAST_SCORED_AT_KEY = "scoring:last_scored_at"
+SCORING_LOCK_TIMEOUT = 60 * 60  # 1 hour
+
+
+async def get_last_scored_at(redis_client: "Redis") -> datetime | None:
+    """Time of the last finished scoring pass, shared by the validator and the scoring worker."""
+    value = await redis_client.get(REDIS_LAST_SCORED_AT_KEY)
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.decode() if isinstance(value, bytes) else value)
+
+
+async def run_scoring_if_due(self: "Validator", interval: int) -> bool:
+    """
+    Run a scoring pass if the last one finished more than `interval` seconds ago.
+    The pass holds a Redis lock, so the validator task and a separate scoring process never score concurrently.
+    Returns whether a pass has been run.
+    """
+    last_scored_at = await get_last_scored_at(self.redis_client)
+    now = datetime.now(tz=timezone.utc)
+    if last_scored_at is not None and last_scored_at + timedelta(seconds=interval) > now:
+        return False
+
+    lock = self.redis_client.lock(REDIS_SCORING_LOCK_KEY, timeout=SCORING_LOCK_TIMEOUT)
+    if not await lock.acquire(blocking=False):
+        bt.logging.info("Scoring is already running elsewhere, skipping")
+        return False
+
+    try:
+        # Every finished chunk extends the lock, so a long backlog does not outlive it.
+        await update_actual_data_and_score_miners(self, on_chunk_done=lock.reacquire)
+        await self.redis_client.set(REDIS_LAST_SCORED_AT_KEY, now.isoformat())
+    finally:
+        with suppress(LockError):
+            await lock.release()
+
+    return True
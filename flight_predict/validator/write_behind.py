@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import bittensor as bt
+import numpy as np
+from sqlalchemy import exc
+
+if TYPE_CHECKING:
+    from neurons.validator import Validator
+
+# Tables written by the query rounds and the mixin method storing each of them, in foreign keys order.
+WRITE_METHODS = {
+    "scheduled_flights": "insert_scheduled_flights",
+    "miner_predictions": "insert_miner_predictions",
+    "miner_response_stats": "insert_miner_response_stats",
+}
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-memory queue of the rows written by the query rounds, flushed to the database in the background.
+
+    Queued writes are merged and committed in a single unit of work once `flush_rows` rows are pending, and at
+    least every time `flush` is driven by the validator. A round waits only when `max_rows` rows are pending.
+    When the database rejects the merged writes they are committed one by one, so only the rejected ones are
+    dropped. When the database is unreachable the writes are appended to the `spill_path` file, which is replayed before
+    any other write once the database is back, so no round is lost and the writes keep their order.
+    """
+
+    def __init__(self, validator: "Validator", max_rows: int, flush_rows: int, spill_path: str):
+        self.validator = validator
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.spill_path = spill_path
+        self.pending_rows = 0
+        self.spilled_rows = 0
+        # A spill file left by a previous run is replayed by the first flush.
+        self.has_spilled = os.path.exists(spill_path)
+        self._pending: list[dict[str, list[dict[str, Any]]]] = []
+        self._space = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    async def put(self, writes: dict[str, list[dict[str, Any]]]):
+        """
+        Queue the rows of a round, keyed by table. Waits while the buffer is full, a write larger than the whole
+        buffer is accepted once the buffer is empty.
+        """
+        rows_count = count_rows(writes)
+        if not rows_count:
+            return
+
+        async with self._space:
+            if self.pending_rows and self.pending_rows + rows_count > self.max_rows:
+                bt.logging.warning(f"Write-behind buffer full with {self.pending_rows} rows, waiting for a flush")
+                self._schedule_flush()
+                await self._space.wait_for(lambda: not self.pending_rows or self.pending_rows + rows_count <= self.max_rows)
+            self._pending.append(writes)
+            self.pending_rows += rows_count
+
+        if self.pending_rows >= self.flush_rows:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_in_background())
+
+    async def _flush_in_background(self):
+        try:
+            await self.flush()
+        except Exception as err:
+            bt.logging.error(f"Write-behind flush failed: {err}")
+
+    async def flush(self) -> int:
+        """
+        Commit the pending writes, after the spilled ones, and return the number of written rows.
+        The writes are spilled to disk instead when the database is unreachable. They stay pending when even
+        the spill fails, to be retried by the next flush.
+        """
+        async with self._flush_lock:
+            writes = list(self._pending)
+            written_count = await self._flush_writes(writes)
+
+            async with self._space:
+                del self._pending[: len(writes)]
+                self.pending_rows -= sum(count_rows(write) for write in writes)
+                self._space.notify_all()
+
+            return written_count
+
+    async def _flush_writes(self, writes: list[dict[str, list[dict[str, Any]]]]) -> int:
+        if self.has_spilled and not await self.replay():
+            # The spilled writes go first, so the new ones are spilled behind them.
+            await self.spill(writes)
+            return 0
+
+        if not writes:
+            return 0
+
+        merged = merge_writes(writes)
+        try:
+            await commit_writes(self.validator, merged)
+        except Exception as err:
+            if not is_database_unavailable(err):
+                bt.logging.warning(f"Database rejected {count_rows(merged)} buffered rows, writing them one by one: {err}")
+                written_count, unwritten = await self._commit_each(writes)
+                await self.spill(unwritten)
+                return written_count
+            bt.logging.warning(f"Database unavailable, spilling {count_rows(merged)} rows to disk: {err}")
+            await self.spill(writes)
+            return 0
+
+        await self._schedule_flights(merged)
+        return count_rows(merged)
+
+    async def _commit_each(
+        self, writes: list[dict[str, list[dict[str, Any]]]]
+    ) -> tuple[int, list[dict[str, list[dict[str, Any]]]]]:
+        """
+        Commit the writes one unit of work each, dropping the ones the database rejects. Returns the number of
+        written rows and the writes left unwritten because the database became unreachable.
+        """
+        written_count = 0
+        for index, write in enumerate(writes):
+            try:
+                await commit_writes(self.validator, write)
+            except Exception as err:
+                if is_database_unavailable(err):
+                    return written_count, writes[index:]
+                bt.logging.error(f"Dropped a write of {count_rows(write)} rows: {err}")
+                continue
+
+            await self._schedule_flights(write)
+            written_count += count_rows(write)
+
+        return written_count, []
+
+    async def spill(self, writes: list[dict[str, list[dict[str, Any]]]]):
+        """Append the writes to the spill file, one JSON line per write, and sync it to disk."""
+        if not writes:
+            return
+
+        await asyncio.to_thread(append_and_sync, self.spill_path, dump_writes(writes))
+        self.spilled_rows += sum(count_rows(write) for write in writes)
+        self.has_spilled = True
+
+    async def replay(self) -> bool:
+        """
+        Commit the spilled writes in a single unit of work and remove the spill file.
+        Returns False, keeping the file, when the database is still unreachable.
+        """
+        writes = await asyncio.to_thread(read_spill_file, self.spill_path)
+        merged = merge_writes(writes)
+        try:
+            await commit_writes(self.validator, merged)
+        except Exception as err:
+            if is_database_unavailable(err):
+                return False
+            # A spilled write the database rejects would block every later write, only the rejected ones are dropped.
+            bt.logging.warning(f"Database rejected {count_rows(merged)} spilled rows, replaying them one by one: {err}")
+            written_count, unwritten = await self._commit_each(writes)
+            if unwritten:
+                # The committed writes are not replayed again.
+                await asyncio.to_thread(replace_and_sync, self.spill_path, dump_writes(unwritten))
+                self.spilled_rows = sum(count_rows(write) for write in unwritten)
+                return False
+            bt.logging.info(f"Replayed {written_count} spilled rows")
+        else:
+            await self._schedule_flights(merged)
+            bt.logging.info(f"Replayed {count_rows(merged)} spilled rows")
+
+        await asyncio.to_thread(os.remove, self.spill_path)
+        self.spilled_rows = 0
+        self.has_spilled = False
+        return True
+
+    async def _schedule_flights(self, writes: dict[str, list[dict[str, Any]]]):
+        try:
+            await schedule_flights(self.validator, writes)
+        except Exception as err:
+            bt.logging.error(f"Failed to schedule buffered flights for scoring: {err}")
+
+
+def count_rows(writes: dict[str, list[dict[str, Any]]]) -> int:
+    return sum(len(rows) for rows in writes.values())
+
+
+def merge_writes(writes: list[dict[str, list[dict[str, Any]]]]) -> dict[str, list[dict[str, Any]]]:
+    """Concatenate the rows of several writes table by table, in foreign keys order."""
+    merged = {table: [] for table in WRITE_METHODS}
+    for write in writes:
+        for table, rows in write.items():
+            merged[table].extend(rows)
+    return merged
+
+
+async def commit_writes(validator: "Validator", writes: dict[str, list[dict[str, Any]]]):
+    """Store the rows of every table in a single unit of work, in foreign keys order."""
+    async with validator.unit_of_work():
+        for table, method in WRITE_METHODS.items():
+            if writes.get(table):
+                await getattr(validator, method)(writes[table])
+
+
+async def schedule_flights(validator: "Validator", writes: dict[str, list[dict[str, Any]]]):
+    """Add the committed scheduled flights to the Redis set of flights to score."""
+    flight_ids = [str(flight["flight_id"]) for flight in writes.get("scheduled_flights", [])]
+    if flight_ids:
+        await validator.redis_client.sadd(validator.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *flight_ids)
+
+
+def is_database_unavailable(err: Exception) -> bool:
+    """Whether an error means the database could not be reached, rather than a write it rejected."""
+    if isinstance(err, (OSError, asyncio.TimeoutError, exc.TimeoutError, exc.OperationalError, exc.InterfaceError)):
+        return True
+    return isinstance(err, exc.DBAPIError) and err.connection_invalidated
+
+
+def encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot spill a value of type {type(value).__name__}")
+
+
+def decode_value(obj: dict[str, Any]) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def dump_writes(writes: list[dict[str, list[dict[str, Any]]]]) -> str:
+    """The lines of the spill file, one JSON line per write."""
+    return "".join(json.dumps(write, default=encode_value) + "\n" for write in writes)
+
+
+def append_and_sync(path: str, lines: str):
+    with open(path, "a") as file:
+        file.write(lines)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def replace_and_sync(path: str, lines: str):
+    """Atomically replace the file with the lines."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(lines)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def read_spill_file(path: str) -> list[dict[str, list[dict[str, Any]]]]:
+    """The writes of the spill file. A line torn by a crash while spilling is skipped."""
+    writes = []
+    with open(path) as file:
+        for line in file:
+            try:
+                writes.append(json.loads(line, object_hook=decode_value))
+            except json.JSONDecodeError:
+                bt.logging.warning(f"Skipped a corrupted line of the spill file {path}")
+    return writes
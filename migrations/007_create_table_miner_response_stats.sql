@@ -0,0 +1,18 @@
+--migrate:up
+CREATE TABLE miner_response_stats (
+    id SERIAL PRIMARY KEY,
+    round_id VARCHAR(32) NOT NULL,
+    miner_hotkey VARCHAR(64) NOT NULL,
+    miner_uid INT NOT NULL,
+    status_code INT,
+    latency_seconds FLOAT,
+    payload_size INT,
+    is_valid BOOLEAN NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_miner_response_stats_created_at ON miner_response_stats(created_at);
+CREATE INDEX idx_miner_response_stats_miner_hotkey_created_at ON miner_response_stats(miner_hotkey, created_at);
+
+--migrate:down
+DROP TABLE miner_response_stats;
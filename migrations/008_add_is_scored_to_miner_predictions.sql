@@ -0,0 +1,14 @@
+--migrate:up
+ALTER TABLE miner_predictions ADD COLUMN is_scored BOOLEAN NOT NULL DEFAULT FALSE;
+
+UPDATE miner_predictions AS mp
+SET is_scored = TRUE
+FROM scored_predictions AS sp
+WHERE sp.prediction_id = mp.id;
+
+-- Only the small unscored tail is looked up by flight id, so the index stays tiny.
+CREATE INDEX idx_miner_predictions_unscored_flight_id ON miner_predictions(flight_id) WHERE NOT is_scored;
+
+--migrate:down
+DROP INDEX idx_miner_predictions_unscored_flight_id;
+ALTER TABLE miner_predictions DROP COLUMN is_scored;
@@ -0,0 +1,48 @@
+--migrate:up
+DROP MATERIALIZED VIEW last_scored_predictions;
+
+-- Same rows as the former materialized view, maintained incrementally instead of being refreshed from scratch.
+CREATE TABLE last_scored_predictions (
+    id INT PRIMARY KEY REFERENCES scored_predictions(id) ON DELETE CASCADE,
+    miner_hotkey VARCHAR(64) NOT NULL,
+    final_score FLOAT,
+    is_correct BOOLEAN,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX idx_last_scored_predictions_created_at ON last_scored_predictions(created_at);
+CREATE INDEX idx_last_scored_predictions_miner_hotkey_id ON last_scored_predictions(miner_hotkey, id DESC);
+
+INSERT INTO last_scored_predictions (id, miner_hotkey, final_score, is_correct, created_at)
+SELECT sp.id, sp.miner_hotkey, sp.final_score, sp.is_correct, sp.created_at
+FROM scored_predictions AS sp
+WHERE sp.created_at > NOW() - INTERVAL '48 hours'
+AND sp.actual_arrival_time IS NOT NULL;
+
+-- Statement level trigger: the new scored predictions are copied in the transaction which inserts them,
+-- with a single set-based insert whatever the scoring engine.
+CREATE FUNCTION insert_last_scored_predictions() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO last_scored_predictions (id, miner_hotkey, final_score, is_correct, created_at)
+    SELECT id, miner_hotkey, final_score, is_correct, created_at
+    FROM new_scored_predictions
+    WHERE actual_arrival_time IS NOT NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER scored_predictions_insert_last_scored_predictions
+AFTER INSERT ON scored_predictions
+REFERENCING NEW TABLE AS new_scored_predictions
+FOR EACH STATEMENT EXECUTE PROCEDURE insert_last_scored_predictions();
+
+--migrate:down
+DROP TRIGGER scored_predictions_insert_last_scored_predictions ON scored_predictions;
+DROP FUNCTION insert_last_scored_predictions();
+DROP TABLE last_scored_predictions;
+
+CREATE MATERIALIZED VIEW last_scored_predictions AS
+SELECT sp.id, sp.miner_hotkey, sp.final_score, sp.is_correct
+FROM scored_predictions as sp
+WHERE sp.created_at > NOW() - INTERVAL '48 hours'
+AND sp.actual_arrival_time IS NOT NULL;
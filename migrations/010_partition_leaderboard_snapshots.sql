@@ -0,0 +1,180 @@
+--migrate:up
+ALTER TABLE leaderboard_snapshots RENAME TO leaderboard_snapshots_unpartitioned;
+ALTER SEQUENCE leaderboard_snapshots_id_seq RENAME TO leaderboard_snapshots_unpartitioned_id_seq;
+ALTER INDEX leaderboard_snapshots_pkey RENAME TO leaderboard_snapshots_unpartitioned_pkey;
+ALTER INDEX idx_leaderboard_created_at RENAME TO idx_leaderboard_unpartitioned_created_at;
+ALTER INDEX idx_leaderboard_miner_hotkey RENAME TO idx_leaderboard_unpartitioned_miner_hotkey;
+
+-- Monthly range partitions on created_at, old months are dropped as a whole instead of being deleted row by row.
+CREATE TABLE leaderboard_snapshots (
+    id SERIAL,
+
+    -- Miner identification
+    miner_uid INT NOT NULL,
+    miner_hotkey VARCHAR(64) NOT NULL,
+
+    -- Scoring metrics
+    score_sum FLOAT NOT NULL,
+    predictions_count INT NOT NULL,
+    predictions_count_coeff FLOAT NOT NULL,
+    adjusted_score FLOAT NOT NULL,
+
+    -- Ranking
+    leaderboard_position INT NOT NULL,
+    rang INT NOT NULL,
+    rang_power FLOAT NOT NULL,
+
+    -- Final values
+    final_score FLOAT NOT NULL,
+
+    -- Context
+    total_miners_in_leaderboard INT NOT NULL,
+    evaluation_window_size INT NOT NULL,
+
+    -- Timestamp
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX idx_leaderboard_created_at ON leaderboard_snapshots(created_at DESC);
+CREATE INDEX idx_leaderboard_miner_hotkey_created_at ON leaderboard_snapshots(miner_hotkey, created_at);
+
+-- Catches the rows outside of the created partitions, so an insert never fails on a missing month.
+CREATE TABLE leaderboard_snapshots_default PARTITION OF leaderboard_snapshots DEFAULT;
+
+-- A month whose rows already landed in the default partition cannot be created as a partition of the table,
+-- so its table is created alone, takes over these rows and is then attached. The default partition is locked
+-- until the end of the transaction, so no row of the month lands in it in between.
+CREATE FUNCTION create_leaderboard_snapshots_partitions(from_time TIMESTAMP, to_time TIMESTAMP) RETURNS INT AS $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', from_time);
+    partition_name TEXT;
+    created_count INT := 0;
+BEGIN
+    WHILE month_start <= to_time LOOP
+        partition_name := 'leaderboard_snapshots_' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            LOCK TABLE leaderboard_snapshots_default IN EXCLUSIVE MODE;
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE leaderboard_snapshots INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name
+            );
+            EXECUTE format(
+                'WITH moved AS ('
+                '    DELETE FROM leaderboard_snapshots_default WHERE created_at >= %L AND created_at < %L RETURNING *'
+                ') INSERT INTO %I SELECT * FROM moved',
+                month_start, month_start + INTERVAL '1 month', partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE leaderboard_snapshots ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_start + INTERVAL '1 month'
+            );
+            created_count := created_count + 1;
+        END IF;
+        month_start := month_start + INTERVAL '1 month';
+    END LOOP;
+    RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION drop_leaderboard_snapshots_partitions(older_than TIMESTAMP) RETURNS INT AS $$
+DECLARE
+    partition_table RECORD;
+    dropped_count INT := 0;
+BEGIN
+    FOR partition_table IN
+        SELECT c.relname
+        FROM pg_inherits AS i
+        JOIN pg_class AS c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'leaderboard_snapshots'::regclass
+        AND c.relname ~ '^leaderboard_snapshots_\d{4}_\d{2}$'
+    LOOP
+        IF CAST(to_date(right(partition_table.relname, 7), 'YYYY_MM') AS TIMESTAMP) + INTERVAL '1 month' <= older_than THEN
+            EXECUTE format('DROP TABLE %I', partition_table.relname);
+            dropped_count := dropped_count + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_leaderboard_snapshots_partitions(
+    COALESCE((SELECT MIN(created_at) FROM leaderboard_snapshots_unpartitioned), LOCALTIMESTAMP),
+    LOCALTIMESTAMP + INTERVAL '2 months'
+);
+
+INSERT INTO leaderboard_snapshots SELECT * FROM leaderboard_snapshots_unpartitioned;
+SELECT setval('leaderboard_snapshots_id_seq', COALESCE((SELECT MAX(id) FROM leaderboard_snapshots), 0) + 1, FALSE);
+
+-- Rollups keep sums rather than averages, so every new snapshot is merged in with a single upsert.
+CREATE TABLE leaderboard_snapshots_hourly (
+    bucket TIMESTAMP NOT NULL,
+    miner_hotkey VARCHAR(64) NOT NULL,
+    miner_uid INT NOT NULL,
+    snapshots_count INT NOT NULL,
+    final_score_sum FLOAT NOT NULL,
+    adjusted_score_sum FLOAT NOT NULL,
+    leaderboard_position_sum BIGINT NOT NULL,
+    best_leaderboard_position INT NOT NULL,
+    worst_leaderboard_position INT NOT NULL,
+    PRIMARY KEY (bucket, miner_hotkey)
+);
+
+CREATE INDEX idx_leaderboard_hourly_miner_hotkey_bucket ON leaderboard_snapshots_hourly(miner_hotkey, bucket);
+
+CREATE TABLE leaderboard_snapshots_daily (LIKE leaderboard_snapshots_hourly INCLUDING ALL);
+
+INSERT INTO leaderboard_snapshots_hourly
+SELECT
+    date_trunc('hour', created_at), miner_hotkey, (array_agg(miner_uid ORDER BY created_at DESC))[1], COUNT(*),
+    SUM(final_score), SUM(adjusted_score), SUM(leaderboard_position), MIN(leaderboard_position),
+    MAX(leaderboard_position)
+FROM leaderboard_snapshots
+GROUP BY 1, 2;
+
+INSERT INTO leaderboard_snapshots_daily
+SELECT
+    date_trunc('day', created_at), miner_hotkey, (array_agg(miner_uid ORDER BY created_at DESC))[1], COUNT(*),
+    SUM(final_score), SUM(adjusted_score), SUM(leaderboard_position), MIN(leaderboard_position),
+    MAX(leaderboard_position)
+FROM leaderboard_snapshots
+GROUP BY 1, 2;
+
+DROP TABLE leaderboard_snapshots_unpartitioned;
+
+--migrate:down
+DROP TABLE leaderboard_snapshots_daily;
+DROP TABLE leaderboard_snapshots_hourly;
+
+ALTER TABLE leaderboard_snapshots RENAME TO leaderboard_snapshots_partitioned;
+ALTER SEQUENCE leaderboard_snapshots_id_seq RENAME TO leaderboard_snapshots_partitioned_id_seq;
+ALTER INDEX leaderboard_snapshots_pkey RENAME TO leaderboard_snapshots_partitioned_pkey;
+DROP INDEX idx_leaderboard_created_at;
+DROP INDEX idx_leaderboard_miner_hotkey_created_at;
+
+CREATE TABLE leaderboard_snapshots (
+    id SERIAL PRIMARY KEY,
+    miner_uid INT NOT NULL,
+    miner_hotkey VARCHAR(64) NOT NULL,
+    score_sum FLOAT NOT NULL,
+    predictions_count INT NOT NULL,
+    predictions_count_coeff FLOAT NOT NULL,
+    adjusted_score FLOAT NOT NULL,
+    leaderboard_position INT NOT NULL,
+    rang INT NOT NULL,
+    rang_power FLOAT NOT NULL,
+    final_score FLOAT NOT NULL,
+    total_miners_in_leaderboard INT NOT NULL,
+    evaluation_window_size INT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_leaderboard_created_at ON leaderboard_snapshots(created_at DESC);
+CREATE INDEX idx_leaderboard_miner_hotkey ON leaderboard_snapshots(miner_hotkey);
+
+INSERT INTO leaderboard_snapshots SELECT * FROM leaderboard_snapshots_partitioned;
+SELECT setval('leaderboard_snapshots_id_seq', COALESCE((SELECT MAX(id) FROM leaderboard_snapshots), 0) + 1, FALSE);
+
+DROP TABLE leaderboard_snapshots_partitioned;
+DROP FUNCTION drop_leaderboard_snapshots_partitions(TIMESTAMP);
+DROP FUNCTION create_leaderboard_snapshots_partitions(TIMESTAMP, TIMESTAMP);
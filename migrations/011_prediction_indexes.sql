@@ -0,0 +1,24 @@
+--migrate:up
+-- A miner keeps its first prediction of a flight, the later ones are dropped with their scores before the
+-- uniqueness is enforced. New duplicates are skipped by the ON CONFLICT DO NOTHING of the inserts.
+DELETE FROM miner_predictions
+WHERE id IN (
+    SELECT id
+    FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY flight_id, miner_hotkey ORDER BY id) AS row_num
+        FROM miner_predictions
+    ) AS ranked
+    WHERE row_num > 1
+);
+
+-- Its index also serves every lookup of the predictions by flight, scored or not, and the cascade from
+-- scheduled_flights, which only the partial index of the unscored predictions served so far.
+ALTER TABLE miner_predictions
+ADD CONSTRAINT miner_predictions_flight_id_miner_hotkey_key UNIQUE (flight_id, miner_hotkey);
+
+CREATE INDEX idx_scored_predictions_flight_id ON scored_predictions(flight_id);
+
+--migrate:down
+DROP INDEX idx_scored_predictions_flight_id;
+
+ALTER TABLE miner_predictions DROP CONSTRAINT miner_predictions_flight_id_miner_hotkey_key;
@@ -22,7 +22,7 @@ import bittensor as bt
 
 import flight_predict
 from flight_predict.base.miner import BaseMinerNeuron
-from flight_predict.miner.prediction import predict
+from flight_predict.miner.prediction import predict, predict_batch
 
 
 class Miner(BaseMinerNeuron):
@@ -30,12 +30,18 @@ class Miner(BaseMinerNeuron):
         super(Miner, self).__init__(config=config)
         self.uid = self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
         self.axon.attach(self.forward, self.blacklist, self.priority)
+        self.axon.attach(self.forward_batch, self.blacklist_batch, self.priority_batch)
 
     async def forward(
         self, synapse: flight_predict.protocol.FlightPredictionSynapse
     ) -> flight_predict.protocol.FlightPredictionSynapse:
         return predict(self, synapse)
 
+    async def forward_batch(
+        self, synapse: flight_predict.protocol.FlightsBatchPredictionSynapse
+    ) -> flight_predict.protocol.FlightsBatchPredictionSynapse:
+        return predict_batch(self, synapse)
+
     async def blacklist(self, synapse: flight_predict.protocol.FlightPredictionSynapse) -> typing.Tuple[bool, str]:
         """
         Determines whether an incoming request should be blacklisted and thus ignored. Your implementation should
@@ -136,6 +142,14 @@ class Miner(BaseMinerNeuron):
         bt.logging.trace(f"Prioritizing {synapse.dendrite.hotkey} with value: {priority}")
         return priority
 
+    async def blacklist_batch(
+        self, synapse: flight_predict.protocol.FlightsBatchPredictionSynapse
+    ) -> typing.Tuple[bool, str]:
+        return await self.blacklist(synapse)
+
+    async def priority_batch(self, synapse: flight_predict.protocol.FlightsBatchPredictionSynapse) -> float:
+        return await self.priority(synapse)
+
     def print_running_info(self):
         log = (
             f"Emission:{self.metagraph.E[self.uid]:.04f} | "
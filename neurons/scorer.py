@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+
+import bittensor as bt
+from redis.asyncio import Redis
+
+from flight_predict.base.utils.config import add_args, add_validator_args
+from flight_predict.base.utils.scheduler import PeriodicTask, run_periodic_tasks
+from flight_predict.db.mixin import DatabaseMixin
+from flight_predict.services.flights_api import FlightsAPIClient
+from flight_predict.settings import REDIS_PORT, REDIS_URL
+from flight_predict.validator.scoring_worker import run_scoring_if_due
+from neurons.validator import Validator
+
+
+class Scorer(DatabaseMixin):
+    """
+    Standalone scoring worker for validators running with `--neuron.scoring_mode process`.
+    It shares the validator state through Postgres and Redis, the validator picks the new scores up
+    in its leaderboard task.
+    """
+
+    REDIS_SCHEDULED_FLIGHTS_SET_KEY = Validator.REDIS_SCHEDULED_FLIGHTS_SET_KEY
+    ACTUALIZE_FLIGHTS_DELAY = Validator.ACTUALIZE_FLIGHTS_DELAY
+    SCORING_CHECK_INTERVAL = Validator.SCORING_CHECK_INTERVAL
+
+    def __init__(self, config=None):
+        self.config = config or self.build_config()
+        bt.logging.set_config(config=self.config.logging)
+
+        self.wallet = bt.wallet(config=self.config)
+        self.configure_database()
+        self.redis_client = Redis(host=REDIS_URL, port=REDIS_PORT)
+        self.flights_client = FlightsAPIClient(self.wallet.hotkey)
+
+    @staticmethod
+    def build_config() -> "bt.Config":
+        parser = argparse.ArgumentParser()
+        bt.wallet.add_args(parser)
+        bt.subtensor.add_args(parser)
+        bt.logging.add_args(parser)
+        add_args(None, parser)
+        add_validator_args(None, parser)
+        return bt.config(parser)
+
+    async def scoring_task(self):
+        await run_scoring_if_due(self, self.ACTUALIZE_FLIGHTS_DELAY)
+
+    async def run(self):
+        bt.logging.info("Scorer starting")
+        await run_periodic_tasks(
+            [PeriodicTask("scoring", self.scoring_task, self.SCORING_CHECK_INTERVAL)],
+            lambda: False,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(Scorer().run())
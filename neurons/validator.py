@@ -17,48 +17,159 @@
 
 
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from traceback import print_exc
 
 import bittensor as bt
+import numpy as np
 from redis.asyncio import Redis
 
+from flight_predict.base.utils.scheduler import PeriodicTask
 from flight_predict.base.validator import BaseValidatorNeuron
 from flight_predict.db.mixin import DatabaseMixin
 from flight_predict.services.flights_api import FlightsAPIClient
 from flight_predict.settings import REDIS_PORT, REDIS_URL
-from flight_predict.validator.forward import forward_validator_task
-from flight_predict.validator.scoring import create_scores_leaderboard, update_actual_data_and_score_miners
+from flight_predict.validator.forward import forward_validator_task, probe_quarantined_miners
+from flight_predict.validator.health import MinerHealthTracker
+from flight_predict.validator.latency import MinerLatencyTracker
+from flight_predict.validator.prefetch import ScheduledFlightsPrefetcher
+from flight_predict.validator.sampling import CoverageSampler
+from flight_predict.validator.score_window import ScoreWindowStore
+from flight_predict.validator.scoring import LAST_N_PREDICTIONS, create_scores_leaderboard
+from flight_predict.validator.scoring_worker import get_last_scored_at, run_scoring_if_due
+from flight_predict.validator.write_behind import WriteBehindBuffer
 
 
 class Validator(BaseValidatorNeuron, DatabaseMixin):
     REDIS_SCHEDULED_FLIGHTS_SET_KEY = "scheduled_flights"
     ACTUALIZE_FLIGHTS_DELAY: int = 3 * 60 * 60  # 3 hours
+    SCORING_CHECK_INTERVAL: int = 5 * 60  # 5 minutes
+    PROBE_QUARANTINED_DELAY: int = 60 * 60  # 1 hour
+    PREFETCH_FILL_INTERVAL: int = 10
+    PREFETCH_WAIT_SECONDS: int = 60
+    LEADERBOARD_MAINTENANCE_INTERVAL: int = 24 * 60 * 60  # 1 day
+    DATABASE_POOL_METRICS_INTERVAL: int = 60
 
     def __init__(self, config=None):
+        # Created before the base initialization, which already loads and saves the validator state.
+        self.latency_tracker = MinerLatencyTracker()
+        self.coverage_sampler = CoverageSampler()
+        self.miner_health = MinerHealthTracker()
+        self.score_window = ScoreWindowStore(LAST_N_PREDICTIONS)
+        self.last_round_synapse = None
+
         super(Validator, self).__init__(config=config)
 
         self.configure_database()
         self.redis_client = Redis(host=REDIS_URL, port=REDIS_PORT)
         self.flights_client = FlightsAPIClient(self.dendrite.keypair)
+        self.flights_prefetcher = (
+            ScheduledFlightsPrefetcher(self, self.config.neuron.prefetch_flights)
+            if self.config.neuron.prefetch_flights > 0
+            else None
+        )
+        self.write_behind = (
+            WriteBehindBuffer(
+                self,
+                self.config.neuron.write_behind_max_rows,
+                self.config.neuron.write_behind_flush_rows,
+                self.config.neuron.full_path + "/write_behind.jsonl",
+            )
+            if self.config.neuron.write_behind_max_rows > 0
+            else None
+        )
 
         bt.logging.info("load_state()")
         self.load_state()
 
+    def save_state(self):
+        super().save_state()
+        self.latency_tracker.save(self.config.neuron.full_path + "/latency.npz")
+        self.coverage_sampler.prune(self.metagraph.hotkeys)
+        self.coverage_sampler.save(self.config.neuron.full_path + "/coverage.npz")
+        self.miner_health.prune(self.metagraph.hotkeys)
+        self.miner_health.save(self.config.neuron.full_path + "/health.npz")
+
+    def load_state(self):
+        super().load_state()
+        self.latency_tracker.load(self.config.neuron.full_path + "/latency.npz")
+        self.coverage_sampler.load(self.config.neuron.full_path + "/coverage.npz")
+        self.miner_health.load(self.config.neuron.full_path + "/health.npz")
+
+        # np.load returns the stored datetime wrapped in a 0-d object array.
+        if isinstance(self.last_update_scores_dt, np.ndarray):
+            self.last_update_scores_dt = self.last_update_scores_dt.item()
+        self.last_leaderboard_scored_at = self.last_update_scores_dt
+
     async def forward(self):
         try:
             await forward_validator_task(self)
         except BaseException as e:
             bt.logging.error(f"Error in forward: {e}")
             print_exc()
-        now = datetime.now(tz=timezone.utc)
-
-        if (self.last_update_scores_dt is None or
-            (self.last_update_scores_dt + timedelta(seconds=self.ACTUALIZE_FLIGHTS_DELAY) < now if self.last_update_scores_dt else True)):
-            bt.logging.info("Updating scores")
-            await update_actual_data_and_score_miners(self)
-            await create_scores_leaderboard(self)
-            self.last_update_scores_dt = now
+
+    async def prefetch_task(self):
+        await self.flights_prefetcher.fill()
+
+    async def probe_task(self):
+        await probe_quarantined_miners(self)
+
+    async def scoring_task(self):
+        await run_scoring_if_due(self, self.ACTUALIZE_FLIGHTS_DELAY)
+
+    async def leaderboard_task(self):
+        """Rebuild the leaderboard once after every finished scoring pass, wherever the pass has been run."""
+        # The first refresh warms the score window up at startup, the next ones only read the new scores.
+        await self.score_window.refresh(self)
+
+        last_scored_at = await get_last_scored_at(self.redis_client)
+        if last_scored_at is None or last_scored_at == self.last_leaderboard_scored_at:
+            return
+
+        await create_scores_leaderboard(self)
+        self.last_leaderboard_scored_at = last_scored_at
+        self.last_update_scores_dt = last_scored_at
+
+    async def leaderboard_maintenance_task(self):
+        """Create the upcoming leaderboard history partitions and drop the expired ones."""
+        created, dropped = await self.maintain_leaderboard_snapshots(
+            timedelta(days=self.config.neuron.leaderboard_retention_days)
+        )
+        bt.logging.info(f"Leaderboard snapshots partitions: {created} created, {dropped} dropped")
+
+    async def database_pool_task(self):
+        bt.logging.debug(f"Database pool: {self.log_database_pool_metrics()}")
+
+    async def write_behind_task(self):
+        written_count = await self.write_behind.flush()
+        bt.logging.debug(
+            f"Write-behind: {written_count} rows written, {self.write_behind.pending_rows} pending, "
+            f"{self.write_behind.spilled_rows} spilled"
+        )
+
+    async def flush_writes(self):
+        if self.write_behind is not None:
+            await self.write_behind.flush()
+
+    def periodic_tasks(self) -> list[PeriodicTask]:
+        tasks = [
+            *super().periodic_tasks(),
+            PeriodicTask("leaderboard", self.leaderboard_task, self.SCORING_CHECK_INTERVAL),
+            PeriodicTask(
+                "leaderboard_maintenance", self.leaderboard_maintenance_task, self.LEADERBOARD_MAINTENANCE_INTERVAL
+            ),
+            PeriodicTask("probe", self.probe_task, self.PROBE_QUARANTINED_DELAY, initial_delay=self.PROBE_QUARANTINED_DELAY),
+            PeriodicTask("database_pool", self.database_pool_task, self.DATABASE_POOL_METRICS_INTERVAL),
+        ]
+        if self.flights_prefetcher is not None:
+            tasks.append(PeriodicTask("prefetch", self.prefetch_task, self.PREFETCH_FILL_INTERVAL))
+        if self.write_behind is not None:
+            tasks.append(
+                PeriodicTask("write_behind", self.write_behind_task, self.config.neuron.write_behind_flush_interval)
+            )
+        if self.config.neuron.scoring_mode == "task":
+            tasks.append(PeriodicTask("scoring", self.scoring_task, self.SCORING_CHECK_INTERVAL))
+        return tasks
 
 
 # The main function parses the configuration and runs the validator.
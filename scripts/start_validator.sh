@@ -48,25 +48,41 @@ echo "Starting validator process"
 
 #!/bin/bash
 
-# Initialize the base command
-CMD="pm2 start neurons/validator.py --name $PROCESS_NAME --"
-
-# Add mandatory arguments
-CMD+=" --netuid $NETUID"
-CMD+=" --subtensor.network $SUBTENSOR_NETWORK"
-CMD+=" --wallet.name $WALLET_NAME"
-CMD+=" --wallet.hotkey $WALLET_HOTKEY"
-CMD+=" --logging.trace"
+# Arguments shared by the validator and the scorer process
+ARGS="--netuid $NETUID"
+ARGS+=" --subtensor.network $SUBTENSOR_NETWORK"
+ARGS+=" --wallet.name $WALLET_NAME"
+ARGS+=" --wallet.hotkey $WALLET_HOTKEY"
+ARGS+=" --logging.trace"
 
 # Conditionally add optional arguments
-[ -n "$SUBTENSOR_CHAIN_ENDPOINT" ] && CMD+=" --subtensor.chain_endpoint $SUBTENSOR_CHAIN_ENDPOINT"
-[ -n "$WANDB_PROJECT" ] && CMD+=" --wandb.project $WANDB_PROJECT"
-[ -n "$WANDB_ENTITY" ] && CMD+=" --wandb.entity $WANDB_ENTITY"
+[ -n "$SUBTENSOR_CHAIN_ENDPOINT" ] && ARGS+=" --subtensor.chain_endpoint $SUBTENSOR_CHAIN_ENDPOINT"
+[ -n "$WANDB_PROJECT" ] && ARGS+=" --wandb.project $WANDB_PROJECT"
+[ -n "$WANDB_ENTITY" ] && ARGS+=" --wandb.entity $WANDB_ENTITY"
+[ -n "$SCORING_MODE" ] && ARGS+=" --neuron.scoring_mode $SCORING_MODE"
+[ -n "$SCORING_ENGINE" ] && ARGS+=" --neuron.scoring_engine $SCORING_ENGINE"
+
+# Initialize the base command
+CMD="pm2 start neurons/validator.py --name $PROCESS_NAME -- $ARGS"
+
+# Add the validator only arguments
 [ -n "$AXON_PORT" ] && CMD+=" --axon.port $AXON_PORT"
 
 # Execute the constructed command
 eval "$CMD"
 
+if [ "$SCORING_MODE" = "process" ]; then
+  SCORER_PROCESS_NAME="$PROCESS_NAME-scorer"
+
+  if pm2 list | grep -q "$SCORER_PROCESS_NAME"; then
+    echo "Process '$SCORER_PROCESS_NAME' is already running. Deleting it..."
+    pm2 delete $SCORER_PROCESS_NAME
+  fi
+
+  echo "Starting scorer process"
+  pm2 start neurons/scorer.py --name $SCORER_PROCESS_NAME -- $ARGS
+fi
+
 AUTO_UPDATE_PROCESS_NAME="auto_update_monitor"
 
 # if ! pm2 list | grep -q "$AUTO_UPDATE_PROCESS_NAME"; then
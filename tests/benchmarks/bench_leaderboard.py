@@ -0,0 +1,39 @@
+"""
+Benchmark of the leaderboard computation, per-miner loop against the columnar engine.
+
+Usage: python -m tests.benchmarks.bench_leaderboard
+"""
+
+from flight_predict.validator.scoring import compute_leaderboard
+from tests.benchmarks.common import measure, print_report
+from tests.helpers import build_scores, compute_leaderboard_loop, to_miner_scores
+
+SIZES = (256, 1024, 4096)
+
+
+def main():
+    results = []
+    for neurons_count in SIZES:
+        hotkeys, score_sums, predictions_counts = build_scores(neurons_count)
+        miner_scores = to_miner_scores(hotkeys, score_sums, predictions_counts)
+
+        results.append(
+            {
+                "implementation": "loop",
+                "uids": neurons_count,
+                **measure(lambda: compute_leaderboard_loop(hotkeys, miner_scores)),
+            }
+        )
+        results.append(
+            {
+                "implementation": "columnar",
+                "uids": neurons_count,
+                **measure(lambda: compute_leaderboard(score_sums, predictions_counts)),
+            }
+        )
+
+    print_report("compute_leaderboard", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of the scoring and leaderboard pipeline against Postgres, on seeded synthetic data at several scales.
+
+Needs the test database on localhost:5434, Redis is replaced by fakeredis. The synthetic rows are deleted afterwards.
+
+Usage: python -m tests.benchmarks.bench_pipeline
+"""
+
+import asyncio
+
+from fakeredis import FakeAsyncRedis
+
+from flight_predict.validator.score_window import ScoreWindowStore
+from flight_predict.validator.scoring import (
+    LAST_N_PREDICTIONS,
+    SCORING_ENGINES,
+    create_scores_leaderboard,
+    update_actual_data_and_score_miners,
+)
+from tests.benchmarks.common import measure_async, print_report
+from tests.benchmarks.dataset import FlightsClientStub, cleanup_dataset, generate_dataset, reset_scoring, seed_dataset
+from tests.helpers import MetagraphStub, ValidatorStub
+
+# (miners, flights), one prediction per miner and flight.
+SCALES = ((64, 100), (256, 200), (256, 1_000))
+
+
+def build_validator(dataset: dict) -> ValidatorStub:
+    metagraph = MetagraphStub(len(dataset["hotkeys"]))
+    metagraph.hotkeys = dataset["hotkeys"]
+    validator = ValidatorStub(metagraph)
+    validator.hotkeys = dataset["hotkeys"]
+    validator.redis_client = FakeAsyncRedis()
+    validator.flights_client = FlightsClientStub(dataset["actual_flights"])
+    return validator
+
+
+async def benchmark_scale(miners_count: int, flights_count: int) -> list[dict]:
+    dataset = generate_dataset(miners_count, flights_count)
+    validator = build_validator(dataset)
+    scale = {"miners": miners_count, "flights": flights_count, "predictions": len(dataset["predictions"])}
+    results = []
+
+    async def schedule_flights():
+        await reset_scoring(validator, dataset)
+        await validator.redis_client.sadd(validator.REDIS_SCHEDULED_FLIGHTS_SET_KEY, *dataset["flight_ids"])
+
+    async def empty_score_window():
+        validator.score_window = ScoreWindowStore(LAST_N_PREDICTIONS)
+
+    await cleanup_dataset(validator, dataset)
+    await seed_dataset(validator, dataset)
+    try:
+        # A pass consumes the scheduled flights, so every run starts from unscored predictions.
+        for engine in SCORING_ENGINES:
+            validator.config.neuron.scoring_engine = engine
+            timings = await measure_async(
+                lambda: update_actual_data_and_score_miners(validator), repeat=3, setup=schedule_flights
+            )
+            results.append({**scale, "operation": "update_actual_data_and_score_miners", "engine": engine, **timings})
+
+        for operation, func, setup in (
+            ("update_last_scored_predictions", validator.update_last_scored_predictions, None),
+            ("fetch_miner_scores", lambda: validator.fetch_miner_scores(dataset["hotkeys"], LAST_N_PREDICTIONS), None),
+            ("score_window_warmup", lambda: validator.score_window.refresh(validator), empty_score_window),
+            ("create_scores_leaderboard", lambda: create_scores_leaderboard(validator), None),
+        ):
+            results.append({**scale, "operation": operation, **await measure_async(func, setup=setup)})
+    finally:
+        await cleanup_dataset(validator, dataset)
+        await validator.db_engine.dispose()
+
+    return results
+
+
+async def run():
+    results = []
+    for miners_count, flights_count in SCALES:
+        results.extend(await benchmark_scale(miners_count, flights_count))
+    print_report("scoring_pipeline", results)
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of prediction scoring, per-row loop against the columnar NumPy path.
+
+Usage: python -m tests.benchmarks.bench_scoring
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from flight_predict.validator.scoring import actual_flights_to_arrays, score_prediction, score_predictions_columnar
+from tests.benchmarks.common import measure, print_report
+
+SIZES = (1_000, 100_000, 1_000_000)
+PREDICTIONS_PER_FLIGHT = 256
+
+
+def build_predictions(predictions_count: int) -> tuple[list[SimpleNamespace], dict[str, np.ndarray], dict[int, dict]]:
+    rng = np.random.default_rng(0)
+    now = datetime(2025, 1, 1, 12)
+    flights_count = max(predictions_count // PREDICTIONS_PER_FLIGHT, 1)
+
+    actual_flights = {
+        flight_id: {
+            "actual_arrival_time": now + timedelta(seconds=int(offset)),
+            "is_unmatched": bool(is_unmatched),
+        }
+        for flight_id, offset, is_unmatched in zip(
+            range(flights_count), rng.integers(-3600, 3600, flights_count), rng.random(flights_count) < 0.05
+        )
+    }
+
+    columns = {
+        "id": np.arange(predictions_count, dtype=np.int64),
+        "flight_id": rng.integers(0, flights_count, predictions_count),
+        "predicted_arrival_time": np.datetime64(now, "us").astype(np.int64)
+        + rng.integers(-3600 * 10**6, 3600 * 10**6, predictions_count),
+        "is_valid": rng.random(predictions_count) > 0.1,
+    }
+    predictions = [
+        SimpleNamespace(
+            id=prediction_id,
+            flight_id=flight_id,
+            miner_hotkey="hotkey",
+            predicted_arrival_time=predicted_arrival_time,
+            is_valid=is_valid,
+        )
+        for prediction_id, flight_id, predicted_arrival_time, is_valid in zip(
+            columns["id"].tolist(),
+            columns["flight_id"].tolist(),
+            columns["predicted_arrival_time"].astype("datetime64[us]").tolist(),
+            columns["is_valid"].tolist(),
+        )
+    ]
+    return predictions, columns, actual_flights
+
+
+def score_loop(predictions: list[SimpleNamespace], actual_flights: dict[int, dict]) -> list[dict]:
+    """The per-row path of `score_predictions_in_python`, without the database."""
+    scored = []
+    for prediction in predictions:
+        actual_flight = actual_flights.get(prediction.flight_id)
+        if actual_flight is None:
+            continue
+        scored.append(score_prediction(prediction, actual_flight))
+    return scored
+
+
+def main():
+    results = []
+    for predictions_count in SIZES:
+        predictions, columns, actual_flights = build_predictions(predictions_count)
+        repeat = 1 if predictions_count >= 1_000_000 else 5
+
+        results.append(
+            {
+                "implementation": "loop",
+                "predictions": predictions_count,
+                **measure(lambda: score_loop(predictions, actual_flights), repeat=repeat),
+            }
+        )
+        results.append(
+            {
+                "implementation": "columnar",
+                "predictions": predictions_count,
+                **measure(
+                    lambda: score_predictions_columnar(columns, actual_flights_to_arrays(actual_flights)), repeat=repeat
+                ),
+            }
+        )
+
+    print_report("score_predictions", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of miner selection over the metagraph.
+
+Usage: python -m tests.benchmarks.bench_uids
+"""
+
+import random
+
+import numpy as np
+
+from flight_predict.base.utils.uids import check_uid_availability, get_available_miners
+from tests.benchmarks.common import measure, print_report
+from tests.helpers import build_validator
+
+SIZES = (256, 1024, 4096)
+
+
+def get_available_miners_loop(self, k=None, exclude=None) -> np.ndarray:
+    """The per-uid implementation replaced by the mask-based one, kept as the baseline."""
+    candidate_uids = []
+    avail_uids = []
+
+    for uid in range(self.metagraph.n.item()):
+        uid_is_available = check_uid_availability(self.metagraph, uid, self.config.neuron.vpermit_tao_limit)
+        uid_is_not_excluded = exclude is None or uid not in exclude
+
+        if uid_is_available:
+            avail_uids.append(uid)
+            if uid_is_not_excluded:
+                candidate_uids.append(uid)
+
+    if k is None:
+        k = len(avail_uids)
+
+    k = min(k, len(avail_uids))
+    available_uids = candidate_uids
+    if len(candidate_uids) < k:
+        available_uids += random.sample(
+            [uid for uid in avail_uids if uid not in candidate_uids],
+            k - len(candidate_uids),
+        )
+    return np.array(random.sample(available_uids, k))
+
+
+def main():
+    results = []
+    for neurons_count in SIZES:
+        validator = build_validator(neurons_count)
+        exclude = list(range(0, neurons_count, 2))
+
+        for implementation, func in (("loop", get_available_miners_loop), ("mask", get_available_miners)):
+            results.append(
+                {
+                    "implementation": implementation,
+                    "uids": neurons_count,
+                    **measure(lambda func=func: func(validator, exclude=exclude)),
+                }
+            )
+
+    print_report("get_available_miners", results)
+
+
+if __name__ == "__main__":
+    main()
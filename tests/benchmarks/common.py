@@ -0,0 +1,35 @@
+import json
+import statistics
+import sys
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> dict[str, float]:
+    """Run `func` `repeat` times and return its best and median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return {"min_seconds": min(timings), "median_seconds": statistics.median(timings)}
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]], repeat: int = 5, setup: Callable[[], Awaitable[Any]] | None = None
+) -> dict[str, float]:
+    """Await `func` `repeat` times, after `setup` when given, and return its best and median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            await setup()
+        start = perf_counter()
+        await func()
+        timings.append(perf_counter() - start)
+    return {"min_seconds": min(timings), "median_seconds": statistics.median(timings)}
+
+
+def print_report(name: str, results: list[dict[str, Any]]):
+    """Print a machine-readable benchmark report to stdout."""
+    json.dump({"benchmark": name, "results": results}, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
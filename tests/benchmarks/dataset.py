@@ -0,0 +1,134 @@
+"""Seeded synthetic flights, predictions and actual data for the benchmarks that run against Postgres."""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, text, update
+
+from flight_predict.db.mixin import DatabaseMixin
+from flight_predict.db.models import ActualFlights, MinerPredictions, ScheduledFlights, ScoredPredictions
+from flight_predict.schemas import ActualDeparturesFlightInfo
+
+# Far above the ids of the real flights, so a benchmark never touches them.
+FLIGHT_ID_OFFSET = 2_000_000_000
+INSERT_CHUNK_SIZE = 5_000
+
+
+def generate_dataset(miners_count: int, flights_count: int, seed: int = 0) -> dict[str, Any]:
+    """
+    Scheduled flights, their actual data and one prediction per miner and flight.
+
+    Every miner has its own error spread, so the leaderboard is not a tie, and fails some predictions.
+    About 3% of the flights are unmatched by the flights API.
+    """
+    rng = np.random.default_rng(seed)
+    now = datetime.now().replace(microsecond=0)
+    hotkeys = [f"bench_hotkey_{uid}" for uid in range(miners_count)]
+    flight_ids = FLIGHT_ID_OFFSET + np.arange(flights_count)
+
+    scheduled_arrival_times = [
+        now - timedelta(hours=4) + timedelta(seconds=int(offset)) for offset in rng.integers(0, 3600, flights_count)
+    ]
+    delays = rng.normal(0, 900, flights_count).astype(int)
+    is_unmatched = rng.random(flights_count) < 0.03
+
+    scheduled_flights = [
+        {
+            "flight_id": flight_id,
+            "flight_ident_icao": f"BCH{flight_id % 10_000}",
+            "flight_ident_iata": f"BC{flight_id % 10_000}",
+            "operating_airline_iata": "BC",
+            "departure_iata": "AAA",
+            "destination_iata": "BBB",
+            "scheduled_departure_time": scheduled_arrival_time - timedelta(hours=2),
+            "scheduled_arrival_time": scheduled_arrival_time,
+            "aircraft_type": "A320",
+            "is_domestic": bool(is_domestic),
+        }
+        for flight_id, scheduled_arrival_time, is_domestic in zip(
+            flight_ids.tolist(), scheduled_arrival_times, rng.random(flights_count) < 0.7, strict=True
+        )
+    ]
+    actual_flights = {
+        flight_id: ActualDeparturesFlightInfo(
+            flight_id=flight_id,
+            actual_departure_time=scheduled_arrival_time - timedelta(hours=2) + timedelta(seconds=delay),
+            actual_arrival_time=None if unmatched else scheduled_arrival_time + timedelta(seconds=delay),
+            is_unmatched=bool(unmatched),
+        )
+        for flight_id, scheduled_arrival_time, delay, unmatched in zip(
+            flight_ids.tolist(), scheduled_arrival_times, delays.tolist(), is_unmatched.tolist(), strict=True
+        )
+    }
+
+    miner_spreads = rng.uniform(60, 1800, miners_count)
+    miner_failure_rates = rng.uniform(0, 0.2, miners_count)
+    errors = rng.normal(0, miner_spreads[:, None], (miners_count, flights_count))
+    is_valid = rng.random((miners_count, flights_count)) >= miner_failure_rates[:, None]
+    predictions = [
+        {
+            "miner_hotkey": hotkeys[uid],
+            "miner_uid": uid,
+            "flight_id": int(flight_ids[flight]),
+            "predicted_arrival_time": scheduled_arrival_times[flight]
+            + timedelta(seconds=int(delays[flight] + errors[uid, flight]))
+            if is_valid[uid, flight]
+            else None,
+            "is_valid": bool(is_valid[uid, flight]),
+        }
+        for uid in range(miners_count)
+        for flight in range(flights_count)
+    ]
+
+    return {
+        "hotkeys": hotkeys,
+        "flight_ids": flight_ids.tolist(),
+        "scheduled_flights": scheduled_flights,
+        "actual_flights": actual_flights,
+        "predictions": predictions,
+    }
+
+
+class FlightsClientStub:
+    """Flights API answering with the actual data of a synthetic dataset."""
+
+    def __init__(self, actual_flights: dict[int, ActualDeparturesFlightInfo]):
+        self.actual_flights = actual_flights
+
+    async def fetch_actual_flights_info(self, flight_ids: list[int]) -> list[ActualDeparturesFlightInfo]:
+        return [self.actual_flights[flight_id] for flight_id in flight_ids if flight_id in self.actual_flights]
+
+
+async def seed_dataset(db: DatabaseMixin, dataset: dict[str, Any]):
+    """
+    Store the scheduled flights and predictions of a dataset. The flights are inserted in chunks below the bind
+    parameters limit, the predictions are copied in bulk.
+    """
+    for start in range(0, len(dataset["scheduled_flights"]), INSERT_CHUNK_SIZE):
+        await db.insert_scheduled_flights(dataset["scheduled_flights"][start : start + INSERT_CHUNK_SIZE])
+    await db.insert_miner_predictions(dataset["predictions"])
+
+
+async def reset_scoring(db: DatabaseMixin, dataset: dict[str, Any]):
+    """Forget the actual data and the scores of a dataset, so it can be scored again."""
+    async with db.db_engine.connect() as conn:
+        await conn.execute(delete(ScoredPredictions).where(ScoredPredictions.flight_id.in_(dataset["flight_ids"])))
+        await conn.execute(delete(ActualFlights).where(ActualFlights.flight_id.in_(dataset["flight_ids"])))
+        await conn.execute(
+            update(MinerPredictions).where(MinerPredictions.flight_id.in_(dataset["flight_ids"])).values(is_scored=False)
+        )
+        await conn.commit()
+
+
+async def cleanup_dataset(db: DatabaseMixin, dataset: dict[str, Any]):
+    """Delete every row of a dataset, predictions and scores go with their flights."""
+    async with db.db_engine.connect() as conn:
+        await conn.execute(delete(ActualFlights).where(ActualFlights.flight_id.in_(dataset["flight_ids"])))
+        await conn.execute(delete(ScheduledFlights).where(ScheduledFlights.flight_id.in_(dataset["flight_ids"])))
+        for table in ("leaderboard_snapshots", "leaderboard_snapshots_hourly", "leaderboard_snapshots_daily"):
+            await conn.execute(
+                text(f"DELETE FROM {table} WHERE miner_hotkey = ANY(:miner_hotkeys)"),  # noqa: S608
+                {"miner_hotkeys": dataset["hotkeys"]},
+            )
+        await conn.commit()
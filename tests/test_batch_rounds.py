@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from flight_predict.validator.forward import create_flights_batch_synapse, process_miner_responses
+from tests.helpers import MetagraphStub, ValidatorStub, build_flight
+
+FLIGHTS = [build_flight(flight_id) for flight_id in (1, 2, 3)]
+
+
+def answer(synapse, predicted_arrival_times: list[str | None]):
+    response = synapse.model_copy(deep=True)
+    for flight, predicted_arrival_time in zip(response.flights, predicted_arrival_times, strict=True):
+        flight.predicted_arrival_time = predicted_arrival_time
+    response.dendrite.status_code = 200
+    response.dendrite.process_time = 1.5
+    return response
+
+
+def test_batch_responses_give_one_prediction_per_miner_and_flight():
+    validator = ValidatorStub(MetagraphStub(3))
+    synapse = create_flights_batch_synapse(FLIGHTS)
+    responses = [
+        answer(synapse, ["2026-01-01T14:00:00", "2026-01-01T14:05:00", "2026-01-01T14:10:00"]),
+        answer(synapse, ["2026-01-01T14:00:00", "not a date", "2026-01-01T14:10:00"]),
+    ]
+    # A response dropping one of the flights cannot be matched to the flights of the round.
+    responses.append(responses[0].model_copy(update={"flights": responses[0].flights[:2]}))
+
+    predictions, response_stats = process_miner_responses(responses, [0, 1, 2], FLIGHTS, validator, "round")
+
+    assert [(row["miner_uid"], row["flight_id"]) for row in predictions] == [
+        (uid, flight_id) for uid in (0, 1, 2) for flight_id in (1, 2, 3)
+    ]
+    assert [row["is_valid"] for row in predictions] == [True, True, True, True, False, True, False, False, False]
+    assert predictions[1]["predicted_arrival_time"] == datetime(2026, 1, 1, 14, 5)
+    assert [stats["is_valid"] for stats in response_stats] == [True, False, False]
+    assert all(stats["status_code"] == 200 and stats["latency_seconds"] == 1.5 for stats in response_stats)
@@ -0,0 +1,33 @@
+import pytest
+
+from flight_predict.schemas import DeparturesFlightsResponse
+from flight_predict.services.flights_api import FlightsAPIClient
+from tests.helpers import build_flight, kp
+
+
+def serve_flights(monkeypatch, responses: list[DeparturesFlightsResponse | Exception | None]):
+    """Answer the single-flight requests with `responses`, in order."""
+    responses = iter(responses)
+
+    async def fetch_scheduled_flight(self):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(FlightsAPIClient, "fetch_scheduled_flight", fetch_scheduled_flight)
+
+
+async def test_batch_keeps_the_fetched_flights_when_a_request_fails(monkeypatch):
+    serve_flights(monkeypatch, [build_flight(1), TimeoutError("timed out"), build_flight(2), build_flight(1), None])
+
+    flights = await FlightsAPIClient(kp).fetch_scheduled_flights(5)
+
+    assert [flight.flight_id for flight in flights] == [1, 2]
+
+
+async def test_batch_fails_when_every_request_fails(monkeypatch):
+    serve_flights(monkeypatch, [TimeoutError("timed out")] * 3)
+
+    with pytest.raises(TimeoutError):
+        await FlightsAPIClient(kp).fetch_scheduled_flights(3)
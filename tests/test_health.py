@@ -0,0 +1,98 @@
+from flight_predict.protocol import FlightPredictionSynapse
+from flight_predict.validator.forward import probe_quarantined_miners
+from flight_predict.validator.health import MinerHealthState, MinerHealthTracker
+from tests.helpers import MetagraphStub, ValidatorStub
+
+HOTKEYS = [f"hotkey_{uid}" for uid in range(4)]
+
+
+def quarantine(tracker: MinerHealthTracker, hotkey: str):
+    for _ in range(MinerHealthTracker.QUARANTINE_AFTER_FAILURES):
+        tracker.record(hotkey, is_success=False)
+
+
+def test_failures_degrade_then_quarantine_a_miner():
+    tracker = MinerHealthTracker()
+
+    for failures in range(1, MinerHealthTracker.QUARANTINE_AFTER_FAILURES + 1):
+        tracker.record(HOTKEYS[0], is_success=False)
+        if failures < MinerHealthTracker.DEGRADED_AFTER_FAILURES:
+            assert tracker.state(HOTKEYS[0]) == MinerHealthState.HEALTHY
+        elif failures < MinerHealthTracker.QUARANTINE_AFTER_FAILURES:
+            assert tracker.state(HOTKEYS[0]) == MinerHealthState.DEGRADED
+
+    assert tracker.state(HOTKEYS[0]) == MinerHealthState.QUARANTINED
+    assert tracker.quarantined_mask(HOTKEYS).tolist() == [True, False, False, False]
+
+    tracker.record(HOTKEYS[0], is_success=True)
+    assert tracker.state(HOTKEYS[0]) == MinerHealthState.HEALTHY
+
+
+def test_state_is_restored_without_the_deregistered_hotkeys(tmp_path):
+    tracker = MinerHealthTracker()
+    quarantine(tracker, HOTKEYS[0])
+    quarantine(tracker, HOTKEYS[1])
+    tracker.prune(HOTKEYS[1:])
+    path = str(tmp_path / "health.npz")
+    tracker.save(path)
+
+    restored = MinerHealthTracker()
+    restored.load(path)
+
+    assert restored.quarantined_mask(HOTKEYS).tolist() == [False, True, False, False]
+
+
+class ProbedValidatorStub(ValidatorStub):
+    """Validator whose `down_uids` miners answer with a timeout, recording the axons and timeouts of every query."""
+
+    def __init__(self, metagraph, down_uids: set[int]):
+        super().__init__(metagraph)
+        self.down_uids = down_uids
+        self.queries: list[tuple[list[int], float]] = []
+
+    async def dendrite(self, axons, synapse, deserialize=True, timeout=60):
+        axon_uids = [self.metagraph.axons.index(axon) for axon in axons]
+        self.queries.append((sorted(axon_uids), timeout))
+        responses = await super().dendrite(axons, synapse, deserialize, timeout)
+        for uid, response in zip(axon_uids, responses, strict=True):
+            if uid in self.down_uids:
+                response.predicted_arrival_time = None
+                response.dendrite.status_code = 408
+        return responses
+
+
+def build_synapse() -> FlightPredictionSynapse:
+    return FlightPredictionSynapse(
+        flight_ident_icao="TST1",
+        flight_ident_iata="TS1",
+        operating_airline_iata="TS",
+        departure_iata="AAA",
+        destination_iata="BBB",
+        scheduled_departure_time="2026-01-01T10:00:00",
+        scheduled_arrival_time="2026-01-01T12:00:00",
+        aircraft_type="A320",
+        is_domestic=False,
+    )
+
+
+async def test_probe_only_queries_quarantined_miners_and_releases_the_recovered_ones():
+    validator = ProbedValidatorStub(MetagraphStub(4), down_uids={1})
+    quarantine(validator.miner_health, HOTKEYS[0])
+    quarantine(validator.miner_health, HOTKEYS[1])
+    validator.last_round_synapse = build_synapse()
+
+    await probe_quarantined_miners(validator)
+
+    assert validator.queries == [([0, 1], validator.config.neuron.min_timeout)]
+    assert validator.miner_health.quarantined_mask(HOTKEYS).tolist() == [False, True, False, False]
+    assert validator.latency_tracker.consecutive_failures(HOTKEYS[1]) == 1
+
+
+async def test_probe_waits_for_a_first_round():
+    validator = ProbedValidatorStub(MetagraphStub(4), down_uids=set())
+    quarantine(validator.miner_health, HOTKEYS[0])
+
+    await probe_quarantined_miners(validator)
+
+    assert validator.queries == []
+    assert validator.miner_health.state(HOTKEYS[0]) == MinerHealthState.QUARANTINED
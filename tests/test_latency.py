@@ -0,0 +1,78 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from flight_predict.validator.forward import get_miner_timeouts
+from flight_predict.validator.latency import MinerLatencyTracker
+
+
+def build_tracker(latencies: dict[str, list[float]]) -> MinerLatencyTracker:
+    tracker = MinerLatencyTracker(window=8)
+    for hotkey, process_times in latencies.items():
+        for process_time in process_times:
+            tracker.record(hotkey, process_time, HTTPStatus.OK)
+    return tracker
+
+
+def test_timeout_is_the_p95_with_margin_rounded_up_to_a_bucket():
+    tracker = build_tracker({"fast": [1, 2, 3], "slow": [20, 30, 30, 30]})
+
+    # p95 of 2.9 seconds with the 1.5 margin is 4.35 seconds, rounded up to the 5 seconds bucket.
+    assert tracker.timeout_for("fast", max_timeout=60, min_timeout=1) == 5
+    assert tracker.timeout_for("slow", max_timeout=60, min_timeout=1) == 45
+
+
+def test_timeout_is_clamped_between_min_and_max():
+    tracker = build_tracker({"fast": [0.1, 0.1, 0.1], "slow": [50, 50, 50]})
+
+    assert tracker.timeout_for("fast", max_timeout=60, min_timeout=12) == 12
+    assert tracker.timeout_for("slow", max_timeout=60, min_timeout=12) == 60
+
+
+def test_timeout_without_history():
+    tracker = build_tracker({"new": [1, 1]})
+    for _ in range(MinerLatencyTracker.DEAD_AFTER_FAILURES):
+        tracker.record("dead", None, HTTPStatus.REQUEST_TIMEOUT)
+
+    # Too few samples get the cap, repeated failures without a single response get the floor.
+    assert tracker.timeout_for("new", max_timeout=60, min_timeout=12) == 60
+    assert tracker.timeout_for("unknown", max_timeout=60, min_timeout=12) == 60
+    assert tracker.timeout_for("dead", max_timeout=60, min_timeout=12) == 12
+
+    tracker.record("dead", 1, HTTPStatus.OK)
+    assert tracker.consecutive_failures("dead") == 0
+
+
+def test_window_keeps_the_last_latencies():
+    tracker = build_tracker({"miner": [50] * 8 + [1] * 8})
+
+    assert tracker.percentile("miner", 95) == 1
+
+
+def test_state_is_restored(tmp_path):
+    tracker = build_tracker({"fast": [1, 2, 3], "slow": [20, 30, 30, 30]})
+    tracker.record("slow", None, HTTPStatus.REQUEST_TIMEOUT)
+    path = str(tmp_path / "latency.npz")
+    tracker.save(path)
+
+    restored = MinerLatencyTracker(window=8)
+    restored.load(path)
+
+    assert restored.percentile("fast", 95) == tracker.percentile("fast", 95)
+    assert restored.percentile("slow", 95) == tracker.percentile("slow", 95)
+    assert restored.consecutive_failures("slow") == 1
+
+
+def build_validator(tracker: MinerLatencyTracker, disable_adaptive_timeouts: bool = False) -> SimpleNamespace:
+    neuron = SimpleNamespace(timeout=30, min_timeout=12, disable_adaptive_timeouts=disable_adaptive_timeouts)
+    return SimpleNamespace(
+        config=SimpleNamespace(neuron=neuron),
+        metagraph=SimpleNamespace(hotkeys=["fast", "slow", "new"]),
+        latency_tracker=tracker,
+    )
+
+
+def test_miner_timeouts_follow_the_neuron_config():
+    tracker = build_tracker({"fast": [0.1, 0.1, 0.1], "slow": [50, 50, 50]})
+
+    assert get_miner_timeouts(build_validator(tracker), [0, 1, 2]) == [12, 30, 30]
+    assert get_miner_timeouts(build_validator(tracker, disable_adaptive_timeouts=True), [0, 1, 2]) == [30, 30, 30]
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fakeredis import FakeAsyncRedis
+
+from flight_predict.schemas import DeparturesFlightsResponse
+from flight_predict.validator.prefetch import ScheduledFlightsPrefetcher
+from tests.helpers import build_flight
+
+SET_KEY = "scheduled_flights"
+
+
+def build_departing_flight(flight_id: int, departs_in: timedelta) -> DeparturesFlightsResponse:
+    return build_flight(flight_id, datetime.utcnow() + departs_in)
+
+
+def build_validator(flights: list[DeparturesFlightsResponse]) -> SimpleNamespace:
+    """Validator serving `flights` from the flights API and keeping the stored flights in `stored_flights`."""
+    validator = SimpleNamespace(
+        config=SimpleNamespace(neuron=SimpleNamespace(flights_per_round=4)),
+        redis_client=FakeAsyncRedis(),
+        REDIS_SCHEDULED_FLIGHTS_SET_KEY=SET_KEY,
+        stored_flights=[],
+    )
+
+    async def fetch_scheduled_flights(count: int) -> list[DeparturesFlightsResponse]:
+        return flights[:count]
+
+    async def insert_scheduled_flights(rows: list[dict]):
+        validator.stored_flights += rows
+
+    validator.flights_client = SimpleNamespace(fetch_scheduled_flights=fetch_scheduled_flights)
+    validator.insert_scheduled_flights = insert_scheduled_flights
+    return validator
+
+
+async def scheduled_flight_ids(validator: SimpleNamespace) -> set[int]:
+    return {int(flight_id) for flight_id in await validator.redis_client.smembers(SET_KEY)}
+
+
+async def test_fill_skips_departed_flights():
+    flights = [
+        build_departing_flight(1, timedelta(hours=1)),
+        build_departing_flight(2, -timedelta(minutes=5)),
+        build_departing_flight(3, timedelta(hours=1)),
+    ]
+    validator = build_validator(flights)
+    prefetcher = ScheduledFlightsPrefetcher(validator, maxsize=4)
+
+    await prefetcher.fill()
+
+    assert prefetcher.qsize() == 2
+    assert [row["flight_id"] for row in validator.stored_flights] == [1, 3]
+    assert await scheduled_flight_ids(validator) == {1, 3}
+
+
+async def test_flights_departed_in_the_buffer_are_dropped():
+    flights = [build_departing_flight(flight_id, timedelta(hours=1)) for flight_id in range(1, 5)]
+    validator = build_validator(flights)
+    prefetcher = ScheduledFlightsPrefetcher(validator, maxsize=4)
+    await prefetcher.fill()
+
+    # The second flight departs while it waits in the buffer.
+    flights[1].scheduled_departure_time = datetime.utcnow() - timedelta(minutes=1)
+    round_flights = await prefetcher.get(3, wait_seconds=1)
+
+    assert [flight.flight_id for flight in round_flights] == [1, 3]
+    assert prefetcher.qsize() == 1
+    assert await scheduled_flight_ids(validator) == {1, 3, 4}
+
+
+async def test_get_waits_for_flights():
+    prefetcher = ScheduledFlightsPrefetcher(build_validator([]), maxsize=4)
+
+    assert await prefetcher.get(3, wait_seconds=0.01) == []
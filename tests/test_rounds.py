@@ -0,0 +1,70 @@
+import asyncio
+
+from flight_predict.base.utils.rounds import RequestsLimiter, RoundExecutor
+
+
+async def test_outstanding_requests_stay_within_the_limit():
+    limiter = RequestsLimiter(10)
+    peak = 0
+
+    async def query(count: int):
+        nonlocal peak
+        async with limiter.requests(count):
+            peak = max(peak, limiter.outstanding)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(query(count) for count in (4, 4, 4, 7, 3, 25)))
+
+    assert peak <= 10
+    assert limiter.outstanding == 0
+
+
+async def test_requests_over_the_limit_wait_for_the_whole_budget():
+    limiter = RequestsLimiter(10)
+
+    async with limiter.requests(3):
+        waiting = asyncio.create_task(limiter.acquire(25))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+    assert await waiting == 10
+    assert limiter.outstanding == 10
+
+
+async def test_rounds_in_flight_stay_within_the_limit():
+    executor = RoundExecutor(max_inflight_rounds=2, max_outstanding_requests=10)
+    finish = asyncio.Event()
+    started = []
+
+    async def round_func():
+        started.append(executor.inflight_rounds)
+        await finish.wait()
+
+    await executor.start_round(round_func)
+    await executor.start_round(round_func)
+    third = asyncio.create_task(executor.start_round(round_func))
+    await asyncio.sleep(0.01)
+
+    # The third round only starts once one of the first two finishes.
+    assert len(started) == 2
+    assert not third.done()
+
+    finish.set()
+    await third
+    await executor.drain()
+
+    assert len(started) == 3
+    assert executor.inflight_rounds == 0
+
+
+async def test_failed_round_frees_its_slot():
+    executor = RoundExecutor(max_inflight_rounds=1, max_outstanding_requests=10)
+
+    async def failing_round():
+        raise ValueError("boom")
+
+    await executor.start_round(failing_round)
+    await asyncio.wait_for(executor.start_round(failing_round), timeout=1)
+    await executor.drain()
+
+    assert executor.inflight_rounds == 0
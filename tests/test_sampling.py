@@ -0,0 +1,63 @@
+import numpy as np
+
+from flight_predict.validator.sampling import CoverageSampler
+
+HOTKEYS = [f"hotkey_{uid}" for uid in range(16)]
+
+
+def test_quarantined_miners_do_not_take_the_slots_of_live_miners():
+    sampler = CoverageSampler(seed=0)
+    miner_uids = np.arange(16)
+    quarantined = miner_uids < 8
+
+    for _ in range(20):
+        selected = sampler.select(miner_uids, HOTKEYS, 4, quarantined)
+        assert np.count_nonzero(~quarantined[selected]) == 4
+        sampler.record([HOTKEYS[uid] for uid in selected], flights_count=1)
+
+    # Quarantined miners still get their failed flights at the pace of the live ones.
+    counts = np.array([sampler._counts[hotkey] for hotkey in HOTKEYS])
+    assert counts.max() - counts.min() <= 1
+
+
+def test_every_miner_gets_the_same_number_of_flights():
+    sampler = CoverageSampler(seed=0)
+    miner_uids = np.arange(16)
+
+    for _ in range(12):
+        selected = sampler.select(miner_uids, HOTKEYS, 4)
+        assert len(set(selected.tolist())) == 4
+        sampler.record([HOTKEYS[uid] for uid in selected], flights_count=1)
+
+    assert {sampler._counts[hotkey] for hotkey in HOTKEYS} == {3}
+
+
+def test_new_miner_joins_the_rotation():
+    sampler = CoverageSampler(seed=0)
+    sampler.record(HOTKEYS[:8], flights_count=10)
+    sampler.record(HOTKEYS[8:15], flights_count=12)
+
+    selected = sampler.select(np.arange(16), HOTKEYS, 8)
+
+    # The new hotkey starts level with the least queried miners instead of at zero.
+    assert sampler._counts[HOTKEYS[15]] == 10
+    assert all(sampler._counts[HOTKEYS[uid]] == 10 for uid in selected)
+
+
+def test_all_candidates_are_selected_when_there_are_not_enough():
+    sampler = CoverageSampler(seed=0)
+
+    assert sampler.select(np.arange(3), HOTKEYS, 4).tolist() == [0, 1, 2]
+
+
+def test_state_is_restored_without_the_deregistered_hotkeys(tmp_path):
+    sampler = CoverageSampler(seed=0)
+    sampler.record(HOTKEYS[:4], flights_count=5)
+    sampler.prune(HOTKEYS[1:])
+    path = str(tmp_path / "coverage.npz")
+    sampler.save(path)
+
+    restored = CoverageSampler(seed=0)
+    restored.load(path)
+
+    assert restored._counts == {hotkey: 5 for hotkey in HOTKEYS[1:4]}
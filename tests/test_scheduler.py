@@ -0,0 +1,51 @@
+import asyncio
+
+from flight_predict.base.utils.scheduler import PeriodicTask, run_periodic_tasks
+
+
+async def test_missed_ticks_are_skipped():
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def func():
+        starts.append(loop.time())
+        if len(starts) == 1:
+            # The first run overruns the period by one and a half ticks.
+            await asyncio.sleep(0.25)
+
+    running = asyncio.create_task(PeriodicTask("overrun", func, interval=0.1).run_forever())
+    await asyncio.sleep(0.45)
+    running.cancel()
+
+    # The run after the overrun waits for the next tick of the schedule instead of catching up back to back.
+    assert len(starts) == 3
+    assert abs(starts[1] - starts[0] - 0.3) < 0.05
+    assert abs(starts[2] - starts[0] - 0.4) < 0.05
+
+
+async def test_failed_run_keeps_the_schedule():
+    async def func():
+        raise ValueError("boom")
+
+    task = PeriodicTask("failing", func, interval=0.05)
+    running = asyncio.create_task(task.run_forever())
+    await asyncio.sleep(0.12)
+    running.cancel()
+
+    assert task.runs == 3
+
+
+async def test_tasks_are_cancelled_on_exit():
+    tasks = [PeriodicTask(name, lambda: asyncio.sleep(0), interval=0.05) for name in ("first", "second")]
+    should_exit = False
+
+    async def request_exit():
+        nonlocal should_exit
+        await asyncio.sleep(0.12)
+        should_exit = True
+
+    await asyncio.wait_for(
+        asyncio.gather(run_periodic_tasks(tasks, lambda: should_exit, poll_interval=0.01), request_exit()), timeout=1
+    )
+
+    assert all(task.runs == 3 for task in tasks)
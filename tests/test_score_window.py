@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import numpy as np
+
+from flight_predict.validator.score_window import ScoreWindowStore
+
+NOW = 1_750_000_000.0
+MAX_AGE = timedelta(hours=48)
+
+
+def build_scored_predictions(count: int, hotkeys_count: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "id": np.arange(1, count + 1, dtype=np.int64),
+        "miner_hotkey": np.array([f"hotkey_{i}" for i in rng.integers(0, hotkeys_count, count)], dtype=object),
+        "final_score": rng.random(count) * 1000,
+        "is_correct": rng.random(count) > 0.2,
+        "created_at": np.sort(rng.integers(int(NOW) - 72 * 3600, int(NOW), count)),
+    }
+
+
+def reference_scores(scored: dict[str, np.ndarray], hotkeys: list[str], last_n_predictions: int) -> dict[str, dict]:
+    """Same aggregation as the `fetch_miner_scores` query over the `last_scored_predictions` table."""
+    in_view = scored["created_at"] > NOW - MAX_AGE.total_seconds()
+    result = {}
+    for hotkey in hotkeys:
+        mask = in_view & (scored["miner_hotkey"] == hotkey)
+        last = np.argsort(-scored["id"][mask])[:last_n_predictions]
+        is_correct = scored["is_correct"][mask][last]
+        if is_correct.sum() > 0:
+            result[hotkey] = {
+                "score_sum": scored["final_score"][mask][last][is_correct].sum(),
+                "predictions_count_coeff": is_correct.sum() / last_n_predictions,
+            }
+    return result
+
+
+def add_in_batches(store: ScoreWindowStore, scored: dict[str, np.ndarray], batch_size: int):
+    for start in range(0, len(scored["id"]), batch_size):
+        batch = {name: column[start : start + batch_size] for name, column in scored.items()}
+        store.add(batch["id"], batch["miner_hotkey"], batch["final_score"], batch["is_correct"], batch["created_at"])
+
+
+def assert_same_scores(actual: dict[str, dict], expected: dict[str, dict]):
+    assert actual.keys() == expected.keys()
+    for hotkey, scores in expected.items():
+        assert np.isclose(actual[hotkey]["score_sum"], scores["score_sum"])
+        assert actual[hotkey]["predictions_count_coeff"] == scores["predictions_count_coeff"]
+
+
+def test_window_matches_fetch_miner_scores():
+    scored = build_scored_predictions(20_000, 64)
+    hotkeys = [f"hotkey_{i}" for i in range(70)]
+
+    store = ScoreWindowStore(180, MAX_AGE)
+    add_in_batches(store, scored, 777)
+
+    assert store.last_id == 20_000
+    for last_n_predictions in (180, 50):
+        assert_same_scores(
+            store.miner_scores(hotkeys, last_n_predictions, now=NOW),
+            reference_scores(scored, hotkeys, last_n_predictions),
+        )
+
+
+def test_batch_larger_than_window():
+    scored = build_scored_predictions(5_000, 3)
+    hotkeys = ["hotkey_0", "hotkey_1", "hotkey_2"]
+
+    store = ScoreWindowStore(10, MAX_AGE)
+    add_in_batches(store, scored, 5_000)
+
+    assert_same_scores(store.miner_scores(hotkeys, 10, now=NOW), reference_scores(scored, hotkeys, 10))
+
+
+def test_prune_drops_expired_miners():
+    store = ScoreWindowStore(4, MAX_AGE)
+    store.add(
+        np.array([1, 2]),
+        np.array(["old", "new"], dtype=object),
+        np.array([1.0, 2.0]),
+        np.array([True, True]),
+        np.array([NOW - 72 * 3600, NOW - 60]),
+    )
+
+    store.prune(now=NOW)
+
+    assert len(store) == 1
+    assert store.miner_scores(["old", "new"], 4, now=NOW) == {"new": {"score_sum": 2.0, "predictions_count_coeff": 0.25}}
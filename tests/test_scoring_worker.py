@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from redis.asyncio import Redis
+
+from flight_predict.validator import scoring_worker
+from flight_predict.validator.scoring_worker import (
+    REDIS_LAST_SCORED_AT_KEY,
+    REDIS_SCORING_LOCK_KEY,
+    get_last_scored_at,
+    run_scoring_if_due,
+)
+
+
+@pytest.fixture
+async def validator(monkeypatch):
+    """Validator whose scoring passes are counted in `passes` and fail while `is_failing` is set."""
+    validator = SimpleNamespace(redis_client=Redis(host="localhost", port=6379), passes=0, is_failing=False)
+
+    async def update_actual_data_and_score_miners(self, on_chunk_done):
+        self.passes += 1
+        await on_chunk_done()
+        if self.is_failing:
+            raise ConnectionRefusedError("database is down")
+
+    monkeypatch.setattr(scoring_worker, "update_actual_data_and_score_miners", update_actual_data_and_score_miners)
+    await validator.redis_client.delete(REDIS_LAST_SCORED_AT_KEY, REDIS_SCORING_LOCK_KEY)
+    yield validator
+    await validator.redis_client.delete(REDIS_LAST_SCORED_AT_KEY, REDIS_SCORING_LOCK_KEY)
+    await validator.redis_client.aclose()
+
+
+async def test_scoring_runs_once_per_interval(validator):
+    assert await run_scoring_if_due(validator, 600)
+    last_scored_at = await get_last_scored_at(validator.redis_client)
+
+    assert not await run_scoring_if_due(validator, 600)
+    assert validator.passes == 1
+    assert datetime.now(tz=timezone.utc) - last_scored_at < timedelta(seconds=5)
+
+    await validator.redis_client.set(REDIS_LAST_SCORED_AT_KEY, (last_scored_at - timedelta(seconds=600)).isoformat())
+    assert await run_scoring_if_due(validator, 600)
+    assert validator.passes == 2
+
+
+async def test_scoring_is_skipped_while_another_pass_holds_the_lock(validator):
+    lock = validator.redis_client.lock(REDIS_SCORING_LOCK_KEY, timeout=60)
+    await lock.acquire()
+
+    assert not await run_scoring_if_due(validator, 600)
+    assert validator.passes == 0
+
+    await lock.release()
+    assert await run_scoring_if_due(validator, 600)
+
+
+async def test_failed_pass_releases_the_lock_and_is_retried(validator):
+    validator.is_failing = True
+    with pytest.raises(ConnectionRefusedError):
+        await run_scoring_if_due(validator, 600)
+
+    assert await get_last_scored_at(validator.redis_client) is None
+    assert not await validator.redis_client.exists(REDIS_SCORING_LOCK_KEY)
+
+    validator.is_failing = False
+    assert await run_scoring_if_due(validator, 600)
+    assert validator.passes == 2
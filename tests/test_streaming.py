@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from flight_predict.validator.forward import create_flight_synapse, stream_miner_responses
+from tests.helpers import MetagraphStub, ValidatorStub, build_flight
+
+
+class StreamingValidatorStub(ValidatorStub):
+    """
+    Validator whose miners answer after their `delays`, storing the round writes through a write-behind buffer
+    which rejects the `failing_flushes`-th flushes.
+    """
+
+    def __init__(self, delays: list[float], failing_flushes: set[int] | None = None):
+        super().__init__(MetagraphStub(len(delays)))
+        self.delays = delays
+        self.failing_flushes = failing_flushes or set()
+        self.flushes: list[dict] = []
+        self.cancelled_uids: list[int] = []
+        self.config.neuron.predictions_flush_size = 2
+        self.dendrite = SimpleNamespace(call=self.call_axon)
+        self.write_behind = self
+
+    async def call_axon(self, target_axon, synapse, timeout, deserialize):
+        uid = self.metagraph.axons.index(target_axon)
+        try:
+            await asyncio.sleep(self.delays[uid])
+        except asyncio.CancelledError:
+            self.cancelled_uids.append(uid)
+            raise
+
+        synapse.predicted_arrival_time = datetime.fromisoformat(synapse.scheduled_arrival_time).isoformat()
+        synapse.dendrite.status_code = 200
+        synapse.dendrite.process_time = self.delays[uid]
+        return synapse
+
+    async def put(self, writes: dict[str, list[dict]]):
+        self.flushes.append(writes)
+        if len(self.flushes) - 1 in self.failing_flushes:
+            raise ConnectionRefusedError("database is down")
+
+
+async def stream_round(validator: StreamingValidatorStub) -> int:
+    flight = build_flight(1)
+    uids = list(range(len(validator.delays)))
+    return await stream_miner_responses(
+        validator,
+        validator.metagraph.axons,
+        uids,
+        create_flight_synapse(flight),
+        [flight],
+        [60] * len(uids),
+        "round",
+    )
+
+
+async def test_round_keeps_streaming_after_a_failed_flush():
+    validator = StreamingValidatorStub([0.01, 0.02, 0.03, 0.04, 0.05, 0.06], failing_flushes={0})
+
+    stored_count = await stream_round(validator)
+
+    assert stored_count == 4
+    flushed_uids = [[row["miner_uid"] for row in writes["miner_predictions"]] for writes in validator.flushes]
+    assert flushed_uids == [[0, 1], [2, 3], [4, 5]]
+    assert all(len(writes["miner_response_stats"]) == 2 for writes in validator.flushes)
+    assert validator.round_executor.limiter.outstanding == 0
+
+
+async def test_cancelled_round_cancels_its_queries():
+    validator = StreamingValidatorStub([0.01, 0.01, 0.01, 10, 10])
+
+    streaming = asyncio.create_task(stream_round(validator))
+    await asyncio.sleep(0.1)
+    streaming.cancel()
+    await asyncio.gather(streaming, return_exceptions=True)
+
+    # The answered miners were flushed, the slow ones do not keep their requests open.
+    assert sorted(validator.cancelled_uids) == [3, 4]
+    assert [row["miner_uid"] for row in validator.flushes[0]["miner_predictions"]] == [0, 1]
+    assert validator.round_executor.limiter.outstanding == 0
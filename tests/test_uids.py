@@ -0,0 +1,34 @@
+import numpy as np
+
+from flight_predict.base.utils.uids import check_uid_availability, get_availability_mask, get_available_miners
+from tests.helpers import VPERMIT_TAO_LIMIT, build_validator
+
+
+def test_availability_mask_matches_per_uid_check():
+    validator = build_validator(256)
+
+    mask = get_availability_mask(validator.metagraph, VPERMIT_TAO_LIMIT)
+
+    expected = [check_uid_availability(validator.metagraph, uid, VPERMIT_TAO_LIMIT) for uid in range(256)]
+    assert mask.tolist() == expected
+
+
+def test_get_available_miners_excludes_uids():
+    validator = build_validator(256)
+    available = np.flatnonzero(get_availability_mask(validator.metagraph, VPERMIT_TAO_LIMIT))
+    exclude = available[:10].tolist()
+
+    uids = get_available_miners(validator, k=20, exclude=exclude)
+
+    assert len(uids) == 20
+    assert len(set(uids.tolist())) == 20
+    assert not set(uids.tolist()) & set(exclude)
+
+
+def test_get_available_miners_fills_from_excluded_uids():
+    validator = build_validator(256)
+    available = np.flatnonzero(get_availability_mask(validator.metagraph, VPERMIT_TAO_LIMIT))
+
+    uids = get_available_miners(validator, k=len(available), exclude=available[:10].tolist())
+
+    assert sorted(uids.tolist()) == available.tolist()
@@ -0,0 +1,143 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from fakeredis import FakeAsyncRedis
+
+from flight_predict.validator.write_behind import WriteBehindBuffer
+
+
+class DatabaseStub:
+    """
+    In-memory tables behind the validator insert methods, failing like an unreachable database when down and
+    rejecting the writes of the `rejected_flight_ids` flights like a constraint violation.
+    """
+
+    REDIS_SCHEDULED_FLIGHTS_SET_KEY = "scheduled_flights"
+
+    def __init__(self):
+        self.redis_client = FakeAsyncRedis()
+        self.is_down = False
+        self.rejected_flight_ids: set[int] = set()
+        self.commits: list[dict[str, list[dict]]] = []
+        self._transaction = None
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        if self.is_down:
+            raise ConnectionRefusedError("database is down")
+        self._transaction = {}
+        yield
+        self.commits.append(self._transaction)
+
+    async def insert_scheduled_flights(self, flights: list[dict]):
+        if any(flight["flight_id"] in self.rejected_flight_ids for flight in flights):
+            raise ValueError("violates check constraint")
+        self._transaction["scheduled_flights"] = flights
+
+    async def insert_miner_predictions(self, predictions: list[dict]):
+        self._transaction["miner_predictions"] = predictions
+
+    async def insert_miner_response_stats(self, response_stats: list[dict]):
+        self._transaction["miner_response_stats"] = response_stats
+
+
+def build_round(flight_id: int) -> dict[str, list[dict]]:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    return {
+        "scheduled_flights": [{"flight_id": flight_id, "scheduled_arrival_time": now}],
+        "miner_predictions": [
+            {"miner_uid": uid, "flight_id": flight_id, "predicted_arrival_time": now, "is_valid": True} for uid in range(3)
+        ],
+    }
+
+
+async def test_flushes_merged_writes_once_enough_rows_are_pending(tmp_path):
+    db = DatabaseStub()
+    buffer = WriteBehindBuffer(db, max_rows=100, flush_rows=8, spill_path=str(tmp_path / "spill.jsonl"))
+
+    await buffer.put(build_round(1))
+    assert buffer.pending_rows == 4
+    assert db.commits == []
+
+    await buffer.put(build_round(2))
+    await buffer._flush_task
+
+    assert buffer.pending_rows == 0
+    assert len(db.commits) == 1
+    assert [flight["flight_id"] for flight in db.commits[0]["scheduled_flights"]] == [1, 2]
+    assert len(db.commits[0]["miner_predictions"]) == 6
+    assert await db.redis_client.smembers(db.REDIS_SCHEDULED_FLIGHTS_SET_KEY) == {b"1", b"2"}
+
+
+async def test_spills_while_the_database_is_down_and_replays_in_order(tmp_path):
+    db = DatabaseStub()
+    spill_path = tmp_path / "spill.jsonl"
+    buffer = WriteBehindBuffer(db, max_rows=100, flush_rows=100, spill_path=str(spill_path))
+
+    db.is_down = True
+    await buffer.put(build_round(1))
+    assert await buffer.flush() == 0
+    await buffer.put(build_round(2))
+    assert await buffer.flush() == 0
+
+    assert buffer.pending_rows == 0
+    assert buffer.spilled_rows == 8
+    assert len(spill_path.read_text().splitlines()) == 2
+    assert await db.redis_client.smembers(db.REDIS_SCHEDULED_FLIGHTS_SET_KEY) == set()
+
+    # A new buffer, as after a restart, replays the spill file before its own writes.
+    buffer = WriteBehindBuffer(db, max_rows=100, flush_rows=100, spill_path=str(spill_path))
+    db.is_down = False
+    await buffer.put(build_round(3))
+    assert await buffer.flush() == 4
+
+    assert not spill_path.exists()
+    assert [[flight["flight_id"] for flight in commit["scheduled_flights"]] for commit in db.commits] == [[1, 2], [3]]
+    assert db.commits[0]["miner_predictions"][0]["predicted_arrival_time"] == datetime(2026, 1, 1, 12, 0, 0)
+    assert await db.redis_client.smembers(db.REDIS_SCHEDULED_FLIGHTS_SET_KEY) == {b"1", b"2", b"3"}
+
+
+async def test_put_waits_for_a_flush_when_the_buffer_is_full(tmp_path):
+    db = DatabaseStub()
+    buffer = WriteBehindBuffer(db, max_rows=6, flush_rows=100, spill_path=str(tmp_path / "spill.jsonl"))
+
+    await buffer.put(build_round(1))
+    # The second round does not fit, it waits for the flush it triggers.
+    await asyncio.wait_for(buffer.put(build_round(2)), timeout=1)
+
+    assert [flight["flight_id"] for flight in db.commits[0]["scheduled_flights"]] == [1]
+    assert buffer.pending_rows == 4
+
+
+async def test_drops_only_the_rejected_round(tmp_path):
+    db = DatabaseStub()
+    db.rejected_flight_ids = {2}
+    buffer = WriteBehindBuffer(db, max_rows=100, flush_rows=100, spill_path=str(tmp_path / "spill.jsonl"))
+
+    for flight_id in (1, 2, 3):
+        await buffer.put(build_round(flight_id))
+    assert await buffer.flush() == 8
+
+    assert buffer.pending_rows == 0
+    assert buffer.spilled_rows == 0
+    assert [[flight["flight_id"] for flight in commit["scheduled_flights"]] for commit in db.commits] == [[1], [3]]
+    assert await db.redis_client.smembers(db.REDIS_SCHEDULED_FLIGHTS_SET_KEY) == {b"1", b"3"}
+
+
+async def test_replay_drops_only_the_rejected_spilled_round(tmp_path):
+    db = DatabaseStub()
+    spill_path = tmp_path / "spill.jsonl"
+    buffer = WriteBehindBuffer(db, max_rows=100, flush_rows=100, spill_path=str(spill_path))
+
+    db.is_down = True
+    for flight_id in (1, 2, 3):
+        await buffer.put(build_round(flight_id))
+        await buffer.flush()
+
+    db.is_down = False
+    db.rejected_flight_ids = {2}
+    assert await buffer.replay()
+
+    assert not spill_path.exists()
+    assert [[flight["flight_id"] for flight in commit["scheduled_flights"]] for commit in db.commits] == [[1], [3]]